@@ -95,6 +95,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+# The default cache holds the follow graph, throttle history and cached
+# responses, which every uWSGI worker must see alike, so it has to be a
+# shared backend. Tests switch to local memory (see core.test_runner).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.redis.RedisCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'redis://redis:6379/0'),
+    },
+    # Signed token deny-list, on a Redis server that never evicts keys
+    'tokens': {
+        'BACKEND': os.environ.get(
+            'TOKEN_CACHE_BACKEND',
+            'django.core.cache.backends.redis.RedisCache'
+        ),
+        'LOCATION': os.environ.get(
+            'TOKEN_CACHE_LOCATION',
+            'redis://redis-tokens:6379/0'
+        ),
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -144,8 +172,153 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # nginx hands the client address to uWSGI as REMOTE_ADDR, so
+    # X-Forwarded-For is client supplied and must not identify clients
+    'NUM_PROXIES': 0,
+    'DEFAULT_THROTTLE_RATES': {
+        'login-ip': os.environ.get('LOGIN_IP_RATE', '30/min'),
+        'login-email': os.environ.get('LOGIN_EMAIL_RATE', '10/min'),
+    },
 }
 
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
+
+# Seconds a user's followee ids and follower count are cached for
+FOLLOW_GRAPH_CACHE_TIMEOUT = 3600
+
+# Seconds a follow request's Idempotency-Key is remembered for retries
+FOLLOW_IDEMPOTENCY_TIMEOUT = 24 * 3600
+
+# Seconds rendered feed pages and posts are cached for
+FEED_RESPONSE_CACHE_TIMEOUT = 300
+
+# Number of recent posts copied into a timeline when following someone
+FEED_TIMELINE_BACKFILL = int(os.environ.get('FEED_TIMELINE_BACKFILL', 200))
+
+# Authors with at least this many followers are not fanned out on write,
+# their posts are pulled and merged into timelines at read time instead
+FEED_CELEBRITY_THRESHOLD = int(
+    os.environ.get('FEED_CELEBRITY_THRESHOLD', 10000)
+)
+# Seconds the set of pulled authors is cached for
+FEED_CELEBRITY_CACHE_TIMEOUT = 300
+
+# Largest number of posts accepted by one bulk request and the number of
+# posts inserted per transaction
+FEED_BULK_MAX_POSTS = int(os.environ.get('FEED_BULK_MAX_POSTS', 10000))
+FEED_BULK_CHUNK_SIZE = 500
+
+# Most tag ids and names a post list can be filtered on at once
+FEED_TAG_FILTER_MAX_TAGS = 20
+
+# Trending tags are scored over hourly use counts, every hour weighing
+# half as much as the one FEED_TRENDING_HALF_LIFE_HOURS after it. Hours
+# older than FEED_TRENDING_RETENTION_HOURS are dropped by
+# reconcile_tag_stats and can't be asked for.
+FEED_TRENDING_HALF_LIFE_HOURS = 6
+FEED_TRENDING_RETENTION_HOURS = 7 * 24
+FEED_TRENDING_DEFAULT_HOURS = 24
+FEED_TRENDING_DEFAULT_TAGS = 20
+FEED_TRENDING_MAX_TAGS = 100
+
+# The ranked feed scores the newest FEED_RANKED_CANDIDATES posts of a
+# timeline with the weighted sum of FEED_RANKING_SCORERS, dotted paths
+# of functions taking a feed.ranking.Batch. Rankings are cached per
+# viewer for FEED_RANKED_CACHE_TIMEOUT seconds.
+FEED_RANKED_CANDIDATES = int(os.environ.get('FEED_RANKED_CANDIDATES', 500))
+FEED_RANKED_CACHE_TIMEOUT = 60
+FEED_RANKING_SCORERS = {
+    'feed.ranking.recency': 1.0,
+    'feed.ranking.author_affinity': 0.5,
+    'feed.ranking.tag_affinity': 0.5,
+}
+FEED_RANKING_HALF_LIFE_HOURS = 12
+# Newest posts of a viewer their tag affinity is measured over
+FEED_RANKING_PROFILE_POSTS = 200
+
+# Rows the like and comment counts of every post are spread over. More
+# shards let more writers like a hot post at once and cost a little
+# more to add up on read.
+FEED_COUNTER_SHARDS = int(os.environ.get('FEED_COUNTER_SHARDS', 8))
+
+# Optional file with one blocked word per line, checked for changes at
+# most every FEED_BLOCKED_WORDS_RELOAD_INTERVAL seconds. Words match
+# anywhere in the text in 'substring' mode or only as whole words in
+# 'word' mode
+FEED_BLOCKED_WORDS_FILE = os.environ.get('FEED_BLOCKED_WORDS_FILE')
+FEED_BLOCKED_WORDS_MODE = os.environ.get(
+    'FEED_BLOCKED_WORDS_MODE', 'substring'
+)
+FEED_BLOCKED_WORDS_RELOAD_INTERVAL = 5
+
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
+# Handle background work synchronously instead of on worker threads
+WORKERS_INLINE = os.environ.get('WORKERS_INLINE') == '1'
+
+# Seconds between sweeps requeueing work lost by a reload or crash
+WORKERS_RECOVERY_INTERVAL = int(
+    os.environ.get('WORKERS_RECOVERY_INTERVAL', 300)
+)
+
+# Threads scanning new posts and the most posts scanned per batch
+FEED_MODERATION_WORKERS = int(os.environ.get('FEED_MODERATION_WORKERS', 2))
+FEED_MODERATION_BATCH_SIZE = 100
+
+# Threads resizing uploaded post images and the encoder quality they use
+FEED_IMAGE_WORKERS = int(os.environ.get('FEED_IMAGE_WORKERS', 2))
+FEED_IMAGE_QUALITY = 80
+
+# Largest accepted image upload in bytes and in pixels, and how much of
+# an upload may be read looking for its dimensions
+FEED_IMAGE_MAX_UPLOAD_SIZE = int(
+    os.environ.get('FEED_IMAGE_MAX_UPLOAD_SIZE', 10 * 1024 * 1024)
+)
+FEED_IMAGE_MAX_PIXELS = int(os.environ.get('FEED_IMAGE_MAX_PIXELS', 40000000))
+FEED_IMAGE_HEADER_BYTES = 256 * 1024
+
+# Post search runs on Postgres full-text search, or in process on other
+# databases. FEED_SEARCH_BACKEND forces 'postgres' or 'python'. Only
+# the newest FEED_SEARCH_MAX_RANKED matches of a query are ranked.
+FEED_SEARCH_BACKEND = os.environ.get('FEED_SEARCH_BACKEND')
+FEED_SEARCH_MAX_CLAUSES = 8
+FEED_SEARCH_MAX_RANKED = int(os.environ.get('FEED_SEARCH_MAX_RANKED', 1000))
+
+# Token lookups are cached per process for AUTH_TOKEN_LOCAL_TIMEOUT
+# seconds and, unless AUTH_TOKEN_CACHE_ALIAS is empty, in that shared
+# cache for AUTH_TOKEN_SHARED_TIMEOUT seconds
+AUTH_TOKEN_LOCAL_CACHE_SIZE = 10000
+AUTH_TOKEN_LOCAL_TIMEOUT = 30
+AUTH_TOKEN_CACHE_ALIAS = os.environ.get('AUTH_TOKEN_CACHE_ALIAS', 'default')
+AUTH_TOKEN_SHARED_TIMEOUT = 300
+
+# Seconds signed access and refresh tokens are valid for
+SIGNED_ACCESS_TOKEN_LIFETIME = 300
+SIGNED_REFRESH_TOKEN_LIFETIME = 7 * 24 * 3600
+# Cache holding revoked signed tokens. It must be shared and must not
+# evict, or revoked tokens would be accepted again.
+SIGNED_TOKEN_DENY_CACHE_ALIAS = 'tokens'
+
+# Hasher for new passwords, followed by every hasher old passwords may
+# use. The cost of the configurable hashers in core.hashers is set here
+PASSWORD_HASHERS = [
+    os.environ.get('PASSWORD_HASHER', 'core.hashers.PBKDF2PasswordHasher'),
+    'core.hashers.PBKDF2PasswordHasher',
+    'core.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 390000)
+)
+PASSWORD_SCRYPT_WORK_FACTOR = int(
+    os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14)
+)
+
+# Cache counting login attempts, shared between workers
+LOGIN_THROTTLE_CACHE_ALIAS = 'default'
@@ -22,6 +22,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
+from core.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -33,6 +34,7 @@ urlpatterns = [
     ),
     path('api/user/', include('user.urls')),
     path('api/feed/', include('feed.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -42,5 +42,12 @@ class UserAdmin(BaseUserAdmin):
     ]
 
 
+class FeedAdmin(admin.ModelAdmin):
+    """Define feed admin with the moderation status"""
+    ordering = ['-id']
+    list_display = ['title', 'user', 'status', 'created_at']
+    list_filter = ['status']
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Feed)
+admin.site.register(models.Feed, FeedAdmin)
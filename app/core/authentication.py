@@ -0,0 +1,157 @@
+"""
+Token authentication with cached token lookups, and authentication of
+stateless signed access tokens.
+
+DRF tokens are looked up in a bounded in-process LRU first, then in the
+shared cache named by AUTH_TOKEN_CACHE_ALIAS, and only then in the
+database. Entries are dropped when a token is deleted or its user is
+saved. Other processes may keep using their local entry for up to
+AUTH_TOKEN_LOCAL_TIMEOUT seconds.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+from core import metrics, tokens
+
+
+class LocalCache:
+    """Thread safe LRU cache whose entries expire after a timeout"""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalCache(
+    settings.AUTH_TOKEN_LOCAL_CACHE_SIZE,
+    settings.AUTH_TOKEN_LOCAL_TIMEOUT
+)
+
+
+def _shared_key(key):
+    return f'auth:token:{key}'
+
+
+def _shared_cache():
+    alias = settings.AUTH_TOKEN_CACHE_ALIAS
+    return caches[alias] if alias else None
+
+
+def _cached(key):
+    """Return the pickled token from the local or shared tier"""
+    data = local_cache.get(key)
+    if data is not None:
+        metrics.incr('cache.auth-token.hits')
+        return data
+
+    shared = _shared_cache()
+    data = shared.get(_shared_key(key)) if shared else None
+    if data is not None:
+        metrics.incr('cache.auth-token.hits')
+        local_cache.set(key, data)
+        return data
+
+    metrics.incr('cache.auth-token.misses')
+    return None
+
+
+def invalidate(keys):
+    """Forget cached lookups of the token keys"""
+    for key in keys:
+        local_cache.delete(key)
+
+    shared = _shared_cache()
+    if shared:
+        shared.delete_many([_shared_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """Token authentication that caches token to user lookups"""
+
+    def authenticate_credentials(self, key):
+        data = _cached(key)
+        if data is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+            # Pickled so every request gets its own user instance
+            data = pickle.dumps(token)
+            local_cache.set(key, data)
+            shared = _shared_cache()
+            if shared:
+                shared.set(
+                    _shared_key(key),
+                    data,
+                    settings.AUTH_TOKEN_SHARED_TIMEOUT
+                )
+        else:
+            token = pickle.loads(data)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (token.user, token)
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """Authenticate signed access tokens sent as 'Bearer <token>'
+    without touching the database"""
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header.'))
+
+        try:
+            claims = tokens.verify(auth[1].decode(), tokens.ACCESS)
+        except (tokens.InvalidToken, UnicodeError):
+            raise exceptions.AuthenticationFailed(
+                _('Invalid, expired or revoked token.')
+            )
+
+        return (tokens.user_from_claims(claims), claims)
+
+    def authenticate_header(self, request):
+        return self.keyword
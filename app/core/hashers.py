@@ -0,0 +1,47 @@
+"""
+Password hashers with a configurable cost.
+
+The cost comes from settings, so it can be tuned per deployment. Stored
+hashes with a different cost are upgraded on the next successful login.
+Time spent hashing is recorded in the auth.hashing_ms metric.
+"""
+import time
+from django.conf import settings
+from django.contrib.auth import hashers
+from core import metrics
+
+
+class TimedHasherMixin:
+    """Record how long every hash computation takes"""
+
+    def _timed(self, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.observe(
+                'auth.hashing_ms',
+                (time.perf_counter() - start) * 1000
+            )
+
+    def encode(self, *args, **kwargs):
+        return self._timed(super().encode, *args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        return self._timed(super().verify, *args, **kwargs)
+
+
+class PBKDF2PasswordHasher(TimedHasherMixin, hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with PASSWORD_PBKDF2_ITERATIONS iterations"""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class ScryptPasswordHasher(TimedHasherMixin, hashers.ScryptPasswordHasher):
+    """Scrypt with a PASSWORD_SCRYPT_WORK_FACTOR work factor"""
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
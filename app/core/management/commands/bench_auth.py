@@ -0,0 +1,73 @@
+"""
+Django command to compare the per request cost of authentication classes.
+"""
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core import tokens
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
+
+
+class Command(BaseCommand):
+    """Command for benchmarking authentication"""
+    help = 'Compare DRF, cached and signed token authentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def _run(self, auth, header, count):
+        """Return microseconds and queries per authenticated request"""
+        factory = APIRequestFactory()
+        requests = [
+            Request(factory.get('/', HTTP_AUTHORIZATION=header))
+            for _ in range(count)
+        ]
+        auth.authenticate(requests[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for request in requests:
+                auth.authenticate(request)
+            elapsed = time.perf_counter() - start
+
+        return elapsed * 1e6 / count, len(queries) / count
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        count = options['requests']
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email='bench-auth@example.com',
+                username='bench-auth',
+                password='benchpass'
+            )
+            key = Token.objects.create(user=user).key
+            access = tokens.issue(user)['access']
+
+            results = [
+                ('drf token', self._run(
+                    TokenAuthentication(), f'Token {key}', count
+                )),
+                ('cached token', self._run(
+                    CachedTokenAuthentication(), f'Token {key}', count
+                )),
+                ('signed token', self._run(
+                    SignedTokenAuthentication(), f'Bearer {access}', count
+                )),
+            ]
+            transaction.set_rollback(True)
+
+        for name, (micros, queries) in results:
+            self.stdout.write(
+                f'{name}: {micros:.1f} us/request, '
+                f'{queries:.2f} queries/request'
+            )
@@ -0,0 +1,15 @@
+"""
+Django command to handle background work lost from worker queues.
+"""
+from django.core.management.base import BaseCommand
+from core import workers
+
+
+class Command(BaseCommand):
+    """Command for recovering jobs dropped by a reload or crash"""
+    help = 'Handle every job the worker pools lost, e.g. after a restart'
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        for name, count in workers.recover().items():
+            self.stdout.write(f'Recovered {count} {name} jobs')
@@ -0,0 +1,60 @@
+"""
+In-process counters for operational metrics
+"""
+import threading
+from collections import Counter
+
+
+_lock = threading.Lock()
+_counters = Counter()
+
+
+def incr(name, amount=1):
+    """Increase the named counter"""
+    with _lock:
+        _counters[name] += amount
+
+
+def observe(name, value):
+    """Record a sample as <name>.count, <name>.sum and <name>.max"""
+    with _lock:
+        _counters[f'{name}.count'] += 1
+        _counters[f'{name}.sum'] += value
+        _counters[f'{name}.max'] = max(_counters[f'{name}.max'], value)
+
+
+def snapshot():
+    """Return a copy of every counter"""
+    with _lock:
+        return dict(_counters)
+
+
+def hit_ratios(counters):
+    """Return <name>.hit_ratio for every <name>.hits/<name>.misses pair"""
+    ratios = {}
+    for key, hits in counters.items():
+        if key.endswith('.hits'):
+            name = key[:-len('.hits')]
+            total = hits + counters.get(f'{name}.misses', 0)
+            ratios[f'{name}.hit_ratio'] = hits / total
+
+    return ratios
+
+
+def means(counters):
+    """Return <name>.mean for every <name>.sum/<name>.count pair"""
+    means = {}
+    for key, total in counters.items():
+        if key.endswith('.sum'):
+            name = key[:-len('.sum')]
+            count = counters.get(f'{name}.count')
+            if count:
+                means[f'{name}.mean'] = total / count
+
+    return means
+
+
+def reset():
+    """Clear every counter"""
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,52 @@
+# Generated by Django 4.1.13 on 2026-10-18 00:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_timelines(apps, schema_editor):
+    """Materialize timelines for posts created before fan-out existed"""
+    Feed = apps.get_model('core', 'Feed')
+    Follower = apps.get_model('core', 'Follower')
+    TimelineEntry = apps.get_model('core', 'TimelineEntry')
+    User = apps.get_model('core', 'User')
+
+    user_ids = set(User.objects.values_list('id', flat=True))
+    followers = {}
+    for target_id, follower_id in Follower.objects.values_list(
+            'target_user_id', 'follower_id'):
+        if follower_id in user_ids:
+            followers.setdefault(target_id, set()).add(follower_id)
+
+    entries = []
+    for post_id, author_id in Feed.objects.values_list('id', 'user_id'):
+        for viewer_id in followers.get(author_id, set()) | {author_id}:
+            entries.append(TimelineEntry(viewer_id=viewer_id, post_id=post_id))
+        if len(entries) >= 1000:
+            TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+            entries = []
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='core.feed')),
+                ('viewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('viewer', 'post'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
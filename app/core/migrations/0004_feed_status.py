@@ -0,0 +1,24 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_feed_hot_path_indexes'),
+    ]
+
+    operations = [
+        # Posts written before moderation existed are already published
+        migrations.AddField(
+            model_name='feed',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='approved', max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='feed',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=16),
+        ),
+    ]
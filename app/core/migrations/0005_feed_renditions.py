@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_feed_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feed',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing_rows(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    sources = {
+        'followers_count': (
+            apps.get_model('core', 'Follower'), 'target_user', {}
+        ),
+        'following_count': (
+            apps.get_model('core', 'Following'), 'user', {}
+        ),
+        'posts_count': (
+            apps.get_model('core', 'Feed'), 'user', {'status': 'approved'}
+        ),
+    }
+    counts = {}
+    for counter, (model, column, filters) in sources.items():
+        rows = model.objects.filter(
+            **{column: OuterRef('pk')}, **filters
+        ).order_by().values(column).annotate(total=Count('*')).values('total')
+        counts[counter] = Coalesce(Subquery(rows), 0)
+    User.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_imageblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:37
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+BATCH_SIZE = 5000
+
+
+def copy_follow_rows(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    Follow = apps.get_model('core', 'Follow')
+    user_ids = User.objects.values('id')
+    edges = [
+        apps.get_model('core', 'Follower').objects.filter(
+            follower_id__in=user_ids
+        ).exclude(
+            follower_id=models.F('target_user_id')
+        ).values_list('follower_id', 'target_user_id'),
+        apps.get_model('core', 'Following').objects.filter(
+            following_id__in=user_ids
+        ).exclude(
+            following_id=models.F('user_id')
+        ).values_list('user_id', 'following_id'),
+    ]
+    for rows in edges:
+        batch = []
+        for follower, followee in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append(Follow(follower_id=follower, followee_id=followee))
+            if len(batch) == BATCH_SIZE:
+                Follow.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        Follow.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def count_follow_rows(apps, schema_editor):
+    """Recount follows from the deduplicated rows the copy kept"""
+    User = apps.get_model('core', 'User')
+    Follow = apps.get_model('core', 'Follow')
+    sources = {
+        'followers_count': 'followee',
+        'following_count': 'follower',
+    }
+    counts = {}
+    for counter, column in sources.items():
+        rows = Follow.objects.filter(
+            **{column: OuterRef('pk')}
+        ).order_by().values(column).annotate(total=Count('*')).values('total')
+        counts[counter] = Coalesce(Subquery(rows), 0)
+    User.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_user_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Follow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('followee', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='followers', to=settings.AUTH_USER_MODEL)),
+                ('follower', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='following', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['followee', '-id'], name='follow_followee_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('follower', 'followee'), name='unique_follow'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.CheckConstraint(check=models.Q(('follower', models.F('followee')), _negated=True), name='follow_not_self'),
+        ),
+        migrations.RunPython(copy_follow_rows, migrations.RunPython.noop),
+        migrations.RunPython(count_follow_rows, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='following',
+            name='unique_following',
+        ),
+        migrations.RemoveConstraint(
+            model_name='follower',
+            name='unique_follower',
+        ),
+        migrations.RemoveField(
+            model_name='following',
+            name='user',
+        ),
+        migrations.DeleteModel(
+            name='Follower',
+        ),
+        migrations.DeleteModel(
+            name='Following',
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:42
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}.description, '')), 'B')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    # Other databases search in process without the index or trigger
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(f"""
+        CREATE FUNCTION core_feed_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(row='NEW')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    schema_editor.execute("""
+        CREATE TRIGGER core_feed_search_vector
+        BEFORE INSERT OR UPDATE OF title, description ON core_feed
+        FOR EACH ROW EXECUTE FUNCTION core_feed_search_vector()
+    """)
+    schema_editor.execute(
+        f'UPDATE core_feed SET search_vector = '
+        f'{SEARCH_VECTOR.format(row="core_feed")}'
+    )
+    schema_editor.execute(
+        'CREATE INDEX feed_search_idx ON core_feed USING gin (search_vector)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('DROP INDEX feed_search_idx')
+    schema_editor.execute('DROP TRIGGER core_feed_search_vector ON core_feed')
+    schema_editor.execute('DROP FUNCTION core_feed_search_vector()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_follow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feed',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='feed',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='feed_search_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_index, drop_search_index),
+            ],
+        ),
+    ]
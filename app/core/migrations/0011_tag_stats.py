@@ -0,0 +1,49 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_tagged_posts(apps, schema_editor):
+    Tag = apps.get_model('core', 'Tag')
+    PostTag = apps.get_model('core', 'Feed').tags.through
+    rows = PostTag.objects.filter(
+        tag_id=OuterRef('pk'),
+        feed__status='approved'
+    ).order_by().values('tag_id').annotate(total=Count('*')).values('total')
+    Tag.objects.update(post_count=Coalesce(Subquery(rows), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_tag_name_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_tagged_posts, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='TagActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('tag', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='core.tag')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tagactivity',
+            index=models.Index(fields=['bucket', 'tag'], name='tag_activity_bucket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tagactivity',
+            constraint=models.UniqueConstraint(fields=('tag', 'bucket'), name='unique_tag_activity'),
+        ),
+    ]
@@ -3,6 +3,8 @@ Database Models
 """
 import os
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -53,12 +55,23 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
 
     objects = ProfileManager()
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['name']
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['followers_count'],
+                name='user_followers_count_idx'
+            ),
+        ]
+
     def get_full_name(self):
         self.name
 
@@ -69,59 +82,249 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.name
 
 
+class FeedManager(models.Manager):
+    """Leave the search vector, only read by the database, out of rows"""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
+
+
 class Feed(models.Model):
     """Feed model"""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        APPROVED = 'approved'
+        REJECTED = 'rejected'
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='feed'
+        related_name='feed',
+        db_index=False
     )
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     tags = models.ManyToManyField('Tag')
     image = models.ImageField(null=True, upload_to=feed_post_image_url)
+    renditions = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    # Weighted title and description lexemes, set by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = FeedManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-id'], name='feed_user_id_idx'),
+            GinIndex(fields=['search_vector'], name='feed_search_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class ImageBlob(models.Model):
+    """Stored image content, shared by every post with identical bytes"""
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+
 class Tag(models.Model):
     """Tag model"""
     name = models.CharField(max_length=255)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'name'], name='tag_user_name_idx'),
+            models.Index(fields=['name'], name='tag_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Follower(models.Model):
-    """Follower model"""
-    target_user = models.ForeignKey(
+class TagActivity(models.Model):
+    """Number of posts created in an hour with a tag"""
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='activity',
+        db_index=False
+    )
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tag', 'bucket'],
+                name='unique_tag_activity'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['bucket', 'tag'],
+                name='tag_activity_bucket_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.tag_id}@{self.bucket:%Y-%m-%d %H:00}'
+
+
+class Follow(models.Model):
+    """Follow edge from <follower> to <followee>"""
+    follower = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='following',
+        db_index=False
+    )
+    followee = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='followers',
+        db_index=False
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['follower', 'followee'],
+                name='unique_follow'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(follower=models.F('followee')),
+                name='follow_not_self'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['followee', '-id'],
+                name='follow_followee_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.follower_id}->{self.followee_id}'
+
+
+class TimelineEntry(models.Model):
+    """Materialized feed entry, one row per viewer and post"""
+    viewer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='follower',
+        related_name='timeline',
+        db_index=False
+    )
+    post = models.ForeignKey(
+        Feed,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
     )
-    follower_id = models.IntegerField()
-    follower_name = models.CharField(max_length=256)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['viewer', 'post'],
+                name='unique_timeline_entry'
+            )
+        ]
 
     def __str__(self):
-        return self.follower_name
+        return f'{self.viewer_id}:{self.post_id}'
 
 
-class Following(models.Model):
-    """Following Model"""
+class Like(models.Model):
+    """Like of a post by a user"""
+    post = models.ForeignKey(
+        Feed,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        db_index=False
+    )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='following',
+        related_name='likes'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'user'],
+                name='unique_like'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}+{self.post_id}'
+
 
+class Comment(models.Model):
+    """Comment on a post"""
+    post = models.ForeignKey(
+        Feed,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        db_index=False
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', '-id'], name='comment_post_id_idx')
+        ]
+
+    def __str__(self):
+        return self.body[:50]
+
+
+class PostCounterShard(models.Model):
+    """One of the rows the like and comment counts of a post are split
+    across"""
+    post = models.ForeignKey(
+        Feed,
+        on_delete=models.CASCADE,
+        related_name='counter_shards',
+        db_index=False
     )
-    following_id = models.IntegerField()
-    following_name = models.CharField(max_length=255)
+    shard = models.PositiveSmallIntegerField()
+    likes = models.IntegerField(default=0)
+    comments = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'shard'],
+                name='unique_post_counter_shard'
+            )
+        ]
 
     def __str__(self):
-        return self.following_name
+        return f'{self.post_id}#{self.shard}'
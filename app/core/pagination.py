@@ -0,0 +1,90 @@
+"""
+Pagination shared by the api endpoints
+"""
+from base64 import b64decode, b64encode
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """Cursor pagination keyed on descending id"""
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class RankCursorPagination(pagination.BasePagination):
+    """Forward cursor pagination over a descending (rank, id) order.
+
+    The queryset must be annotated with a float rank. The cursor holds
+    the rank and id of the last row of a page, so every page is read
+    with a keyset condition instead of an offset.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            return pagination._positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            rank, id = b64decode(encoded.encode()).decode().split(':')
+            return float(rank), int(id)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, rank, id):
+        encoded = b64encode(f'{rank!r}:{id}'.encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encoded
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            rank, id = cursor
+            queryset = queryset.filter(
+                Q(rank__lt=rank) | Q(rank=rank, id__lt=id)
+            )
+
+        rows = list(queryset.order_by('-rank', '-id')[:page_size + 1])
+        page = rows[:page_size]
+        self.next = None
+        if len(rows) > page_size:
+            self.next = self.encode_cursor(page[-1].rank, page[-1].id)
+
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.next, 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,17 @@
+"""
+OpenAPI schema extensions
+"""
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from drf_spectacular.plumbing import build_bearer_security_scheme_object
+
+
+class SignedTokenScheme(OpenApiAuthenticationExtension):
+    """Describe signed access tokens as bearer authentication"""
+    target_class = 'core.authentication.SignedTokenAuthentication'
+    name = 'signedTokenAuth'
+
+    def get_security_definition(self, auto_schema):
+        return build_bearer_security_scheme_object(
+            header_name='Authorization',
+            token_prefix='Bearer'
+        )
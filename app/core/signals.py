@@ -0,0 +1,31 @@
+"""
+Core signal receivers
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from core import authentication, tokens
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a deleted token from the cache"""
+    authentication.invalidate([instance.key])
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached copies of a changed user, e.g. when deactivated"""
+    if not created:
+        authentication.invalidate(
+            Token.objects.filter(user=instance).values_list('key', flat=True)
+        )
+    if not instance.is_active:
+        tokens.revoke_user(instance.id)
+
+
+@receiver(post_delete, sender=get_user_model())
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    """Stop accepting signed tokens of a deleted user"""
+    tokens.revoke_user(instance.id)
@@ -0,0 +1,49 @@
+"""
+Test runner for the project
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+from django.test.utils import iter_test_cases, override_settings
+
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+    },
+}
+
+
+def clear_caches():
+    """Empty every configured cache"""
+    for cache in caches.all():
+        cache.clear()
+
+
+class TestRunner(DiscoverRunner):
+    """Handle background work inline so tests see its effects, caching
+    in local memory emptied after every test.
+
+    Inline work runs once its transaction commits, so tests relying on
+    it use TransactionTestCase or captureOnCommitCallbacks().
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.WORKERS_INLINE = True
+        self._test_caches = override_settings(CACHES=TEST_CACHES)
+        self._test_caches.enable()
+
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        for test in iter_test_cases(suite):
+            test.addCleanup(clear_caches)
+        return suite
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_caches.disable()
+        super().teardown_test_environment(**kwargs)
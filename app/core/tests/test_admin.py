@@ -44,3 +44,10 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def test_feed_list_filters_by_status(self):
+        """Test posts can be filtered by moderation status"""
+        url = reverse('admin:core_feed_changelist')
+        res = self.client.get(url, {'status__exact': 'pending'})
+
+        self.assertEqual(res.status_code, 200)
@@ -0,0 +1,107 @@
+"""
+Test cached token authentication
+"""
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from core import authentication
+from core.authentication import CachedTokenAuthentication, LocalCache
+
+
+class LocalCacheTests(SimpleTestCase):
+    """Test the in-process LRU cache"""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache never grows past its size"""
+        local = LocalCache(max_size=2, timeout=60)
+        local.set('a', 1)
+        local.set('b', 2)
+        local.get('a')
+
+        local.set('c', 3)
+
+        self.assertEqual(local.get('a'), 1)
+        self.assertIsNone(local.get('b'))
+        self.assertEqual(local.get('c'), 3)
+
+    def test_entries_expire(self):
+        """Test entries are dropped after the timeout"""
+        local = LocalCache(max_size=2, timeout=60)
+        with mock.patch('core.authentication.time.monotonic') as now:
+            now.return_value = 100
+            local.set('a', 1)
+            now.return_value = 161
+
+            self.assertIsNone(local.get('a'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are cached and invalidated"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+        authentication.local_cache.clear()
+        cache.clear()
+
+    def test_lookup_is_cached(self):
+        """Test only the first request queries the token"""
+        with self.assertNumQueries(1):
+            self.auth.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_requests_get_their_own_user(self):
+        """Test cached users are not shared between requests"""
+        first = self.auth.authenticate_credentials(self.token.key)[0]
+        second = self.auth.authenticate_credentials(self.token.key)[0]
+
+        self.assertIsNot(first, second)
+
+    def test_shared_tier_fills_local_cache(self):
+        """Test a process can reuse lookups cached by another"""
+        self.auth.authenticate_credentials(self.token.key)
+        authentication.local_cache.clear()
+
+        with self.assertNumQueries(0):
+            self.auth.authenticate_credentials(self.token.key)
+
+    @override_settings(AUTH_TOKEN_CACHE_ALIAS='')
+    def test_shared_tier_is_optional(self):
+        """Test lookups work with only the local tier"""
+        self.auth.authenticate_credentials(self.token.key)
+
+        self.assertIsNone(cache.get(f'auth:token:{self.token.key}'))
+        with self.assertNumQueries(0):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_deleted_token_is_rejected(self):
+        """Test deleting a token invalidates the cache"""
+        self.auth.authenticate_credentials(self.token.key)
+
+        self.token.delete()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating a user invalidates the cache"""
+        self.auth.authenticate_credentials(self.token.key)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
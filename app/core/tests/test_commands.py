@@ -3,7 +3,8 @@ Test custom management commands.
 """
 from django.core.management import call_command
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from io import StringIO
+from django.test import SimpleTestCase, TestCase
 from unittest.mock import patch
 from psycopg2 import OperationalError as Psycopg2Error
 
@@ -30,3 +31,17 @@ class CommandsTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 7)
         patched_check.assert_called_with(databases=['default'])
+
+
+class BenchAuthCommandTests(TestCase):
+    """Test authentication benchmark command"""
+
+    def test_bench_auth_reports_every_class(self):
+        """Test benchmark reports cost per authentication class"""
+        out = StringIO()
+
+        call_command('bench_auth', requests=5, stdout=out)
+
+        output = out.getvalue()
+        for name in ['drf token', 'cached token', 'signed token']:
+            self.assertIn(f'{name}:', output)
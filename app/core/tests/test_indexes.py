@@ -0,0 +1,74 @@
+"""
+Test the feed hot paths are served by indexes.
+"""
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from core import models
+from feed import timeline
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Checks Postgres plans')
+class IndexUsageTests(TestCase):
+    """Check query plans with EXPLAIN"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass'
+        )
+        # Tables are tiny in tests, make the planner prefer indexes
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        """Assert the query plan scans the given index"""
+        plan = queryset.explain()
+        self.assertIn('Index', plan)
+        self.assertIn(index_name, plan)
+
+    def test_author_posts_use_index(self):
+        """Test newest posts of a user are read from the composite index"""
+        queryset = models.Feed.objects.filter(
+            user=self.user
+        ).order_by('-id')[:20]
+
+        self.assertUsesIndex(queryset, 'feed_user_id_idx')
+        self.assertNotIn('Sort', queryset.explain())
+
+    def test_timeline_uses_index(self):
+        """Test the feed list scans the viewer timeline index"""
+        queryset = timeline.posts_for(self.user).order_by('-id')[:20]
+
+        self.assertUsesIndex(queryset, 'unique_timeline_entry')
+
+    def test_follower_lookup_uses_index(self):
+        """Test newest followers of a user are read from the index"""
+        queryset = models.Follow.objects.filter(
+            followee=self.user
+        ).order_by('-id')[:20]
+
+        self.assertUsesIndex(queryset, 'follow_followee_idx')
+
+    def test_following_lookup_uses_index(self):
+        """Test followees of a user are read from the unique index"""
+        queryset = models.Follow.objects.filter(follower=self.user)
+
+        self.assertUsesIndex(queryset, 'unique_follow')
+
+    def test_tag_lookup_uses_index(self):
+        """Test tags are resolved by user and name from an index"""
+        queryset = models.Tag.objects.filter(user=self.user, name='tag')
+
+        # Both tag indexes lead with a column of the lookup, the planner
+        # may pick either one
+        plan = queryset.explain()
+        self.assertIn('Index', plan)
+        self.assertRegex(plan, 'tag_user_name_idx|tag_name_idx')
+
+    def test_tag_name_lookup_uses_index(self):
+        """Test tag names of every user are resolved from the name index"""
+        queryset = models.Tag.objects.filter(name__in=['tag', 'other'])
+
+        self.assertUsesIndex(queryset, 'tag_name_idx')
@@ -0,0 +1,76 @@
+"""
+Test metrics endpoint
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import metrics
+
+
+METRICS_URL = reverse('metrics')
+
+
+class MetricsApiTests(TestCase):
+    """Test metrics api"""
+
+    def setUp(self):
+        self.client = APIClient()
+        metrics.reset()
+
+    def test_metrics_require_staff(self):
+        """Test regular users can't read metrics"""
+        user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_staff_can_read_metrics(self):
+        """Test staff users get the counters"""
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(admin)
+        metrics.incr('sample.counter', 2)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['sample.counter'], 2)
+
+    def test_hit_ratios_are_reported(self):
+        """Test hits and misses counters get a hit ratio"""
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(admin)
+        metrics.incr('cache.sample.hits', 3)
+        metrics.incr('cache.sample.misses')
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.data['cache.sample.hit_ratio'], 0.75)
+
+    def test_observed_means_are_reported(self):
+        """Test observed samples get a mean"""
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(admin)
+        metrics.observe('sample.latency_ms', 10)
+        metrics.observe('sample.latency_ms', 30)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.data['sample.latency_ms.mean'], 20)
+        self.assertEqual(res.data['sample.latency_ms.max'], 30)
+        self.assertIn('workers.moderation.depth', res.data)
@@ -0,0 +1,183 @@
+"""
+Test login throttling and password hashing cost
+"""
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    check_password,
+    identify_hasher,
+    make_password,
+)
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.request import Request
+from rest_framework.parsers import JSONParser
+from core import metrics
+from core.throttling import LoginEmailThrottle, SlidingWindowThrottle
+
+
+TOKEN_URL = reverse('user:token')
+SIGNED_TOKEN_URL = reverse('user:token-signed')
+
+
+def rates(**scopes):
+    """Patch the configured rate of login throttle scopes"""
+    return mock.patch.dict(SlidingWindowThrottle.THROTTLE_RATES, {
+        scope.replace('_', '-'): rate for scope, rate in scopes.items()
+    })
+
+
+def login_request(email):
+    """Return a parsed login request"""
+    request = APIRequestFactory().post(
+        TOKEN_URL, {'email': email}, format='json'
+    )
+    return Request(request, parsers=[JSONParser()])
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    """Test the sliding window counter"""
+
+    def setUp(self):
+        cache.clear()
+
+    def _throttle(self, now):
+        throttle = LoginEmailThrottle()
+        throttle.timer = lambda: now
+        return throttle
+
+    @rates(login_email='2/min')
+    def test_limit_within_window(self):
+        """Test requests over the rate are refused"""
+        allowed = [
+            self._throttle(10).allow_request(login_request('a@b.com'), None)
+            for _ in range(3)
+        ]
+
+        self.assertEqual(allowed, [True, True, False])
+
+    @rates(login_email='4/min')
+    def test_previous_window_is_weighted(self):
+        """Test the previous window counts for its overlapping part"""
+        for _ in range(4):
+            self._throttle(50).allow_request(login_request('a@b.com'), None)
+
+        # A quarter into the next window 3 of the old 4 still count
+        self.assertTrue(
+            self._throttle(75).allow_request(login_request('a@b.com'), None)
+        )
+        throttle = self._throttle(75)
+        self.assertFalse(
+            throttle.allow_request(login_request('a@b.com'), None)
+        )
+        self.assertEqual(throttle.wait(), 45)
+        # Two thirds in the old window weighs less than 2 requests
+        self.assertTrue(
+            self._throttle(100).allow_request(login_request('a@b.com'), None)
+        )
+
+    @rates(login_email='1/min')
+    def test_emails_are_counted_case_insensitively(self):
+        """Test case variants share one counter"""
+        self._throttle(10).allow_request(login_request('A@b.com'), None)
+
+        self.assertFalse(
+            self._throttle(10).allow_request(login_request('a@B.com'), None)
+        )
+
+
+class LoginThrottleApiTests(TestCase):
+    """Test throttled login endpoints"""
+
+    def setUp(self):
+        get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        cache.clear()
+        metrics.reset()
+
+    @rates(login_email='2/min')
+    def test_throttled_before_hashing(self):
+        """Test refused attempts never reach the password hasher"""
+        payload = {'email': 'test@example.com', 'password': 'wrongpass'}
+        for _ in range(2):
+            self.client.post(TOKEN_URL, payload)
+        hashed = metrics.snapshot()['auth.hashing_ms.count']
+
+        res = self.client.post(SIGNED_TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        counters = metrics.snapshot()
+        self.assertEqual(counters['auth.hashing_ms.count'], hashed)
+        self.assertEqual(counters['auth.throttled.login-email'], 1)
+        self.assertEqual(counters['auth.login.failed'], 2)
+
+    @rates(login_ip='1/min')
+    def test_ip_throttle_across_emails(self):
+        """Test one address can't spray many accounts"""
+        self.client.post(
+            TOKEN_URL, {'email': 'a@example.com', 'password': 'x'}
+        )
+
+        res = self.client.post(
+            TOKEN_URL, {'email': 'b@example.com', 'password': 'x'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(login_ip='1/min')
+    def test_forwarded_for_does_not_reset_limit(self):
+        """Test a spoofed X-Forwarded-For header isn't a new client"""
+        self.client.post(
+            TOKEN_URL,
+            {'email': 'a@example.com', 'password': 'x'},
+            HTTP_X_FORWARDED_FOR='10.0.0.1'
+        )
+
+        res = self.client.post(
+            TOKEN_URL,
+            {'email': 'b@example.com', 'password': 'x'},
+            HTTP_X_FORWARDED_FOR='10.0.0.2'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class HasherCostTests(SimpleTestCase):
+    """Test the configurable hasher cost"""
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_pbkdf2_iterations_from_settings(self):
+        """Test new hashes use the configured cost"""
+        encoded = make_password('testpass')
+
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(check_password('testpass', encoded))
+
+    def test_cost_change_upgrades_hash(self):
+        """Test hashes with another cost are marked for upgrade"""
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            encoded = make_password('testpass')
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertTrue(identify_hasher(encoded).must_update(encoded))
+
+    @override_settings(
+        PASSWORD_HASHERS=['core.hashers.ScryptPasswordHasher'],
+        PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10
+    )
+    def test_scrypt_can_be_selected(self):
+        """Test the hasher is chosen by settings"""
+        metrics.reset()
+
+        encoded = make_password('testpass')
+
+        self.assertTrue(encoded.startswith('scrypt$'))
+        self.assertIn('$1024$', encoded)
+        self.assertEqual(metrics.snapshot()['auth.hashing_ms.count'], 1)
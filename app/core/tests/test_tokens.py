@@ -0,0 +1,207 @@
+"""
+Test signed access and refresh tokens
+"""
+import time
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import tokens
+from core.models import Feed
+
+
+SIGNED_TOKEN_URL = reverse('user:token-signed')
+REFRESH_URL = reverse('user:token-refresh')
+REVOKE_URL = reverse('user:token-revoke')
+FEED_URL = reverse('feed:posts-list')
+
+
+def create_user(**params):
+    """Create and return user"""
+    defaults = {
+        'email': 'test@example.com',
+        'password': 'testpass',
+        'username': 'testuser',
+        'name': 'Test Name',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+class TokenTests(TestCase):
+    """Test issuing and verifying signed tokens"""
+
+    def setUp(self):
+        self.user = create_user()
+        cache.clear()
+        caches['tokens'].clear()
+
+    def test_access_token_carries_user(self):
+        """Test the user is rebuilt from the token claims"""
+        claims = tokens.verify(tokens.issue(self.user)['access'], 'access')
+
+        user = tokens.user_from_claims(claims)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, self.user.email)
+        self.assertFalse(user.is_staff)
+
+    def test_expired_token_rejected(self):
+        """Test tokens stop working after their lifetime"""
+        access = tokens.issue(self.user)['access']
+
+        with mock.patch('time.time', return_value=time.time() + 301):
+            with self.assertRaises(tokens.InvalidToken):
+                tokens.verify(access, 'access')
+
+    def test_token_kinds_are_not_interchangeable(self):
+        """Test a refresh token can't authenticate requests"""
+        refresh = tokens.issue(self.user)['refresh']
+
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.verify(refresh, 'access')
+
+    def test_tampered_token_rejected(self):
+        """Test the signature covers the claims"""
+        access = tokens.issue(self.user)['access']
+
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.verify(access[:-2] + 'xx', 'access')
+
+    def test_revoked_token_rejected(self):
+        """Test a single token can be denied"""
+        pair = tokens.issue(self.user)
+        claims = tokens.verify(pair['access'], 'access')
+
+        tokens.revoke(claims)
+
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.verify(pair['access'], 'access')
+        tokens.verify(pair['refresh'], 'refresh')
+
+    def test_token_consumed_once(self):
+        """Test a single use token can't be consumed twice"""
+        claims = tokens.verify(tokens.issue(self.user)['refresh'], 'refresh')
+
+        tokens.consume(claims)
+
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.consume(claims)
+
+    def test_revocations_outlive_default_cache(self):
+        """Test the deny-list is kept apart from the default cache"""
+        access = tokens.issue(self.user)['access']
+        tokens.revoke(tokens.verify(access, 'access'))
+
+        cache.clear()
+
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.verify(access, 'access')
+
+    def test_deactivating_user_revokes_tokens(self):
+        """Test every token issued before deactivation is denied"""
+        pair = tokens.issue(self.user)
+
+        self.user.is_active = False
+        self.user.save()
+
+        for kind in ['access', 'refresh']:
+            with self.assertRaises(tokens.InvalidToken):
+                tokens.verify(pair[kind], kind)
+
+
+class SignedTokenApiTests(TestCase):
+    """Test the signed token endpoints"""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        cache.clear()
+        caches['tokens'].clear()
+
+    def _pair(self):
+        res = self.client.post(SIGNED_TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'testpass',
+        })
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_invalid_credentials_get_no_tokens(self):
+        """Test a wrong password is refused"""
+        res = self.client.post(SIGNED_TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'wrongpass',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('access', res.data)
+
+    def test_feed_authenticates_without_auth_query(self):
+        """Test bearer access tokens need no database lookup"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Feed.objects.create(user=self.user, title='Sample')
+        pair = self._pair()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {pair["access"]}')
+        self.client.get(FEED_URL)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(FEED_URL, {'page_size': 5})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_refresh_rotates_tokens(self):
+        """Test a refresh token gives a new pair and can't be reused"""
+        pair = self._pair()
+
+        res = self.client.post(REFRESH_URL, {'refresh': pair['refresh']})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['access'], pair['access'])
+        res = self.client.post(REFRESH_URL, {'refresh': pair['refresh']})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_refresh_rejected_for_inactive_user(self):
+        """Test refreshing checks the user is still active"""
+        pair = self._pair()
+        get_user_model().objects.filter(id=self.user.id).update(
+            is_active=False
+        )
+
+        res = self.client.post(REFRESH_URL, {'refresh': pair['refresh']})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_revoke_denies_access_and_refresh(self):
+        """Test logging out denies both tokens"""
+        pair = self._pair()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {pair["access"]}')
+
+        res = self.client.post(REVOKE_URL, {'refresh': pair['refresh']})
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        res = self.client.get(FEED_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        res = self.client.post(REFRESH_URL, {'refresh': pair['refresh']})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_revoke_refuses_other_users_refresh(self):
+        """Test a user can't revoke another user's refresh token"""
+        create_user(email='other@example.com', username='other')
+        other = self.client.post(SIGNED_TOKEN_URL, {
+            'email': 'other@example.com',
+            'password': 'testpass',
+        }).data
+        pair = self._pair()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {pair["access"]}')
+
+        res = self.client.post(REVOKE_URL, {'refresh': other['refresh']})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.credentials()
+        res = self.client.post(REFRESH_URL, {'refresh': other['refresh']})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
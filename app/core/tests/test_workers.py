@@ -0,0 +1,124 @@
+"""
+Test background worker pools
+"""
+import threading
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from core import metrics, workers
+
+
+class InlinePoolTests(TransactionTestCase):
+    """Test inline worker pools"""
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_inline_pool_handles_items_on_submit(self):
+        """Test inline mode handles a batch synchronously"""
+        handled = []
+        pool = workers.Pool('test-inline', handled.append)
+
+        pool.submit([1, 2])
+
+        self.assertEqual(handled, [[1, 2]])
+        counters = metrics.snapshot()
+        self.assertEqual(counters['workers.test-inline.processed'], 2)
+        self.assertEqual(counters['workers.test-inline.latency_ms.count'], 2)
+
+    def test_inline_pool_waits_for_commit(self):
+        """Test inline batches run once the submitting transaction
+        commits"""
+        handled = []
+        pool = workers.Pool('test-inline-atomic', handled.append)
+
+        with transaction.atomic():
+            pool.submit([1])
+            self.assertEqual(handled, [])
+
+        self.assertEqual(handled, [[1]])
+
+    def test_inline_pool_drops_rolled_back_items(self):
+        """Test items of a rolled back transaction are never handled"""
+        handled = []
+        pool = workers.Pool('test-inline-rollback', handled.append)
+
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                pool.submit([1])
+                raise ValueError()
+
+        self.assertEqual(handled, [])
+
+
+class PoolTests(SimpleTestCase):
+    """Test worker pools"""
+
+    def setUp(self):
+        metrics.reset()
+
+    @override_settings(WORKERS_INLINE=False)
+    def test_threads_drain_queue_in_batches(self):
+        """Test worker threads handle every queued item"""
+        handled = []
+        done = threading.Event()
+
+        def handler(batch):
+            handled.extend(batch)
+            if len(handled) == 5:
+                done.set()
+
+        pool = workers.Pool('test-threads', handler, workers=1, batch_size=2)
+        pool._put([1, 2, 3, 4, 5])
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(sorted(handled), [1, 2, 3, 4, 5])
+        self.assertEqual(pool.depth(), 0)
+        self.assertIn('workers.test-threads.depth', workers.depths())
+
+    @override_settings(WORKERS_INLINE=False)
+    def test_failed_batch_is_counted(self):
+        """Test a failing handler doesn't kill the worker"""
+        done = threading.Event()
+
+        def handler(batch):
+            if batch == ['bad']:
+                raise ValueError(batch)
+            done.set()
+
+        pool = workers.Pool('test-errors', handler, workers=1, batch_size=1)
+        with self.assertLogs('core.workers', 'ERROR'):
+            pool._put(['bad', 'good'])
+            self.assertTrue(done.wait(5))
+
+        self.assertEqual(metrics.snapshot()['workers.test-errors.errors'], 1)
+
+    @override_settings(WORKERS_INLINE=False, WORKERS_RECOVERY_INTERVAL=0.01)
+    def test_sweep_requeues_lost_items(self):
+        """Test an idle pool periodically queues the items it recovers"""
+        lost = [1, 2]
+        handled = []
+        done = threading.Event()
+
+        def recover():
+            items, lost[:] = list(lost), []
+            return items
+
+        def handler(batch):
+            handled.extend(batch)
+            if len(handled) == 2:
+                done.set()
+
+        pool = workers.Pool(
+            'test-recovery',
+            handler,
+            workers=1,
+            recover=recover
+        )
+        with self.assertLogs('core.workers', 'WARNING'):
+            pool._start()
+            self.assertTrue(done.wait(5))
+
+        self.assertEqual(sorted(handled), [1, 2])
+        self.assertEqual(
+            metrics.snapshot()['workers.test-recovery.recovered'], 2
+        )
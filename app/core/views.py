@@ -0,0 +1,30 @@
+"""
+Core views
+"""
+from drf_spectacular.utils import extend_schema
+from rest_framework import views, permissions, response
+from core import metrics, workers
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
+
+
+class MetricsView(views.APIView):
+    """Expose in-process metrics to staff users"""
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses={200: {
+        'type': 'object',
+        'additionalProperties': {'type': 'number'},
+    }})
+    def get(self, request):
+        counters = metrics.snapshot()
+        counters.update(metrics.hit_ratios(counters))
+        counters.update(metrics.means(counters))
+        counters.update(workers.depths())
+        return response.Response(counters)
@@ -0,0 +1,171 @@
+"""
+Background worker pools fed from in-process queues.
+
+Each pool drains its queue in batches on daemon threads. Items are only
+queued once the submitting transaction commits. With WORKERS_INLINE set,
+batches are handled synchronously on commit instead.
+
+Queues live in memory, so a reload or crash loses whatever was waiting.
+Pools given a recover callable find such work again from the database:
+every WORKERS_RECOVERY_INTERVAL seconds while their queue is idle, and
+all at once through the recover_jobs command on startup.
+"""
+import logging
+import queue
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from core import metrics
+
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+
+
+class Pool:
+    """Threads handling queued items in batches"""
+
+    def __init__(self, name, handler, workers=2, batch_size=100,
+                 recover=None):
+        self.name = name
+        self.handler = handler
+        self.recover = recover
+        self.workers = workers
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        _pools[name] = self
+
+    def depth(self):
+        """Return the number of items waiting to be handled"""
+        return self._queue.qsize()
+
+    def submit(self, items):
+        """Queue items for the workers, or handle them inline, once the
+        transaction commits"""
+        items = list(items)
+        if not items:
+            return
+
+        if settings.WORKERS_INLINE:
+            transaction.on_commit(lambda: self._handle(
+                [(item, time.monotonic()) for item in items]
+            ))
+        else:
+            transaction.on_commit(lambda: self._put(items))
+
+    def _put(self, items):
+        self._start()
+        queued_at = time.monotonic()
+        for item in items:
+            self._queue.put((item, queued_at))
+
+    def _start(self):
+        """Start the worker threads on first use in this process"""
+        with self._lock:
+            if self._threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f'{self.name}-{number}',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            if self.recover is not None:
+                thread = threading.Thread(
+                    target=self._sweep,
+                    name=f'{self.name}-recovery',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_batch(self):
+        """Block for one item, then take whatever else is waiting"""
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            close_old_connections()
+            try:
+                self._handle(batch)
+            except Exception:
+                logger.exception('%s worker failed on a batch', self.name)
+                metrics.incr(f'workers.{self.name}.errors', len(batch))
+            finally:
+                close_old_connections()
+
+    def _sweep(self):
+        """Periodically queue work lost from this or another process"""
+        while True:
+            time.sleep(settings.WORKERS_RECOVERY_INTERVAL)
+            if self.depth():
+                # Queued items may still be waiting, so don't add them twice
+                continue
+            close_old_connections()
+            try:
+                items = list(self.recover())
+            except Exception:
+                logger.exception('%s recovery failed', self.name)
+                continue
+            finally:
+                close_old_connections()
+            if items:
+                logger.warning('Requeued %d lost %s items', len(items),
+                               self.name)
+                metrics.incr(f'workers.{self.name}.recovered', len(items))
+                self._put(items)
+
+    def recover_now(self):
+        """Handle every lost item in batches on this thread and return
+        how many there were"""
+        items = list(self.recover())
+        for start in range(0, len(items), self.batch_size):
+            queued_at = time.monotonic()
+            self._handle([
+                (item, queued_at)
+                for item in items[start:start + self.batch_size]
+            ])
+        metrics.incr(f'workers.{self.name}.recovered', len(items))
+        return len(items)
+
+    def _handle(self, batch):
+        self.handler([item for item, _ in batch])
+        done_at = time.monotonic()
+        metrics.incr(f'workers.{self.name}.processed', len(batch))
+        for _, queued_at in batch:
+            metrics.observe(
+                f'workers.{self.name}.latency_ms',
+                (done_at - queued_at) * 1000
+            )
+
+
+def depths():
+    """Return the queue depth of every pool"""
+    return {
+        f'workers.{name}.depth': pool.depth()
+        for name, pool in _pools.items()
+    }
+
+
+def recover():
+    """Handle the lost items of every recoverable pool and return how
+    many each had"""
+    return {
+        name: pool.recover_now()
+        for name, pool in _pools.items()
+        if pool.recover is not None
+    }
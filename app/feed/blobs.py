@@ -0,0 +1,96 @@
+"""
+Content addressed storage of post images.
+
+Every distinct image is stored once under its SHA-256 digest and counted
+in an ImageBlob row. Posts reference the stored file by name and release
+it when they drop it; the file is deleted with its last reference.
+"""
+import hashlib
+import os
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from core.models import ImageBlob
+
+
+def digest(upload):
+    """Return the SHA-256 of an upload, reusing the one computed while
+    it streamed in"""
+    known = getattr(upload, 'sha256', None)
+    if known:
+        return known
+
+    sha256 = hashlib.sha256()
+    for chunk in upload.chunks():
+        sha256.update(chunk)
+    upload.seek(0)
+    return sha256.hexdigest()
+
+
+def blob_name(content_digest, filename):
+    """Return the storage path of content with the given digest"""
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join(
+        'uploads', 'blobs',
+        content_digest[:2], content_digest[2:4],
+        f'{content_digest}{ext}'
+    )
+
+
+def _write(name, upload):
+    """Store the upload under exactly the given name"""
+    saved = default_storage.save(name, upload)
+    if saved != name:
+        # Someone else stored the same bytes first
+        default_storage.delete(saved)
+
+
+def store(upload, content_digest=None):
+    """Take a reference to the blob holding the upload's bytes, storing
+    them if they are new, and return the blob's file name"""
+    content_digest = content_digest or digest(upload)
+    with transaction.atomic():
+        blob, created = ImageBlob.objects.select_for_update().get_or_create(
+            digest=content_digest,
+            defaults={
+                'name': blob_name(content_digest, upload.name),
+                'size': upload.size,
+            }
+        )
+        if created or not default_storage.exists(blob.name):
+            _write(blob.name, upload)
+        ImageBlob.objects.filter(pk=blob.pk).update(
+            refcount=F('refcount') + 1
+        )
+
+    return blob.name
+
+
+def release(name):
+    """Drop one reference to a blob, deleting it after the last one.
+
+    Files stored before content addressing have no blob and are left
+    alone.
+    """
+    if not name:
+        return
+
+    with transaction.atomic():
+        blob = ImageBlob.objects.select_for_update().filter(
+            name=name
+        ).first()
+        if blob is None:
+            return
+        if blob.refcount > 1:
+            ImageBlob.objects.filter(pk=blob.pk).update(
+                refcount=F('refcount') - 1
+            )
+            return
+        blob.delete()
+        transaction.on_commit(lambda: _delete_unused(name))
+
+
+def _delete_unused(name):
+    """Delete a released file unless it was stored again meanwhile"""
+    if not ImageBlob.objects.filter(name=name).exists():
+        default_storage.delete(name)
@@ -0,0 +1,140 @@
+"""
+Likes, comments and their sharded counts.
+
+The like and comment counts of a post are split across up to
+FEED_COUNTER_SHARDS PostCounterShard rows. Every like, unlike, comment
+and deleted comment moves one randomly picked shard, so concurrent
+writers to a viral post rarely wait on the same row lock and never lock
+the Feed row itself. Reads add the shards up in a subquery, giving a
+page of posts its counts in the query that loads it.
+"""
+import random
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from core.models import Comment, Like, PostCounterShard
+from feed import response_cache
+
+
+LIKES = 'likes'
+COMMENTS = 'comments'
+
+
+def _bump(post_id, counter, delta):
+    """Add <delta> to the <counter> of one shard of the post, dropping
+    its cached representation once the change commits"""
+    shard = random.randrange(settings.FEED_COUNTER_SHARDS)
+    PostCounterShard.objects.bulk_create(
+        [PostCounterShard(post_id=post_id, shard=shard)],
+        ignore_conflicts=True
+    )
+    PostCounterShard.objects.filter(post_id=post_id, shard=shard).update(
+        **{counter: F(counter) + delta}
+    )
+    transaction.on_commit(
+        lambda: response_cache.invalidate_posts([post_id])
+    )
+
+
+def like(user, post):
+    """Like <post> as <user>, returning whether it wasn't liked yet"""
+    try:
+        with transaction.atomic():
+            Like.objects.create(user=user, post=post)
+            _bump(post.id, LIKES, 1)
+    except IntegrityError:
+        return False
+
+    return True
+
+
+def unlike(user, post):
+    """Remove the like of <user>, returning whether it existed"""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post=post).delete()
+        if deleted:
+            _bump(post.id, LIKES, -1)
+
+    return deleted > 0
+
+
+def add_comment(user, post, body):
+    """Create and return a comment of <user> on <post>"""
+    with transaction.atomic():
+        comment = Comment.objects.create(user=user, post=post, body=body)
+        _bump(post.id, COMMENTS, 1)
+
+    return comment
+
+
+def delete_comment(comment):
+    """Delete a comment and uncount it"""
+    with transaction.atomic():
+        comment.delete()
+        _bump(comment.post_id, COMMENTS, -1)
+
+
+def uncount_user(user_id):
+    """Uncount the likes and comments of a user about to be deleted on
+    the posts of other users"""
+    for counter, model in [(LIKES, Like), (COMMENTS, Comment)]:
+        totals = model.objects.filter(user_id=user_id).exclude(
+            post__user_id=user_id
+        ).order_by().values('post_id').annotate(
+            total=Count('*')
+        ).values_list('post_id', 'total')
+        for post_id, total in totals:
+            _bump(post_id, counter, -total)
+
+
+def _total(counter):
+    shards = PostCounterShard.objects.filter(
+        post_id=OuterRef('pk')
+    ).order_by().values('post_id').annotate(
+        total=Sum(counter)
+    ).values('total')
+
+    return Coalesce(Subquery(shards), 0)
+
+
+def with_counts(queryset):
+    """Annotate posts with likes_count and comments_count"""
+    return queryset.annotate(
+        likes_count=_total(LIKES),
+        comments_count=_total(COMMENTS)
+    )
+
+
+def reconcile(batch_size=1000):
+    """Rewrite the shards of every engaged post from its likes and
+    comments, returning the number of posts counted"""
+    with transaction.atomic():
+        likes = dict(
+            Like.objects.order_by().values('post_id').annotate(
+                total=Count('*')
+            ).values_list('post_id', 'total')
+        )
+        comments = dict(
+            Comment.objects.order_by().values('post_id').annotate(
+                total=Count('*')
+            ).values_list('post_id', 'total')
+        )
+        post_ids = sorted(likes.keys() | comments.keys())
+
+        PostCounterShard.objects.all().delete()
+        PostCounterShard.objects.bulk_create(
+            [
+                PostCounterShard(
+                    post_id=id,
+                    shard=0,
+                    likes=likes.get(id, 0),
+                    comments=comments.get(id, 0)
+                )
+                for id in post_ids
+            ],
+            batch_size=batch_size
+        )
+    response_cache.invalidate_posts(post_ids)
+
+    return len(post_ids)
@@ -0,0 +1,144 @@
+"""
+Background processing of uploaded post images.
+
+Uploads are stored as received and queued here. Workers decode them with
+Pillow, apply the EXIF orientation, drop every other piece of metadata
+and store resized renditions that feed clients load instead of the
+original.
+"""
+import io
+import logging
+import os
+import time
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+from core import metrics, workers
+from core.models import Feed
+from feed import response_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels of every rendition
+RENDITIONS = {
+    'thumbnail': 160,
+    'feed': 720,
+    'full': 1600,
+}
+
+
+def _format():
+    """Return the Pillow format and file extension renditions use"""
+    if features.check('webp'):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+
+def _encode(image, size, image_format):
+    """Return the image shrunk to fit size, encoded without metadata"""
+    rendition = image.copy()
+    rendition.thumbnail((size, size), Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and rendition.mode != 'RGB':
+        rendition = rendition.convert('RGB')
+
+    output = io.BytesIO()
+    rendition.save(
+        output,
+        format=image_format,
+        quality=settings.FEED_IMAGE_QUALITY
+    )
+    return output.getvalue()
+
+
+def _decode(image_file):
+    """Open an upload, upright and in a mode every format can save"""
+    image = Image.open(image_file)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ['RGB', 'RGBA']:
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    return image
+
+
+def render(post):
+    """Store the renditions of the post image and return their paths"""
+    image_format, extension = _format()
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    with post.image.open('rb') as image_file:
+        image = _decode(image_file)
+
+    paths = {}
+    for name, size in RENDITIONS.items():
+        path = os.path.join(
+            'uploads', 'posts', 'renditions', f'{stem}-{name}.{extension}'
+        )
+        data = _encode(image, size, image_format)
+        paths[name] = default_storage.save(path, ContentFile(data))
+
+    return paths
+
+
+def delete_renditions(paths):
+    """Remove rendition files given as a name to path mapping"""
+    for path in paths.values():
+        default_storage.delete(path)
+
+
+def process(post_ids):
+    """Render the images of a batch of posts"""
+    posts = Feed.objects.filter(
+        id__in=post_ids,
+        image__isnull=False
+    ).exclude(image='')
+    for post in posts:
+        start = time.perf_counter()
+        try:
+            paths = render(post)
+        except Exception:
+            logger.exception('Could not process image of post %s', post.id)
+            metrics.incr('images.failed')
+            continue
+
+        updated = Feed.objects.filter(
+            id=post.id, image=post.image.name
+        ).update(renditions=paths)
+        if not updated:
+            # The image was replaced while this one was being processed
+            delete_renditions(paths)
+            continue
+        delete_renditions(post.renditions)
+        response_cache.invalidate_posts([post.id])
+
+        elapsed = (time.perf_counter() - start) * 1000
+        saved = post.image.size - default_storage.size(paths['full'])
+        metrics.incr('images.processed')
+        metrics.observe('images.processing_ms', elapsed)
+        metrics.observe('images.bytes_saved', saved)
+        logger.info(
+            'Processed image of post %s in %.1f ms, saved %d bytes',
+            post.id, elapsed, saved
+        )
+
+
+def unprocessed():
+    """Return ids of posts whose image has no renditions yet"""
+    return Feed.objects.filter(
+        image__isnull=False,
+        renditions={}
+    ).exclude(image='').order_by('id').values_list('id', flat=True)
+
+
+pool = workers.Pool(
+    'images',
+    process,
+    workers=settings.FEED_IMAGE_WORKERS,
+    batch_size=10,
+    recover=unprocessed
+)
+
+
+def submit(post_ids):
+    """Queue post images for processing"""
+    pool.submit(post_ids)
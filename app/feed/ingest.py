@@ -0,0 +1,73 @@
+"""
+Bulk post ingestion for importers
+"""
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+from core.models import Feed
+from feed import moderation, response_cache, tagging
+from feed.serializers import PostDetailsSerializer
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _insert(user, chunk):
+    """Insert validated posts with their tags and queue them for
+    moderation"""
+    posts = Feed.objects.bulk_create([
+        Feed(
+            user=user,
+            **{key: value for key, value in data.items() if key != 'tags'}
+        )
+        for data in chunk
+    ])
+
+    names = [tag['name'] for data in chunk for tag in data.get('tags', [])]
+    tags = {tag.name: tag for tag in tagging.resolve(user, names)}
+    uses = {
+        (post.id, tags[tag['name']].id)
+        for post, data in zip(posts, chunk)
+        for tag in data.get('tags', [])
+    }
+    Feed.tags.through.objects.bulk_create(
+        [
+            Feed.tags.through(feed_id=post_id, tag_id=tag_id)
+            for post_id, tag_id in uses
+        ],
+        ignore_conflicts=True
+    )
+
+    response_cache.touch_tags([tag.id for tag in tags.values()])
+    moderation.submit([post.id for post in posts])
+
+    return [post.id for post in posts]
+
+
+def create_posts(user, items, context):
+    """Validate and create posts, returning one result per item"""
+    results = []
+    valid = []
+    # One instance validates every item so fields are only built once
+    serializer = PostDetailsSerializer(context=context)
+    for index, item in enumerate(items):
+        try:
+            data = serializer.run_validation(item)
+        except ValidationError as exc:
+            errors = as_serializer_error(exc)
+            results.append({'index': index, 'errors': errors})
+        else:
+            results.append({'index': index})
+            valid.append((index, data))
+
+    for chunk in _chunks(valid, settings.FEED_BULK_CHUNK_SIZE):
+        with transaction.atomic():
+            post_ids = _insert(user, [data for index, data in chunk])
+
+        for (index, data), post_id in zip(chunk, post_ids):
+            results[index]['id'] = post_id
+
+    return results
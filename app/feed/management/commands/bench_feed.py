@@ -0,0 +1,98 @@
+"""
+Django command to benchmark feed reads for viewers following many users.
+"""
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import Feed, Follow, TimelineEntry
+from feed import timeline
+
+
+class Command(BaseCommand):
+    """Command for benchmarking the feed read path"""
+    help = 'Time feed reads for viewers with 10, 1k and 50k followees'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--followees',
+            type=int,
+            nargs='+',
+            default=[10, 1000, 50000]
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def _populate(self, followees):
+        """Create a viewer following <followees> users with one post each"""
+        User = get_user_model()
+        viewer = User.objects.create(
+            email='bench-viewer@example.com',
+            username='bench-viewer'
+        )
+        users = User.objects.bulk_create([
+            User(email=f'bench{i}@example.com', username=f'bench{i}')
+            for i in range(followees)
+        ], batch_size=5000)
+        Follow.objects.bulk_create([
+            Follow(follower=viewer, followee=user) for user in users
+        ], batch_size=5000)
+        posts = Feed.objects.bulk_create([
+            Feed(user=user, title='Benchmark post') for user in users
+        ], batch_size=5000)
+        TimelineEntry.objects.bulk_create([
+            TimelineEntry(viewer=viewer, post=post) for post in posts
+        ], batch_size=5000)
+
+        return viewer
+
+    def _time(self, read, repeat):
+        """Return the timings of <repeat> calls in milliseconds"""
+        timings = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            read()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return timings
+
+    def _report(self, label, timings):
+        p95 = statistics.quantiles(timings, n=20)[-1] \
+            if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f'{label}: p50 {statistics.median(timings):.2f} ms, '
+            f'p95 {p95:.2f} ms'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        page = options['page_size'] + 1
+        for followees in options['followees']:
+            with transaction.atomic():
+                cache.delete(timeline.CELEBRITIES_CACHE_KEY)
+                viewer = self._populate(followees)
+                post_id = viewer.timeline.latest('post_id').post_id
+
+                def read_list():
+                    list(
+                        timeline.read(viewer, limit=page).order_by(
+                            '-id').prefetch_related('tags')[:page]
+                    )
+
+                def read_detail():
+                    timeline.posts_for(
+                        viewer,
+                        timeline.pulled_authors(viewer)
+                    ).filter(id=post_id).exists()
+
+                self._report(
+                    f'{followees} followees, list',
+                    self._time(read_list, options['repeat'])
+                )
+                self._report(
+                    f'{followees} followees, detail',
+                    self._time(read_detail, options['repeat'])
+                )
+                transaction.set_rollback(True)
@@ -0,0 +1,70 @@
+"""
+Django command to compare single and bulk post creation throughput.
+"""
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+from feed.views import PostsViewSet
+
+
+class Command(BaseCommand):
+    """Command for benchmarking post ingestion"""
+    help = 'Compare POST /posts/ with POST /posts/bulk/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--tags', type=int, default=3)
+
+    def _payload(self, count, tags):
+        return [
+            {
+                'title': f'Imported post {i}',
+                'description': 'Imported description',
+                'tags': [{'name': f'tag {i % 50 + j}'} for j in range(tags)],
+            }
+            for i in range(count)
+        ]
+
+    def _run(self, user, view, path, payloads):
+        """Post every payload and return elapsed seconds"""
+        factory = APIRequestFactory()
+        start = time.perf_counter()
+        with transaction.atomic():
+            for payload in payloads:
+                request = factory.post(path, payload, format='json')
+                force_authenticate(request, user)
+                res = view(request)
+                assert res.status_code in [200, 201], res.data
+            transaction.set_rollback(True)
+
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        payload = self._payload(options['posts'], options['tags'])
+        with transaction.atomic():
+            user = get_user_model().objects.create(
+                email='bench-importer@example.com',
+                username='bench-importer'
+            )
+
+            single = self._run(
+                user,
+                PostsViewSet.as_view({'post': 'create'}),
+                '/api/feed/posts/',
+                payload
+            )
+            bulk = self._run(
+                user,
+                PostsViewSet.as_view({'post': 'bulk'}),
+                '/api/feed/posts/bulk/',
+                [payload]
+            )
+            transaction.set_rollback(True)
+
+        count = options['posts']
+        self.stdout.write(f'single: {count / single:.0f} posts/s')
+        self.stdout.write(f'bulk: {count / bulk:.0f} posts/s')
+        self.stdout.write(f'speedup: {single / bulk:.1f}x')
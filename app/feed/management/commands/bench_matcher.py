@@ -0,0 +1,59 @@
+"""
+Django command to compare blocked word matching strategies.
+"""
+import random
+import string
+import time
+from django.core.management.base import BaseCommand
+from feed.matcher import Matcher
+
+
+class Command(BaseCommand):
+    """Command for benchmarking the blocked word matcher"""
+    help = 'Compare per word substring scans with the compiled matcher'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--terms', type=int, default=10000)
+        parser.add_argument('--text-length', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def _timed(self, func, repeat):
+        """Return mean milliseconds of calling func"""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        rng = random.Random(0)
+        terms = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+            for _ in range(options['terms'])
+        ]
+        words = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+            for _ in range(options['text_length'] // 6)
+        ]
+        text = ' '.join(words)[:options['text_length']]
+
+        start = time.perf_counter()
+        matcher = Matcher(terms)
+        build = (time.perf_counter() - start) * 1000
+
+        def naive():
+            lowered = text.lower()
+            return [term for term in terms if term in lowered]
+
+        scan = self._timed(naive, options['repeat'])
+        compiled = self._timed(
+            lambda: matcher.find_all(text), options['repeat']
+        )
+
+        self.stdout.write(
+            f'{len(terms)} terms, {len(text)} chars, '
+            f'build {build:.1f} ms'
+        )
+        self.stdout.write(f'substring scan: {scan:.3f} ms')
+        self.stdout.write(f'matcher: {compiled:.3f} ms')
+        self.stdout.write(f'speedup: {scan / compiled:.1f}x')
@@ -0,0 +1,95 @@
+"""
+Django command to evaluate feed ranking offline.
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+import numpy as np
+from django.core.management.base import BaseCommand
+from feed import ranking
+
+
+FIXTURE = Path(__file__).resolve().parents[2] / 'fixtures' / \
+    'ranking_eval.json'
+
+
+class Command(BaseCommand):
+    """Command for running a sample ranking dataset through the scorers"""
+    help = 'Score hand-written sample candidate batches and report ' \
+        'throughput and precision against their sample engagement'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', default=str(FIXTURE))
+        parser.add_argument('--repeat', type=int, default=100)
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=1,
+            help='Repeat every candidate list to score larger batches'
+        )
+        parser.add_argument('--top', type=int, default=10)
+
+    def _batch(self, viewer, fields, scale):
+        """Return a Batch of a sample viewer's candidates"""
+        rows = [dict(zip(fields, row)) for row in viewer['candidates']]
+        rows *= scale
+        pairs = [
+            (i, name) for i, row in enumerate(rows) for name in row['tags']
+        ]
+
+        return ranking.Batch(
+            post_ids=[row['id'] for row in rows],
+            author_ids=[row['author'] for row in rows],
+            ages=[row['age_hours'] for row in rows],
+            tag_posts=[i for i, _ in pairs],
+            tag_names=[name for _, name in pairs],
+            followers=viewer['followers'],
+            tag_profile=viewer['tag_profile']
+        )
+
+    def _precision(self, batch, scores, engaged, top):
+        """Return the share of the top scored posts that were engaged"""
+        order = np.lexsort((-batch.post_ids, -scores))[:top]
+        return np.isin(batch.post_ids[order], list(engaged)).mean()
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        with open(options['fixture']) as fixture:
+            data = json.load(fixture)
+        configured = ranking.scorers()
+        top = options['top']
+
+        timings = []
+        scored = 0
+        precision = []
+        newest = []
+        for viewer in data['viewers']:
+            batch = self._batch(viewer, data['fields'], options['scale'])
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                scores = ranking.score(batch, configured)
+                timings.append((time.perf_counter() - start) * 1000)
+            scored += len(batch) * options['repeat']
+
+            engaged = set(viewer['engaged'])
+            precision.append(
+                self._precision(batch, scores, engaged, top)
+            )
+            newest.append(
+                self._precision(batch, -batch.ages, engaged, top)
+            )
+
+        total = sum(timings) / 1000
+        self.stdout.write(
+            f'{len(data["viewers"])} viewers, {len(batch)} candidates per '
+            f'batch'
+        )
+        self.stdout.write(
+            f'score: p50 {statistics.median(timings):.3f} ms per batch, '
+            f'{scored / total:,.0f} candidates/s'
+        )
+        self.stdout.write(
+            f'precision@{top}: {statistics.mean(precision):.3f} '
+            f'(newest first {statistics.mean(newest):.3f})'
+        )
@@ -0,0 +1,109 @@
+"""
+Django command to benchmark post search.
+"""
+import random
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from core.models import Feed
+from feed import search
+
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'pa']
+
+
+class Command(BaseCommand):
+    """Command for benchmarking search over many posts"""
+    help = 'Time the first page of post searches over generated posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--words', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def _vocabulary(self, size):
+        """Return <size> distinct made up words"""
+        words = []
+        length = 2
+        while len(words) < size:
+            for i in range(len(SYLLABLES) ** length):
+                word = ''
+                for _ in range(length):
+                    i, syllable = divmod(i, len(SYLLABLES))
+                    word += SYLLABLES[syllable]
+                words.append(word)
+            length += 1
+
+        return words[:size]
+
+    def _populate(self, count, words):
+        """Create <count> approved posts with Zipf distributed words"""
+        user = get_user_model().objects.create(
+            email='bench-search@example.com',
+            username='bench-search'
+        )
+        rng = random.Random(0)
+        weights = [1 / rank for rank in range(1, len(words) + 1)]
+        batch = 10000
+        for start in range(0, count, batch):
+            size = min(batch, count - start)
+            sample = rng.choices(words, weights, k=size * 26)
+            Feed.objects.bulk_create([
+                Feed(
+                    user=user,
+                    title=' '.join(sample[i * 26:i * 26 + 6]),
+                    description=' '.join(sample[i * 26 + 6:i * 26 + 26]),
+                    status=Feed.Status.APPROVED
+                )
+                for i in range(size)
+            ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_feed')
+
+    def _report(self, label, matches, timings):
+        p95 = statistics.quantiles(timings, n=20)[-1] \
+            if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f'{label} ({matches} matches): '
+            f'p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        words = self._vocabulary(options['words'])
+        common, mid, rare = words[0], words[99], words[-1]
+        queries = [
+            ('common term', common),
+            ('mid term', mid),
+            ('rare term', rare),
+            ('two terms', f'{mid} {words[100]}'),
+            ('prefix', f'{mid[:4]}*'),
+            ('phrase', f'"{common} {words[1]}"'),
+        ]
+        page = options['page_size'] + 1
+        approved = Feed.objects.filter(status=Feed.Status.APPROVED)
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            self._populate(options['posts'], words)
+            self.stdout.write(
+                f'{options["posts"]} posts ({search.backend()} backend) '
+                f'created in {time.perf_counter() - start:.1f} s'
+            )
+
+            for label, query in queries:
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    list(
+                        search.search(approved, query).order_by(
+                            '-rank', '-id'
+                        )[:page]
+                    )
+                    timings.append((time.perf_counter() - start) * 1000)
+                matches = search.search(approved, query).count()
+                self._report(f'{label} {query!r}', matches, timings)
+            transaction.set_rollback(True)
@@ -0,0 +1,53 @@
+"""
+Django command to move post images into content addressed storage.
+"""
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from core.models import Feed, ImageBlob
+from feed import blobs
+
+
+class Command(BaseCommand):
+    """Command for deduplicating images stored before content addressing"""
+    help = 'Store every post image once under its digest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the space that would be reclaimed'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        posts = Feed.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).exclude(
+            image__in=ImageBlob.objects.values('name')
+        ).order_by('id')
+        known = set(ImageBlob.objects.values_list('digest', flat=True))
+        moved = missing = reclaimed = 0
+
+        for post in posts.iterator():
+            name = post.image.name
+            if not default_storage.exists(name):
+                missing += 1
+                continue
+
+            with default_storage.open(name) as image_file:
+                content_digest = blobs.digest(image_file)
+                if content_digest in known:
+                    reclaimed += image_file.size
+                known.add(content_digest)
+                if not options['dry_run']:
+                    stored = blobs.store(image_file, content_digest)
+                    Feed.objects.filter(pk=post.pk).update(image=stored)
+            if not options['dry_run']:
+                default_storage.delete(name)
+            moved += 1
+
+        verb = 'Would reclaim' if options['dry_run'] else 'Reclaimed'
+        self.stdout.write(
+            f'{moved} images deduplicated, {missing} missing. '
+            f'{verb} {reclaimed} bytes'
+        )
@@ -0,0 +1,20 @@
+"""
+Django command to moderate posts left pending.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from feed import moderation
+
+
+class Command(BaseCommand):
+    """Command for moderating posts whose queue entry was lost"""
+    help = 'Moderate every pending post, e.g. after a restart'
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        post_ids = list(moderation.pending())
+        size = settings.FEED_MODERATION_BATCH_SIZE
+        for start in range(0, len(post_ids), size):
+            moderation.moderate(post_ids[start:start + size])
+
+        self.stdout.write(f'Moderated {len(post_ids)} pending posts')
@@ -0,0 +1,18 @@
+"""
+Django command to recompute like and comment counts.
+"""
+from django.core.management.base import BaseCommand
+from feed import engagement
+
+
+class Command(BaseCommand):
+    """Command for rebuilding sharded like and comment counts"""
+    help = 'Recompute the like and comment counts of every post'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        counted = engagement.reconcile(batch_size=options['batch_size'])
+        self.stdout.write(f'{counted} posts have likes or comments')
@@ -0,0 +1,17 @@
+"""
+Django command to recompute tag counts and trending buckets.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from feed import tag_stats
+
+
+class Command(BaseCommand):
+    """Command for rebuilding tag aggregates from posts"""
+    help = 'Recompute tag post counts and hourly trending buckets'
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        with transaction.atomic():
+            tag_stats.reconcile()
+        self.stdout.write('Tag stats reconciled')
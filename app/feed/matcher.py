@@ -0,0 +1,89 @@
+"""
+Aho-Corasick multi-pattern matcher.
+
+The automaton is built once from the word list and then finds every
+occurrence of every word in a single pass over the text, independent of
+the number of words.
+"""
+from collections import deque
+
+
+SUBSTRING = 'substring'
+WORD = 'word'
+MODES = [SUBSTRING, WORD]
+
+
+class Matcher:
+    """Case insensitive matcher for a fixed list of words"""
+
+    def __init__(self, words, mode=SUBSTRING):
+        if mode not in MODES:
+            raise ValueError(f'Unknown match mode {mode!r}')
+
+        self.mode = mode
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        self._build(words)
+
+    def _build(self, words):
+        """Build the trie then link failure transitions breadth first"""
+        for word in words:
+            word = word.strip().lower()
+            if not word:
+                continue
+            state = 0
+            for char in word:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            if word not in self._output[state]:
+                self._output[state] += (word,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def __len__(self):
+        return len(self._goto) - 1
+
+    def _is_word(self, text, start, end):
+        """Check the match is not inside a longer word"""
+        return (
+            (start == 0 or not text[start - 1].isalnum()) and
+            (end == len(text) or not text[end].isalnum())
+        )
+
+    def find_all(self, text):
+        """Return (position, word) of every match in text order"""
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for word in output[state]:
+                start = index - len(word) + 1
+                if self.mode == WORD and \
+                        not self._is_word(text, start, index + 1):
+                    continue
+                matches.append((start, word))
+
+        matches.sort()
+        return matches
+
+    def words_in(self, text):
+        """Return the distinct matched words in order of appearance"""
+        return list(dict.fromkeys(word for _, word in self.find_all(text)))
@@ -0,0 +1,153 @@
+"""
+Background moderation of new posts.
+
+New posts are saved as pending and queued here. Workers scan them in
+batches against the blocked word list and check attached images, then
+fan approved posts out to timelines. Rejected posts are never shown.
+Only approved posts count towards author and tag post counts.
+"""
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import transaction
+from PIL import Image
+from core import metrics, workers
+from core.models import Feed, TimelineEntry
+from feed import response_cache, tag_stats, timeline, validators
+from user import counters
+
+
+def _image_problems(post):
+    """Return why the attached image can't be published, if it can't"""
+    if not post.image:
+        return []
+
+    try:
+        with post.image.open('rb') as image_file:
+            Image.open(image_file).verify()
+    except Exception:
+        return ['image is not a readable picture']
+
+    return []
+
+
+def check_post(post):
+    """Return every reason the post can't be published"""
+    matcher = validators.get_matcher()
+    texts = [post.title, post.description]
+    texts += [tag.name for tag in post.tags.all()]
+    reasons = [
+        f'<{word}> word is not an allowed word'
+        for word in matcher.words_in('\n'.join(texts))
+    ]
+
+    return reasons + _image_problems(post)
+
+
+def _count(posts, delta):
+    """Move author and tag post counts by <delta> for each approved post"""
+    authors = Counter(post.user_id for post in posts)
+    for author_id, total in authors.items():
+        counters.adjust(author_id, counters.POSTS, total * delta)
+    tag_stats.record(
+        tag_stats.post_uses(post_ids=[post.id for post in posts]),
+        delta
+    )
+
+
+def uncount(post_ids):
+    """Remove the approved posts among <post_ids> from author and tag
+    counts"""
+    _count(
+        Feed.objects.filter(
+            id__in=post_ids,
+            status=Feed.Status.APPROVED
+        ).only('id', 'user_id'),
+        -1
+    )
+
+
+def publish(posts):
+    """Count and fan approved posts out and invalidate the pages showing
+    them"""
+    _count(posts, 1)
+    by_author = defaultdict(list)
+    for post in posts:
+        by_author[post.user_id].append(post)
+
+    for author_id, author_posts in by_author.items():
+        response_cache.touch_feeds(
+            timeline.push_posts(author_id, author_posts)
+        )
+        response_cache.touch_author(author_id)
+
+
+def moderate(post_ids):
+    """Approve or reject a batch of pending posts"""
+    with transaction.atomic():
+        posts = list(
+            Feed.objects.filter(
+                id__in=post_ids,
+                status=Feed.Status.PENDING
+            ).select_for_update(
+                skip_locked=True, of=['self']
+            ).prefetch_related('tags')
+        )
+        approved, rejected = [], []
+        for post in posts:
+            (rejected if check_post(post) else approved).append(post)
+
+        Feed.objects.filter(
+            id__in=[post.id for post in approved]
+        ).update(status=Feed.Status.APPROVED)
+        Feed.objects.filter(
+            id__in=[post.id for post in rejected]
+        ).update(status=Feed.Status.REJECTED)
+        publish(approved)
+
+    metrics.incr('moderation.approved', len(approved))
+    metrics.incr('moderation.rejected', len(rejected))
+
+
+def pending():
+    """Return ids of every post waiting for moderation"""
+    return Feed.objects.filter(
+        status=Feed.Status.PENDING
+    ).order_by('id').values_list('id', flat=True)
+
+
+pool = workers.Pool(
+    'moderation',
+    moderate,
+    workers=settings.FEED_MODERATION_WORKERS,
+    batch_size=settings.FEED_MODERATION_BATCH_SIZE,
+    recover=pending
+)
+
+
+def submit(post_ids):
+    """Queue posts for moderation"""
+    pool.submit(post_ids)
+
+
+def _invalidate(post_ids, viewer_ids, author_ids):
+    """Drop cached pages that showed withdrawn posts"""
+    response_cache.invalidate_posts(post_ids)
+    response_cache.touch_feeds(viewer_ids)
+    for author_id in author_ids:
+        response_cache.touch_author(author_id)
+
+
+def resubmit(posts):
+    """Withdraw edited posts from timelines and moderate them again"""
+    post_ids = [post.id for post in posts]
+    uncount(post_ids)
+    entries = TimelineEntry.objects.filter(post_id__in=post_ids)
+    viewer_ids = list(entries.values_list('viewer_id', flat=True))
+    entries.delete()
+    Feed.objects.filter(id__in=post_ids).update(status=Feed.Status.PENDING)
+
+    author_ids = {post.user_id for post in posts}
+    transaction.on_commit(
+        lambda: _invalidate(post_ids, viewer_ids, author_ids)
+    )
+    submit(post_ids)
@@ -0,0 +1,72 @@
+"""
+Request body parsers
+"""
+import json
+from django.conf import settings
+from django.http.multipartparser import (
+    MultiPartParser as DjangoMultiPartParser,
+    MultiPartParserError,
+)
+from rest_framework import exceptions, parsers, status
+from rest_framework.exceptions import ParseError
+from feed.uploads import ImageUploadHandler
+
+
+class UploadTooLarge(exceptions.APIException):
+    """Request body exceeds the upload size limit"""
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Upload is too large.'
+    default_code = 'upload_too_large'
+
+
+class NDJSONParser(parsers.BaseParser):
+    """Parse newline delimited JSON into a list of objects"""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        items = []
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f'NDJSON parse error on line {number}: {exc}')
+
+        return items
+
+
+class ImageUploadParser(parsers.MultiPartParser):
+    """Parse multipart image uploads, streaming files to disk and
+    rejecting invalid or oversize images before reading all of them"""
+
+    # Room for the multipart framing and form fields around the file
+    FORM_OVERHEAD = 64 * 1024
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        limit = settings.FEED_IMAGE_MAX_UPLOAD_SIZE + self.FORM_OVERHEAD
+        if int(request.META.get('CONTENT_LENGTH') or 0) > limit:
+            raise UploadTooLarge(
+                f'Image is larger than '
+                f'{settings.FEED_IMAGE_MAX_UPLOAD_SIZE} bytes.'
+            )
+
+        meta = request.META.copy()
+        meta['CONTENT_TYPE'] = media_type
+        handler = ImageUploadHandler(request)
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            parser = DjangoMultiPartParser(meta, stream, [handler], encoding)
+            data, files = parser.parse()
+        except MultiPartParserError as exc:
+            raise ParseError(f'Multipart form parse error - {exc}')
+
+        error = handler.error
+        if error is not None and error.too_large:
+            raise UploadTooLarge(str(error))
+        if error is not None:
+            raise exceptions.ValidationError({'image': [str(error)]})
+
+        return parsers.DataAndFiles(data, files)
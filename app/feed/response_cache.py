@@ -0,0 +1,146 @@
+"""
+Rendered response cache for the posts endpoints.
+
+Feed pages are cached as lists of post ids, keyed by viewer, query string
+and the version tokens of the viewer's timeline, pulled authors and
+filtered tags. Post representations are cached separately by post id,
+so editing a post only drops its own entries, and carry the version
+tokens of their tags, so renaming a tag needn't find its posts.
+"""
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag, urlencode
+
+
+STYLES = ['list', 'detail']
+
+
+def _post_key(style, post_id):
+    return f'feed:post:{style}:{post_id}'
+
+
+def _feed_version_key(user_id):
+    return f'feed:version:{user_id}'
+
+
+def _author_version_key(user_id):
+    return f'feed:author-version:{user_id}'
+
+
+def _tag_version_key(tag_id):
+    return f'feed:tag-version:{tag_id}'
+
+
+def _versions(keys):
+    """Return the version token of every key, creating missing ones"""
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, settings.FEED_RESPONSE_CACHE_TIMEOUT)
+        versions.update(missing)
+
+    return [versions[key] for key in keys]
+
+
+def _touch(keys):
+    """Replace version tokens, orphaning every page cached under them"""
+    token = time.time_ns()
+    cache.set_many(
+        {key: token for key in keys},
+        settings.FEED_RESPONSE_CACHE_TIMEOUT
+    )
+
+
+def page_key(request, authors, tag_ids=()):
+    """Return the cache key of a feed page"""
+    keys = [_feed_version_key(request.user.id)]
+    keys += [_author_version_key(author) for author in authors]
+    keys += [_tag_version_key(tag_id) for tag_id in tag_ids]
+    query = urlencode(sorted(request.query_params.items()))
+    raw = f'{request.get_host()}?{query}:{_versions(keys)}'
+    digest = hashlib.md5(raw.encode()).hexdigest()
+
+    return f'feed:page:{request.user.id}:{digest}'
+
+
+def get_page(key):
+    return cache.get(key)
+
+
+def set_page(key, page):
+    cache.set(key, page, settings.FEED_RESPONSE_CACHE_TIMEOUT)
+
+
+def _tag_keys(data):
+    return [_tag_version_key(tag['id']) for tag in data.get('tags', [])]
+
+
+def get_posts(style, post_ids):
+    """Return cached representations by post id, skipping those cached
+    before one of their tags changed"""
+    found = cache.get_many([_post_key(style, id) for id in post_ids])
+    entries = {
+        id: found[_post_key(style, id)]
+        for id in post_ids if _post_key(style, id) in found
+    }
+    tag_keys = {key for entry in entries.values() for key in entry['tags']}
+    versions = cache.get_many(list(tag_keys)) if tag_keys else {}
+
+    return {
+        id: entry['data'] for id, entry in entries.items()
+        if all(
+            versions.get(key) == version
+            for key, version in entry['tags'].items()
+        )
+    }
+
+
+def set_posts(style, posts):
+    """Cache representations given as a post id to data mapping, along
+    with the version tokens of their tags"""
+    tag_keys = sorted({
+        key for data in posts.values() for key in _tag_keys(data)
+    })
+    versions = dict(zip(tag_keys, _versions(tag_keys))) if tag_keys else {}
+    cache.set_many(
+        {
+            _post_key(style, id): {
+                'data': data,
+                'tags': {key: versions[key] for key in _tag_keys(data)},
+            }
+            for id, data in posts.items()
+        },
+        settings.FEED_RESPONSE_CACHE_TIMEOUT
+    )
+
+
+def invalidate_posts(post_ids):
+    """Drop every cached representation of the posts"""
+    cache.delete_many(
+        [_post_key(style, id) for id in post_ids for style in STYLES]
+    )
+
+
+def touch_feeds(user_ids):
+    """Invalidate cached feed pages of the viewers"""
+    _touch([_feed_version_key(id) for id in user_ids])
+
+
+def touch_author(user_id):
+    """Invalidate cached feed pages that pull the author's posts"""
+    _touch([_author_version_key(user_id)])
+
+
+def touch_tags(tag_ids):
+    """Invalidate cached feed pages filtered by the tags and cached posts
+    showing them"""
+    _touch([_tag_version_key(id) for id in tag_ids])
+
+
+def etag(data):
+    """Return a quoted entity tag for response data"""
+    body = json.dumps(data, sort_keys=True, default=str)
+    return quote_etag(hashlib.md5(body.encode()).hexdigest())
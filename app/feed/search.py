@@ -0,0 +1,167 @@
+"""
+Full-text search over post titles and descriptions.
+
+Queries are parsed into plain terms, "quoted phrases" and prefix* terms
+which must all match. On Postgres they become a tsquery matched against
+Feed.search_vector, a tsvector column kept current by a trigger and
+served by a GIN index, ranked with ts_rank. Other databases narrow the
+candidates with LIKE and match and rank words in process, so results
+can differ where Postgres stems words. Either way only the newest
+FEED_SEARCH_MAX_RANKED matches are ranked, which bounds the cost of
+very common words.
+"""
+import re
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+
+
+# Text search configuration the search_vector trigger was created with
+CONFIG = 'english'
+
+TERM = 'term'
+PREFIX = 'prefix'
+PHRASE = 'phrase'
+
+# Relative weight of title and description matches, as ts_rank weighs
+# the A and B labels the trigger gives them
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+TOKEN_RE = re.compile(r'"([^"]*)"?|(\S+)')
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+class InvalidQuery(Exception):
+    """Raised for queries that can't be searched"""
+
+
+def _words(text):
+    return WORD_RE.findall(text.lower())
+
+
+def parse(query):
+    """Parse a search query into a list of (kind, words) clauses"""
+    clauses = []
+    for phrase, token in TOKEN_RE.findall(query):
+        words = _words(phrase or token)
+        if not words:
+            continue
+        if len(words) > 1:
+            clauses.append((PHRASE, words))
+        elif token.endswith('*'):
+            clauses.append((PREFIX, words))
+        else:
+            clauses.append((TERM, words))
+
+    if not clauses:
+        raise InvalidQuery('Search query has no words.')
+    if len(clauses) > settings.FEED_SEARCH_MAX_CLAUSES:
+        raise InvalidQuery(
+            f'Search query has more than '
+            f'{settings.FEED_SEARCH_MAX_CLAUSES} terms.'
+        )
+
+    return clauses
+
+
+def to_tsquery(clauses):
+    """Return the to_tsquery() text for parsed clauses"""
+    parts = []
+    for kind, words in clauses:
+        if kind == PHRASE:
+            parts.append('(' + ' <-> '.join(words) + ')')
+        elif kind == PREFIX:
+            parts.append(f'{words[0]}:*')
+        else:
+            parts.append(words[0])
+
+    return ' & '.join(parts)
+
+
+def _clause_matches(kind, words, text_words):
+    if kind == TERM:
+        return words[0] in text_words
+    if kind == PREFIX:
+        return any(word.startswith(words[0]) for word in text_words)
+
+    size = len(words)
+    return any(
+        text_words[start:start + size] == words
+        for start in range(len(text_words) - size + 1)
+    )
+
+
+def rank(clauses, title, description):
+    """Return the in process rank of a post, 0 when it doesn't match"""
+    title_words = _words(title)
+    description_words = _words(description)
+    score = 0.0
+    for kind, words in clauses:
+        in_title = _clause_matches(kind, words, title_words)
+        in_description = _clause_matches(kind, words, description_words)
+        if not in_title and not in_description:
+            return 0.0
+        score += in_title * TITLE_WEIGHT + \
+            in_description * DESCRIPTION_WEIGHT
+
+    return score
+
+
+def _postgres_search(queryset, clauses):
+    query = SearchQuery(to_tsquery(clauses), search_type='raw', config=CONFIG)
+    newest = queryset.filter(search_vector=query).order_by(
+        '-id'
+    ).values('id')[:settings.FEED_SEARCH_MAX_RANKED]
+    # ts_rank is a real, compare pages on its exact double value
+    return queryset.filter(id__in=newest).annotate(
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+    )
+
+
+def _in_process_search(queryset, clauses):
+    candidates = queryset
+    for kind, words in clauses:
+        for word in words:
+            candidates = candidates.filter(
+                Q(title__icontains=word) | Q(description__icontains=word)
+            )
+
+    ranks = {}
+    for id, title, description in candidates.order_by('-id').values_list(
+        'id', 'title', 'description'
+    ).iterator():
+        score = rank(clauses, title, description)
+        if score:
+            ranks[id] = score
+        if len(ranks) == settings.FEED_SEARCH_MAX_RANKED:
+            break
+
+    if not ranks:
+        return queryset.none().annotate(rank=Value(0.0))
+
+    return queryset.filter(id__in=ranks).annotate(
+        rank=Case(
+            *[When(id=id, then=Value(score)) for id, score in ranks.items()],
+            output_field=FloatField()
+        )
+    )
+
+
+def backend():
+    """Return the configured search backend"""
+    if settings.FEED_SEARCH_BACKEND:
+        return settings.FEED_SEARCH_BACKEND
+
+    return 'postgres' if connection.vendor == 'postgresql' else 'python'
+
+
+def search(queryset, query):
+    """Filter <queryset> to posts matching <query>, annotated with rank"""
+    clauses = parse(query)
+    if backend() == 'postgres':
+        return _postgres_search(queryset, clauses)
+
+    return _in_process_search(queryset, clauses)
@@ -1,17 +1,20 @@
 """
 Feed endpoint serializer
 """
+from django.core.files.storage import default_storage
+from django.db import transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
-from core.models import Feed, Tag
-from feed import validators
+from core.models import Comment, Feed, Tag
+from feed import validators, response_cache, tagging
 
 
 class TagSerializer(serializers.ModelSerializer):
     """Tag serializer"""
     class Meta:
         model = Tag
-        fields = ['id', 'name']
-        read_only_fields = ['id']
+        fields = ['id', 'name', 'post_count']
+        read_only_fields = ['id', 'post_count']
 
     def update(self, instance, validated_data):
         """Only creator can update the tag"""
@@ -30,16 +33,50 @@ class TagSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
 
         instance.save()
+        transaction.on_commit(
+            lambda: response_cache.touch_tags([instance.id])
+        )
         return instance
 
 
+@extend_schema_field({
+    'type': 'object',
+    'additionalProperties': {'type': 'string', 'format': 'uri'},
+})
+class RenditionsField(serializers.ReadOnlyField):
+    """Urls of the resized post images by rendition name"""
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        urls = {}
+        for name, path in value.items():
+            url = default_storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request else url
+
+        return urls
+
+
+class TrendingTagSerializer(serializers.Serializer):
+    """Serializer for a trending tag name"""
+    name = serializers.CharField()
+    score = serializers.FloatField()
+    posts = serializers.IntegerField()
+
+
 class PostsSerializer(serializers.ModelSerializer):
     """Feed serializer"""
     tags = TagSerializer(many=True, required=False)
+    renditions = RenditionsField()
+    # Annotated by feed.engagement.with_counts, new posts have none
+    likes_count = serializers.IntegerField(read_only=True, default=0)
+    comments_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = Feed
-        fields = ['id', 'user', 'title', 'created_at', 'tags']
+        fields = [
+            'id', 'user', 'title', 'created_at', 'tags', 'renditions',
+            'likes_count', 'comments_count',
+        ]
         read_only_fields = ['user']
 
     def _get_user(self):
@@ -54,21 +91,21 @@ class PostsSerializer(serializers.ModelSerializer):
                 "You are not allowed to update this tag"
             )
 
-    def _get_or_create_tag(self, tags, post):
-        """Create tag if dosen't exist else get from database"""
-        user = self._get_user()
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=user,
-                **tag
-            )
-            post.tags.add(tag_obj)
+    def _get_or_create_tags(self, tags):
+        """Get tags from database in one query, creating missing ones"""
+        return tagging.resolve(
+            self._get_user(),
+            [tag['name'] for tag in tags]
+        )
 
     def create(self, validated_data):
         """Overwite default create method to support tags"""
         tags = validated_data.pop('tags', [])
-        post = Feed.objects.create(**validated_data)
-        self._get_or_create_tag(tags, post)
+        # Moderation is queued on commit, after the tags are attached
+        with transaction.atomic():
+            post = Feed.objects.create(**validated_data)
+            if tags:
+                post.tags.add(*self._get_or_create_tags(tags))
         return post
 
     def update(self, instance, validated_data):
@@ -77,8 +114,7 @@ class PostsSerializer(serializers.ModelSerializer):
 
         tags = validated_data.pop('tags', None)
         if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tag(tags, instance)
+            instance.tags.set(self._get_or_create_tags(tags))
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -106,7 +142,22 @@ class PostDetailsSerializer(PostsSerializer):
 
 class ImageSerializer(serializers.ModelSerializer):
     """Image serializer"""
+    renditions = RenditionsField()
+
     class Meta:
         model = Feed
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'renditions']
         extra_kwargs = {'image': {'required': 'True'}}
+
+
+class CommentSerializer(serializers.ModelSerializer):
+    """Comment serializer"""
+    class Meta:
+        model = Comment
+        fields = ['id', 'user', 'body', 'created_at']
+        read_only_fields = ['id', 'user', 'created_at']
+
+    def validate_body(self, value):
+        """Validate body to not contain not_allowed words"""
+        validators.check_allowed_words(value)
+        return value
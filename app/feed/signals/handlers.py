@@ -0,0 +1,105 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from core.models import Feed, Follow, User
+from feed import (
+    blobs,
+    engagement,
+    images,
+    moderation,
+    response_cache,
+    tag_stats,
+    timeline,
+)
+
+
+@receiver(post_save, sender=Feed)
+def fan_out_post(sender, instance, created, **kwargs):
+    """Queue new posts for moderation, publishing pre-approved ones"""
+    if created and instance.status == Feed.Status.APPROVED:
+        moderation.publish([instance])
+    elif created:
+        moderation.submit([instance.id])
+    else:
+        response_cache.invalidate_posts([instance.id])
+
+
+@receiver(post_delete, sender=Feed)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    """Drop cached representations and stored images of a deleted post"""
+    response_cache.invalidate_posts([instance.id])
+    blobs.release(instance.image.name)
+    images.delete_renditions(instance.renditions)
+
+
+@receiver(pre_delete, sender=Feed)
+def uncount_deleted_post(sender, instance, **kwargs):
+    """Remove a deleted approved post from its author's and tags'
+    counts"""
+    moderation.uncount([instance.id])
+
+
+@receiver(pre_delete, sender=User)
+def uncount_deleted_user_engagement(sender, instance, **kwargs):
+    """Remove the likes and comments of a deleted user from the counts
+    of the posts they engaged with"""
+    engagement.uncount_user(instance.id)
+
+
+@receiver(m2m_changed, sender=Feed.tags.through)
+def count_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep tag aggregates in step with tags attached to approved posts"""
+    if action not in ['post_add', 'pre_remove', 'pre_clear']:
+        return
+
+    post_ids, tag_ids = [instance.id], pk_set
+    if reverse:
+        post_ids, tag_ids = tag_ids, post_ids
+    delta = 1 if action == 'post_add' else -1
+    tag_stats.record(tag_stats.post_uses(post_ids, tag_ids), delta)
+
+
+@receiver(m2m_changed, sender=Feed.tags.through)
+def invalidate_post_tags(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Drop cached posts and tag filtered pages when post tags change"""
+    if action not in ['post_add', 'post_remove', 'pre_clear']:
+        return
+
+    if reverse:
+        post_ids = pk_set or instance.feed_set.values_list('id', flat=True)
+        tag_ids = [instance.id]
+    else:
+        post_ids = [instance.id]
+        tag_ids = pk_set or instance.tags.values_list('id', flat=True)
+
+    response_cache.invalidate_posts(list(post_ids))
+    response_cache.touch_tags(list(tag_ids))
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    """Whenever a user follows others, their recent posts are copied
+    into the follower's timeline"""
+    if created:
+        timeline.backfill(
+            viewer_id=instance.follower_id,
+            author_id=instance.followee_id
+        )
+        response_cache.touch_feeds([instance.follower_id])
+
+
+@receiver(post_delete, sender=Follow)
+def forget_unfollowed_posts(sender, instance, **kwargs):
+    """Drop the posts of an unfollowed user from the follower's
+    timeline"""
+    timeline.forget(
+        viewer_id=instance.follower_id,
+        author_id=instance.followee_id
+    )
+    timeline.unfollowed(instance.followee_id)
+    response_cache.touch_feeds([instance.follower_id])
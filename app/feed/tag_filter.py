@@ -0,0 +1,101 @@
+"""
+Tag filters for post lists.
+
+Posts can be filtered by tag ids (tags=1,2), tag names (tag_names=a,b)
+or both, keeping posts with any (tags_mode=any, the default) or all of
+the requested tags. Every requested tag becomes an EXISTS test on the
+post/tag table, read from its (feed, tag) unique index, so filtered
+lists never join the tags and need no DISTINCT.
+"""
+import re
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from core.models import Feed, Tag
+
+
+ANY = 'any'
+ALL = 'all'
+MODES = [ANY, ALL]
+
+ID_RE = re.compile(r'\d{1,18}', re.ASCII)
+
+
+class InvalidFilter(Exception):
+    """Raised for malformed tag filter parameters"""
+
+    def __init__(self, param, message):
+        super().__init__(message)
+        self.param = param
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',')]
+
+
+def parse(params):
+    """Return the (mode, groups) tag filter in query params, or None.
+
+    Every requested tag gives one group, the set of tag ids it stands
+    for: a tag id is itself, a name is every tag with that name.
+    """
+    ids = params.get('tags')
+    names = params.get('tag_names')
+    mode = params.get('tags_mode', ANY)
+    if not ids and not names:
+        return None
+
+    if mode not in MODES:
+        raise InvalidFilter('tags_mode', f'Expected one of {MODES}.')
+
+    groups = []
+    if ids:
+        items = _split(ids)
+        if not all(ID_RE.fullmatch(item) for item in items):
+            raise InvalidFilter('tags', 'Expected comma separated tag ids.')
+        groups += [{int(item)} for item in dict.fromkeys(items)]
+
+    if names:
+        items = [item for item in dict.fromkeys(_split(names)) if item]
+        found = {name: set() for name in items}
+        for name, id in Tag.objects.filter(name__in=items).values_list(
+            'name', 'id'
+        ):
+            found[name].add(id)
+        groups += found.values()
+
+    if len(groups) > settings.FEED_TAG_FILTER_MAX_TAGS:
+        raise InvalidFilter(
+            'tags',
+            f'At most {settings.FEED_TAG_FILTER_MAX_TAGS} tags can be '
+            f'filtered on.'
+        )
+
+    return mode, groups
+
+
+def tag_ids(groups):
+    """Return every tag id a filter reads"""
+    return sorted(set().union(*groups))
+
+
+def _tagged(ids):
+    return Exists(
+        Feed.tags.through.objects.filter(
+            feed_id=OuterRef('pk'),
+            tag_id__in=ids
+        )
+    )
+
+
+def apply(queryset, mode, groups):
+    """Filter <queryset> to posts with any or all of the tag groups"""
+    if mode == ANY:
+        ids = tag_ids(groups)
+        return queryset.filter(_tagged(ids)) if ids else queryset.none()
+
+    for ids in groups:
+        if not ids:
+            return queryset.none()
+        queryset = queryset.filter(_tagged(ids))
+
+    return queryset
@@ -0,0 +1,133 @@
+"""
+Incrementally maintained tag aggregates.
+
+Every tag keeps the number of approved posts using it in
+Tag.post_count, and TagActivity keeps the number of approved posts
+created per hour with it. Both are moved with F() updates whenever
+posts are published or withdrawn and whenever tags are attached to or
+detached from approved posts, so listing used tags and ranking trending
+ones never scans Feed. Trending tags are ranked by name over the hourly
+buckets, every bucket weighted by an exponential decay with a
+FEED_TRENDING_HALF_LIFE_HOURS half life.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, TruncHour
+from django.utils import timezone
+from core.models import Feed, Tag, TagActivity
+
+
+def bucket(moment):
+    """Return the start of the hour <moment> falls in"""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def record(uses, delta):
+    """Add <delta> uses for every (tag_id, post created_at) pair"""
+    by_tag = defaultdict(list)
+    for tag_id, count in Counter(tag_id for tag_id, _ in uses).items():
+        by_tag[count].append(tag_id)
+    by_bucket = defaultdict(list)
+    for (tag_id, hour), count in Counter(
+        (tag_id, bucket(moment)) for tag_id, moment in uses
+    ).items():
+        by_bucket[count, hour].append(tag_id)
+
+    for count, tag_ids in by_tag.items():
+        Tag.objects.filter(id__in=tag_ids).update(
+            post_count=Greatest(F('post_count') + count * delta, 0)
+        )
+
+    if delta > 0:
+        TagActivity.objects.bulk_create(
+            [
+                TagActivity(tag_id=tag_id, bucket=hour)
+                for (_, hour), tag_ids in by_bucket.items()
+                for tag_id in tag_ids
+            ],
+            ignore_conflicts=True
+        )
+    for (count, hour), tag_ids in by_bucket.items():
+        TagActivity.objects.filter(tag_id__in=tag_ids, bucket=hour).update(
+            count=Greatest(F('count') + count * delta, 0)
+        )
+
+
+def post_uses(post_ids=None, tag_ids=None):
+    """Return the (tag_id, created_at) pairs of tags attached to
+    approved posts"""
+    rows = Feed.tags.through.objects.filter(
+        feed__status=Feed.Status.APPROVED
+    )
+    if post_ids is not None:
+        rows = rows.filter(feed_id__in=post_ids)
+    if tag_ids is not None:
+        rows = rows.filter(tag_id__in=tag_ids)
+
+    return list(rows.values_list('tag_id', 'feed__created_at'))
+
+
+def trending(hours, limit, now=None):
+    """Return tag names with the highest decayed use in the last hours"""
+    current = bucket(now or timezone.now())
+    half_life = settings.FEED_TRENDING_HALF_LIFE_HOURS
+    decay = Case(
+        *[
+            When(
+                bucket=current - timedelta(hours=age),
+                then=Value(0.5 ** (age / half_life))
+            )
+            for age in range(hours)
+        ],
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+
+    return TagActivity.objects.filter(
+        bucket__gt=current - timedelta(hours=hours),
+        count__gt=0
+    ).values(name=F('tag__name')).annotate(
+        score=Sum(F('count') * decay, output_field=FloatField()),
+        posts=Sum('count')
+    ).order_by('-score', 'name')[:limit]
+
+
+def reconcile(now=None):
+    """Recompute tag counts and the retained buckets from approved posts,
+    dropping older buckets"""
+    approved = Feed.tags.through.objects.filter(
+        feed__status=Feed.Status.APPROVED
+    )
+    rows = approved.filter(
+        tag_id=OuterRef('pk')
+    ).order_by().values('tag_id').annotate(total=Count('*')).values('total')
+    Tag.objects.update(post_count=Coalesce(Subquery(rows), 0))
+
+    since = bucket(now or timezone.now()) - timedelta(
+        hours=settings.FEED_TRENDING_RETENTION_HOURS
+    )
+    TagActivity.objects.all().delete()
+    TagActivity.objects.bulk_create(
+        [
+            TagActivity(tag_id=row['tag_id'], bucket=row['hour'],
+                        count=row['total'])
+            for row in approved.filter(
+                feed__created_at__gte=since
+            ).values('tag_id', hour=TruncHour('feed__created_at')).annotate(
+                total=Count('*')
+            ).iterator()
+        ],
+        batch_size=5000
+    )
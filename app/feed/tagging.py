@@ -0,0 +1,19 @@
+"""
+Batched tag resolution
+"""
+from core.models import Tag
+
+
+def resolve(user, names):
+    """Return the user's tags for every name, creating missing ones
+    with a single bulk insert"""
+    names = list(dict.fromkeys(names))
+    found = {
+        tag.name: tag for tag in Tag.objects.filter(user=user, name__in=names)
+    }
+    missing = [Tag(user=user, name=name) for name in names
+               if name not in found]
+    for tag in Tag.objects.bulk_create(missing):
+        found[tag.name] = tag
+
+    return [found[name] for name in names]
@@ -0,0 +1,182 @@
+"""
+Test content addressed image storage
+"""
+import hashlib
+import io
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Feed, ImageBlob
+from feed import blobs, images
+
+
+def image_upload_url(post_id):
+    """Get image url"""
+    return reverse('feed:posts-upload-image', args=[post_id])
+
+
+def create_png(color):
+    """Return the bytes of a small PNG image"""
+    image_file = io.BytesIO()
+    Image.new('RGB', (8, 8), color).save(image_file, format='PNG')
+    return image_file.getvalue()
+
+
+class BlobStorageTests(TestCase):
+    """Test uploads are stored once per distinct content"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.posts = [
+            Feed.objects.create(user=self.user, title=f'Post {i}')
+            for i in range(2)
+        ]
+
+    def tearDown(self):
+        for post in Feed.objects.all():
+            images.delete_renditions(post.renditions)
+            if post.image:
+                default_storage.delete(post.image.name)
+
+    def _upload(self, post, data):
+        image_file = io.BytesIO(data)
+        image_file.name = 'meme.png'
+        res = self.client.post(
+            image_upload_url(post.id),
+            {'image': image_file},
+            format='multipart'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        post.refresh_from_db()
+        return post.image.name
+
+    def test_identical_uploads_share_one_blob(self):
+        """Test the same bytes are stored once under their digest"""
+        data = create_png('red')
+
+        names = [self._upload(post, data) for post in self.posts]
+
+        self.assertEqual(names[0], names[1])
+        self.assertIn(hashlib.sha256(data).hexdigest(), names[0])
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.refcount, 2)
+        self.assertEqual(blob.size, len(data))
+
+    def test_blob_deleted_with_last_post(self):
+        """Test deleting a post only removes unused blobs"""
+        data = create_png('red')
+        name = [self._upload(post, data) for post in self.posts][0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[0].delete()
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(ImageBlob.objects.get().refcount, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[1].delete()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(ImageBlob.objects.exists())
+
+    def test_replacing_image_releases_previous_blob(self):
+        """Test a new upload drops the reference to the old image"""
+        post = self.posts[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            old = self._upload(post, create_png('red'))
+            self._upload(post, create_png('blue'))
+
+        self.assertFalse(default_storage.exists(old))
+        self.assertEqual(ImageBlob.objects.get().name, post.image.name)
+
+    def test_failed_save_keeps_no_reference(self):
+        """Test the new blob is released when the post can't be saved"""
+        image_file = io.BytesIO(create_png('red'))
+        image_file.name = 'meme.png'
+
+        with mock.patch(
+            'feed.serializers.ImageSerializer.save',
+            side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                self.client.post(
+                    image_upload_url(self.posts[0].id),
+                    {'image': image_file},
+                    format='multipart'
+                )
+
+        self.assertFalse(ImageBlob.objects.exists())
+
+    def test_uploads_are_hashed_while_streaming(self):
+        """Test the digest computed on upload is reused"""
+        upload = ContentFile(b'content', name='a.png')
+        upload.sha256 = 'f' * 64
+
+        self.assertEqual(blobs.digest(upload), 'f' * 64)
+
+
+class DedupeMediaCommandTests(TestCase):
+    """Test deduplicating images stored before content addressing"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.data = create_png('green')
+        self.posts = []
+        for i in range(3):
+            post = Feed.objects.create(user=user, title=f'Post {i}')
+            post.image.save('legacy.png', ContentFile(self.data))
+            self.posts.append(post)
+        self.legacy = [post.image.name for post in self.posts]
+        self.addCleanup(self._cleanup)
+
+    def _cleanup(self):
+        for name in self.legacy:
+            default_storage.delete(name)
+        for blob in ImageBlob.objects.all():
+            default_storage.delete(blob.name)
+
+    def test_dedupe_media(self):
+        """Test legacy copies are merged into one blob"""
+        out = StringIO()
+
+        call_command('dedupe_media', stdout=out)
+
+        names = {post.image.name for post in Feed.objects.all()}
+        self.assertEqual(len(names), 1)
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.name, names.pop())
+        self.assertEqual(blob.refcount, 3)
+        for name in self.legacy:
+            self.assertFalse(default_storage.exists(name))
+        self.assertIn(f'Reclaimed {2 * len(self.data)} bytes', out.getvalue())
+
+    def test_dry_run_changes_nothing(self):
+        """Test a dry run only reports"""
+        out = StringIO()
+
+        call_command('dedupe_media', dry_run=True, stdout=out)
+
+        self.assertFalse(ImageBlob.objects.exists())
+        for name in self.legacy:
+            self.assertTrue(default_storage.exists(name))
+        self.assertIn(
+            f'Would reclaim {2 * len(self.data)} bytes',
+            out.getvalue()
+        )
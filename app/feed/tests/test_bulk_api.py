@@ -0,0 +1,134 @@
+"""
+Test bulk post ingestion
+"""
+import json
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Feed, Follow, Tag, TimelineEntry
+
+
+BULK_URL = reverse('feed:posts-bulk')
+
+
+def create_user(**params):
+    """Create and return user"""
+    return get_user_model().objects.create_user(**params)
+
+
+class BulkPostsApiTests(TransactionTestCase):
+    """Test bulk creating posts"""
+
+    def setUp(self):
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_posts_with_tags(self):
+        """Test a JSON array creates posts and shares tags"""
+        payload = [
+            {'title': f'title {i}', 'tags': [{'name': 'shared'}]}
+            for i in range(3)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 3)
+        posts = Feed.objects.filter(user=self.user).order_by('id')
+        self.assertEqual(
+            [result['id'] for result in res.data['results']],
+            [post.id for post in posts]
+        )
+        self.assertEqual(Tag.objects.filter(name='shared').count(), 1)
+        for post in posts:
+            self.assertEqual(post.tags.get().name, 'shared')
+
+    def test_bulk_create_reports_invalid_items(self):
+        """Test invalid items are reported and valid ones created"""
+        payload = [
+            {'title': 'valid'},
+            {'title': 'invalid', 'description': 'murder'},
+            {'description': 'no title'},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['failed'], 2)
+        results = res.data['results']
+        self.assertIn('id', results[0])
+        self.assertIn('description', results[1]['errors'])
+        self.assertIn('title', results[2]['errors'])
+        self.assertEqual(Feed.objects.count(), 1)
+
+    def test_bulk_create_from_ndjson(self):
+        """Test newline delimited JSON bodies are accepted"""
+        body = '\n'.join(
+            json.dumps({'title': f'title {i}'}) for i in range(3)
+        )
+
+        res = self.client.post(
+            BULK_URL,
+            body,
+            content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 3)
+
+    def test_bulk_create_malformed_ndjson(self):
+        """Test a malformed NDJSON line is rejected"""
+        res = self.client.post(
+            BULK_URL,
+            '{"title": "ok"}\n{broken',
+            content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('line 2', res.data['detail'])
+
+    @override_settings(FEED_BULK_CHUNK_SIZE=2)
+    def test_bulk_create_fans_out_in_chunks(self):
+        """Test posts inserted in several chunks reach followers"""
+        follower = create_user(
+            email='follower@example.com',
+            password='testpass',
+            username='follower'
+        )
+        Follow.objects.create(
+            follower=follower,
+            followee=self.user
+        )
+        payload = [{'title': f'title {i}'} for i in range(5)]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.data['created'], 5)
+        self.assertEqual(
+            TimelineEntry.objects.filter(viewer=follower).count(),
+            5
+        )
+
+    def test_bulk_create_requires_list(self):
+        """Test a single object is rejected"""
+        res = self.client.post(BULK_URL, {'title': 'one'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(FEED_BULK_MAX_POSTS=2)
+    def test_bulk_create_limits_size(self):
+        """Test requests over the limit are rejected"""
+        payload = [{'title': f'title {i}'} for i in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Feed.objects.exists())
@@ -0,0 +1,53 @@
+"""
+Test feed management commands.
+"""
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from core.models import Feed
+
+
+class BenchFeedCommandTests(TestCase):
+    """Test feed benchmark command"""
+
+    def test_bench_feed_reports_timings(self):
+        """Test benchmark reports every size and leaves no data behind"""
+        out = StringIO()
+
+        call_command('bench_feed', followees=[2, 5], repeat=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('2 followees, list', output)
+        self.assertIn('5 followees, detail', output)
+        self.assertFalse(Feed.objects.exists())
+
+
+class BenchMatcherCommandTests(TestCase):
+    """Test blocked word matcher benchmark command"""
+
+    def test_bench_matcher_reports_speedup(self):
+        """Test benchmark compares both strategies"""
+        out = StringIO()
+
+        call_command(
+            'bench_matcher', terms=100, text_length=100, repeat=2, stdout=out
+        )
+
+        output = out.getvalue()
+        self.assertIn('100 terms', output)
+        self.assertIn('speedup:', output)
+
+
+class BenchRankingCommandTests(TestCase):
+    """Test ranking evaluation command"""
+
+    def test_bench_ranking_replays_fixture(self):
+        """Test evaluation reports throughput and precision"""
+        out = StringIO()
+
+        call_command('bench_ranking', repeat=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('8 viewers, 250 candidates per batch', output)
+        self.assertIn('candidates/s', output)
+        self.assertIn('precision@10:', output)
@@ -0,0 +1,249 @@
+"""
+Test likes, comments and their sharded counts
+"""
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Comment, Feed, Like, PostCounterShard
+from feed import engagement, response_cache
+
+
+FEED_URL = reverse('feed:posts-list')
+
+
+def detail_url(post_id):
+    return reverse('feed:posts-detail', args=[post_id])
+
+
+def like_url(post_id):
+    return reverse('feed:posts-like', args=[post_id])
+
+
+def unlike_url(post_id):
+    return reverse('feed:posts-unlike', args=[post_id])
+
+
+def comments_url(post_id):
+    return reverse('feed:posts-comments', args=[post_id])
+
+
+def comment_url(post_id, comment_id):
+    return reverse('feed:posts-delete-comment', args=[post_id, comment_id])
+
+
+def create_user(name):
+    """Create and return a user"""
+    return get_user_model().objects.create_user(
+        email=f'{name}@example.com',
+        password='testpass',
+        username=name
+    )
+
+
+def counted(post, counter):
+    """Return the total of a counter over the shards of a post"""
+    return sum(
+        PostCounterShard.objects.filter(post=post).values_list(
+            counter, flat=True
+        )
+    )
+
+
+class LikeApiTests(TransactionTestCase):
+    """Test liking and unliking posts"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Feed.objects.create(user=self.user, title='Sample')
+
+    def test_like_and_unlike(self):
+        """Test a post is liked once and can be unliked"""
+        res = self.client.post(like_url(self.post.id))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(like_url(self.post.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Like.objects.filter(post=self.post).count(), 1)
+        self.assertEqual(
+            self.client.get(detail_url(self.post.id)).data['likes_count'],
+            1
+        )
+
+        res = self.client.delete(unlike_url(self.post.id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.client.get(detail_url(self.post.id)).data['likes_count'],
+            0
+        )
+
+        res = self.client.delete(unlike_url(self.post.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invisible_posts_can_not_be_liked(self):
+        """Test posts outside the viewer's timeline are not found"""
+        post = Feed.objects.create(user=create_user('other'), title='Other')
+
+        res = self.client.post(like_url(post.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Like.objects.exists())
+
+    def test_list_shows_counts(self):
+        """Test listed posts carry their like and comment counts"""
+        other = Feed.objects.create(user=self.user, title='Other')
+        engagement.like(self.user, self.post)
+        engagement.like(create_user('fan'), self.post)
+        engagement.add_comment(self.user, self.post, 'Nice')
+
+        res = self.client.get(FEED_URL)
+
+        counts = {
+            item['id']: (item['likes_count'], item['comments_count'])
+            for item in res.data['results']
+        }
+        self.assertEqual(counts, {self.post.id: (2, 1), other.id: (0, 0)})
+
+    @override_settings(FEED_COUNTER_SHARDS=4)
+    def test_likes_are_spread_over_shards(self):
+        """Test likes of a hot post land on at most the shard count rows"""
+        for i in range(40):
+            engagement.like(create_user(f'fan{i}'), self.post)
+
+        self.assertLessEqual(
+            PostCounterShard.objects.filter(post=self.post).count(),
+            4
+        )
+        self.assertGreater(
+            PostCounterShard.objects.filter(post=self.post).count(),
+            1
+        )
+        self.assertEqual(counted(self.post, engagement.LIKES), 40)
+
+    def test_cached_post_dropped_after_commit(self):
+        """Test a like only drops the cached post once it commits, so a
+        concurrent read can't cache the old count again"""
+        response_cache.set_posts('list', {self.post.id: {'likes': 0}})
+
+        with transaction.atomic():
+            engagement.like(create_user('fan'), self.post)
+            self.assertIn(
+                self.post.id,
+                response_cache.get_posts('list', [self.post.id])
+            )
+
+        self.assertEqual(response_cache.get_posts('list', [self.post.id]), {})
+
+
+class CommentApiTests(TransactionTestCase):
+    """Test the comments of a post"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('testuser')
+        self.commenter = create_user('commenter')
+        self.client = APIClient()
+        self.client.force_authenticate(self.commenter)
+        self.post = Feed.objects.create(user=self.user, title='Sample')
+        self.post.timeline_entries.create(viewer=self.commenter)
+
+    def test_add_and_list_comments(self):
+        """Test comments are created and listed newest first"""
+        for body in ['First', 'Second']:
+            res = self.client.post(
+                comments_url(self.post.id),
+                {'body': body}
+            )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(res.data['user'], self.commenter.id)
+
+        res = self.client.get(comments_url(self.post.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['body'] for item in res.data['results']],
+            ['Second', 'First']
+        )
+        self.assertEqual(
+            self.client.get(detail_url(self.post.id)).data['comments_count'],
+            2
+        )
+
+    def test_empty_comment(self):
+        """Test a comment needs a body"""
+        res = self.client.post(comments_url(self.post.id), {'body': ''})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_comment(self):
+        """Test the comment and post authors can delete a comment"""
+        comments = [
+            engagement.add_comment(self.commenter, self.post, body)
+            for body in ['First', 'Second']
+        ]
+        res = self.client.delete(comment_url(self.post.id, comments[0].id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.client.force_authenticate(self.user)
+        res = self.client.delete(comment_url(self.post.id, comments[1].id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(counted(self.post, engagement.COMMENTS), 0)
+
+    def test_others_can_not_delete_comments(self):
+        """Test other viewers can't delete a comment"""
+        comment = engagement.add_comment(self.user, self.post, 'Mine')
+
+        res = self.client.delete(comment_url(self.post.id, comment.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Comment.objects.exists())
+
+
+class DeletedUserEngagementTests(TestCase):
+    """Test counts drop the engagement of deleted users"""
+
+    def test_deleted_user_is_uncounted(self):
+        """Test likes and comments of a deleted user are uncounted"""
+        author = create_user('author')
+        post = Feed.objects.create(user=author, title='Sample')
+        fan = create_user('fan')
+        engagement.like(fan, post)
+        engagement.like(author, post)
+        for body in ['First', 'Second']:
+            engagement.add_comment(fan, post, body)
+        own = Feed.objects.create(user=fan, title='Own')
+        engagement.like(fan, own)
+
+        fan.delete()
+
+        self.assertEqual(counted(post, engagement.LIKES), 1)
+        self.assertEqual(counted(post, engagement.COMMENTS), 0)
+
+
+class ReconcileEngagementCommandTests(TestCase):
+    """Test rebuilding sharded counts"""
+
+    def test_reconcile_fixes_drifted_counts(self):
+        """Test shards are rewritten from likes and comments"""
+        user = create_user('testuser')
+        post = Feed.objects.create(user=user, title='Sample')
+        engagement.like(user, post)
+        engagement.add_comment(user, post, 'Nice')
+        PostCounterShard.objects.update(likes=9, comments=9)
+        out = StringIO()
+
+        call_command('reconcile_engagement', stdout=out)
+
+        self.assertEqual(counted(post, engagement.LIKES), 1)
+        self.assertEqual(counted(post, engagement.COMMENTS), 1)
+        self.assertIn('1 posts', out.getvalue())
@@ -5,12 +5,13 @@ import os
 import tempfile
 import json
 from PIL import Image
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from core.models import Feed, Tag
+from feed import images
 from feed.serializers import PostsSerializer, PostDetailsSerializer
 
 
@@ -65,7 +66,7 @@ class PublicFeedApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateFeedApiTests(TestCase):
+class PrivateFeedApiTests(TransactionTestCase):
     """Test authentication required for feed api call"""
 
     def setUp(self):
@@ -87,7 +88,7 @@ class PrivateFeedApiTests(TestCase):
         serializer = PostsSerializer(feed_post, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_retrive_post_details(self):
         """Test retriving details of a post"""
@@ -336,6 +337,24 @@ class PrivateFeedApiTests(TestCase):
         self.assertIn(f'"id": {p1.id}', json.dumps(res.data))
         self.assertNotIn(f'"id": {p2.id}', json.dumps(res.data))
 
+    def test_feed_pages_follow_cursor(self):
+        """Test feed list is split into cursor pages"""
+        posts = [create_feed_post(user=self.user) for i in range(5)]
+
+        res = self.client.get(FEED_URL, {'page_size': 2})
+        post_ids = [item['id'] for item in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            post_ids += [item['id'] for item in res.data['results']]
+
+        self.assertEqual(post_ids, [post.id for post in reversed(posts)])
+
+    def test_feed_invalid_cursor(self):
+        """Test a malformed cursor returns not found"""
+        res = self.client.get(FEED_URL, {'cursor': 'invalid'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class ImageUploadTest(TestCase):
     """Test upload image"""
@@ -351,6 +370,8 @@ class ImageUploadTest(TestCase):
         self.feed_post = create_feed_post(self.user)
 
     def tearDown(self):
+        self.feed_post.refresh_from_db()
+        images.delete_renditions(self.feed_post.renditions)
         self.feed_post.image.delete()
 
     def test_upload_image_success(self):
@@ -0,0 +1,142 @@
+"""
+Test processing of uploaded post images
+"""
+import io
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TransactionTestCase
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import metrics
+from core.models import Feed
+from feed import images
+
+
+def image_upload_url(post_id):
+    """Get image url"""
+    return reverse('feed:posts-upload-image', args=[post_id])
+
+
+def post_detail_url(post_id):
+    """Return a post url"""
+    return reverse('feed:posts-detail', args=[post_id])
+
+
+def create_jpeg(size, exif=None):
+    """Return an in-memory JPEG upload"""
+    image_file = io.BytesIO()
+    image = Image.new('RGB', size, 'red')
+    image.save(image_file, format='JPEG', exif=exif or Image.Exif())
+    image_file.name = 'upload.jpg'
+    image_file.seek(0)
+    return image_file
+
+
+class ImageProcessingTests(TransactionTestCase):
+    """Test renditions of uploaded images"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Feed.objects.create(user=self.user, title='Sample')
+        metrics.reset()
+
+    def tearDown(self):
+        self.post.refresh_from_db()
+        images.delete_renditions(self.post.renditions)
+        if self.post.image:
+            self.post.image.delete()
+
+    def _upload(self, image_file):
+        return self.client.post(
+            image_upload_url(self.post.id),
+            {'image': image_file},
+            format='multipart'
+        )
+
+    def test_upload_creates_resized_renditions(self):
+        """Test every rendition fits its size and is smaller"""
+        res = self._upload(create_jpeg((2400, 1200)))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.post.refresh_from_db()
+        self.assertEqual(set(self.post.renditions), set(images.RENDITIONS))
+        for name, size in images.RENDITIONS.items():
+            with default_storage.open(self.post.renditions[name]) as f:
+                rendition = Image.open(f)
+                self.assertEqual(max(rendition.size), size)
+        counters = metrics.snapshot()
+        self.assertEqual(counters['images.processed'], 1)
+        self.assertIn('images.processing_ms.sum', counters)
+        self.assertIn('images.bytes_saved.sum', counters)
+
+    def test_renditions_strip_metadata(self):
+        """Test EXIF data is not copied into renditions"""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera maker'
+        self._upload(create_jpeg((400, 400), exif))
+
+        self.post.refresh_from_db()
+        with default_storage.open(self.post.renditions['feed']) as f:
+            self.assertEqual(len(Image.open(f).getexif()), 0)
+
+    def test_rendition_urls_exposed_on_post(self):
+        """Test posts list the urls of their renditions"""
+        self._upload(create_jpeg((400, 400)))
+
+        res = self.client.get(post_detail_url(self.post.id))
+
+        self.post.refresh_from_db()
+        self.assertEqual(
+            set(res.data['renditions']),
+            set(images.RENDITIONS)
+        )
+        self.assertTrue(
+            res.data['renditions']['thumbnail'].endswith(
+                self.post.renditions['thumbnail']
+            )
+        )
+
+    def test_new_upload_replaces_renditions(self):
+        """Test renditions of a replaced image are deleted"""
+        self._upload(create_jpeg((400, 400)))
+        self.post.refresh_from_db()
+        old_image, old = self.post.image.name, self.post.renditions
+
+        self._upload(create_jpeg((300, 300)))
+
+        default_storage.delete(old_image)
+        for path in old.values():
+            self.assertFalse(default_storage.exists(path))
+
+    def test_unreadable_image_is_counted(self):
+        """Test a broken file fails without stopping the batch"""
+        self.post.image.save('broken.jpg', ContentFile(b'broken'))
+
+        with self.assertLogs('feed.images', 'ERROR'):
+            images.process([self.post.id])
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.renditions, {})
+        self.assertEqual(metrics.snapshot()['images.failed'], 1)
+
+    def test_lost_image_is_recovered(self):
+        """Test images stored without renditions are processed again"""
+        self.post.image.save(
+            'upload.jpg', ContentFile(create_jpeg((400, 400)).read())
+        )
+        self.assertEqual(list(images.unprocessed()), [self.post.id])
+
+        images.pool.recover_now()
+
+        self.post.refresh_from_db()
+        self.assertEqual(set(self.post.renditions), set(images.RENDITIONS))
+        self.assertEqual(list(images.unprocessed()), [])
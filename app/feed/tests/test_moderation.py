@@ -0,0 +1,238 @@
+"""
+Test background moderation of posts
+"""
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import metrics
+from core.models import Feed, Follow, Tag, TimelineEntry
+from feed import moderation
+
+
+FEED_URL = reverse('feed:posts-list')
+
+
+def detail_url(post_id):
+    return reverse('feed:posts-detail', args=[post_id])
+
+
+def create_user(**params):
+    """Create and return user"""
+    return get_user_model().objects.create_user(**params)
+
+
+@override_settings(WORKERS_INLINE=False)
+class ModerationTests(TestCase):
+    """Test posts are only published once approved"""
+
+    def setUp(self):
+        self.author = create_user(
+            email='author@example.com',
+            password='testpass',
+            username='author'
+        )
+        self.reader = create_user(
+            email='reader@example.com',
+            password='testpass',
+            username='reader'
+        )
+        Follow.objects.create(
+            follower=self.reader,
+            followee=self.author
+        )
+        metrics.reset()
+        # Queued posts stay queued, tests moderate them explicitly
+        patcher = mock.patch.object(moderation.pool, '_put')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create_post(self, **params):
+        """Create a post, returning it with the ids queued on commit"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            post = Feed.objects.create(user=self.author, **params)
+
+        return post, callbacks
+
+    def test_new_post_is_pending_and_queued(self):
+        """Test a new post is not fanned out before moderation"""
+        with mock.patch.object(moderation.pool, '_put') as put:
+            post, callbacks = self._create_post(title='Sample')
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(post.status, Feed.Status.PENDING)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        put.assert_called_once_with([post.id])
+
+    def test_approved_post_is_fanned_out(self):
+        """Test approval pushes the post into the audience timelines"""
+        post, _ = self._create_post(title='Sample')
+
+        moderation.moderate([post.id])
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, Feed.Status.APPROVED)
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(
+                post=post
+            ).values_list('viewer_id', flat=True)),
+            {self.author.id, self.reader.id}
+        )
+        self.assertEqual(metrics.snapshot()['moderation.approved'], 1)
+
+    def test_blocked_words_reject_post(self):
+        """Test posts with blocked words are never published"""
+        post, _ = self._create_post(
+            title='Sample',
+            description='a murder story'
+        )
+
+        moderation.moderate([post.id])
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, Feed.Status.REJECTED)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(metrics.snapshot()['moderation.rejected'], 1)
+
+    def test_unreadable_image_rejects_post(self):
+        """Test a file that is not a picture is rejected"""
+        post, _ = self._create_post(title='Sample')
+        post.image.save('fake.png', ContentFile(b'not an image'))
+        self.addCleanup(post.image.delete, save=False)
+
+        moderation.moderate([post.id])
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, Feed.Status.REJECTED)
+
+    def test_moderated_posts_are_skipped(self):
+        """Test a post is only moderated once"""
+        post, _ = self._create_post(title='Sample')
+        moderation.moderate([post.id])
+
+        moderation.moderate([post.id])
+
+        self.assertEqual(metrics.snapshot()['moderation.approved'], 1)
+
+    def test_moderate_pending_command(self):
+        """Test the command moderates posts left pending"""
+        post, _ = self._create_post(title='Sample')
+        out = StringIO()
+
+        call_command('moderate_pending', stdout=out)
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, Feed.Status.APPROVED)
+        self.assertIn('Moderated 1 pending posts', out.getvalue())
+
+    def test_recover_jobs_command(self):
+        """Test lost moderation jobs are handled on startup"""
+        post, _ = self._create_post(title='Sample')
+        out = StringIO()
+
+        call_command('recover_jobs', stdout=out)
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, Feed.Status.APPROVED)
+        self.assertIn('Recovered 1 moderation jobs', out.getvalue())
+
+    def test_author_sees_own_unpublished_posts(self):
+        """Test authors can read and delete their pending and rejected
+        posts while others can't see them"""
+        pending, _ = self._create_post(title='Pending')
+        rejected, _ = self._create_post(title='Rejected')
+        Feed.objects.filter(id=rejected.id).update(
+            status=Feed.Status.REJECTED
+        )
+        client = APIClient()
+
+        client.force_authenticate(self.reader)
+        res = client.get(detail_url(pending.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        client.force_authenticate(self.author)
+        res = client.get(detail_url(pending.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = client.delete(detail_url(rejected.id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Feed.objects.filter(id=rejected.id).exists())
+
+    def test_edited_post_is_moderated_again(self):
+        """Test an edit withdraws the post until it is approved again"""
+        post, _ = self._create_post(title='Sample')
+        moderation.moderate([post.id])
+        client = APIClient()
+        client.force_authenticate(self.author)
+
+        res = client.patch(detail_url(post.id), {'description': 'Edited'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        post.refresh_from_db()
+        self.assertEqual(post.status, Feed.Status.PENDING)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+
+        moderation.moderate([post.id])
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, Feed.Status.APPROVED)
+        self.assertTrue(
+            TimelineEntry.objects.filter(post=post, viewer=self.reader)
+        )
+
+    def test_only_approved_posts_are_counted(self):
+        """Test author and tag post counts follow approval"""
+        tag = Tag.objects.create(user=self.author, name='python')
+        post, _ = self._create_post(title='Sample')
+        post.tags.add(tag)
+        rejected, _ = self._create_post(title='Sample', description='murder')
+        rejected.tags.add(tag)
+
+        def counts():
+            self.author.refresh_from_db()
+            tag.refresh_from_db()
+            return self.author.posts_count, tag.post_count
+
+        self.assertEqual(counts(), (0, 0))
+
+        moderation.moderate([post.id, rejected.id])
+        self.assertEqual(counts(), (1, 1))
+
+        moderation.resubmit([post])
+        self.assertEqual(counts(), (0, 0))
+
+        moderation.moderate([post.id])
+        post.delete()
+        self.assertEqual(counts(), (0, 0))
+
+
+class InlineModerationTests(TransactionTestCase):
+    """Test inline moderation sees the whole post"""
+
+    def test_tags_are_moderated(self):
+        """Test tags attached with a new post are checked"""
+        user = create_user(
+            email='author@example.com',
+            password='testpass',
+            username='author'
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        # Skip the request time check to reach moderation
+        with mock.patch('feed.validators.check_allowed_words'):
+            res = client.post(
+                FEED_URL,
+                {'title': 'Sample', 'tags': [{'name': 'murder'}]},
+                format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        post = Feed.objects.get(id=res.data['id'])
+        self.assertEqual(post.status, Feed.Status.REJECTED)
+        self.assertTrue(Tag.objects.filter(name='murder').exists())
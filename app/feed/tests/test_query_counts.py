@@ -0,0 +1,186 @@
+"""
+Test the number of queries used to render feed endpoints
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from core import authentication
+from core.models import Feed, Tag, TimelineEntry
+from feed import engagement, timeline
+
+
+FEED_URL = reverse('feed:posts-list')
+
+# Posts page and tags prefetch
+LIST_QUERIES = 2
+# Post and tags prefetch
+DETAIL_QUERIES = 2
+
+
+def post_detail_url(post_id):
+    """Return a post url"""
+    return reverse('feed:posts-detail', args=[post_id])
+
+
+def create_tagged_posts(user, count, tags_per_post=3):
+    """Create posts with tags in bulk and add them to the user timeline"""
+    tags = Tag.objects.bulk_create([
+        Tag(user=user, name=f'tag {i}') for i in range(tags_per_post)
+    ])
+    posts = Feed.objects.bulk_create([
+        Feed(user=user, title=f'title {i}') for i in range(count)
+    ])
+    Feed.tags.through.objects.bulk_create([
+        Feed.tags.through(feed_id=post.id, tag_id=tag.id)
+        for post in posts for tag in tags
+    ])
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(viewer=user, post=post) for post in posts
+    ])
+
+    return posts
+
+
+class FeedQueryCountTests(TestCase):
+    """Test feed endpoints run a constant number of queries"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        cache.clear()
+        timeline.celebrity_ids()
+
+    def test_list_queries_do_not_grow_with_posts(self):
+        """Test listing 1, 50 and 500 posts costs the same queries"""
+        created = 0
+        for count in [1, 50, 500]:
+            create_tagged_posts(self.user, count - created)
+            created = count
+
+            with self.assertNumQueries(LIST_QUERIES):
+                res = self.client.get(FEED_URL, {'page_size': count})
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data['results']), min(count, 100))
+            self.assertEqual(len(res.data['results'][0]['tags']), 3)
+
+    def test_list_counts_engagement_in_the_page_query(self):
+        """Test like and comment counts add no queries per post"""
+        for post in create_tagged_posts(self.user, 20):
+            engagement.like(self.user, post)
+            engagement.add_comment(self.user, post, 'Nice')
+
+        with self.assertNumQueries(LIST_QUERIES):
+            res = self.client.get(FEED_URL, {'page_size': 20})
+
+        self.assertEqual(
+            {item['likes_count'] for item in res.data['results']},
+            {1}
+        )
+        self.assertEqual(
+            {item['comments_count'] for item in res.data['results']},
+            {1}
+        )
+
+    def test_detail_queries_do_not_grow_with_tags(self):
+        """Test post details cost the same queries for any tag count"""
+        for tags_per_post in [1, 20]:
+            post = create_tagged_posts(self.user, 1, tags_per_post)[0]
+
+            with self.assertNumQueries(DETAIL_QUERIES):
+                res = self.client.get(post_detail_url(post.id))
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data['tags']), tags_per_post)
+
+
+class TokenAuthQueryCountTests(TestCase):
+    """Test token authentication adds no queries once cached"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        token = Token.objects.create(user=user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        create_tagged_posts(user, 20)
+        cache.clear()
+        authentication.local_cache.clear()
+        timeline.celebrity_ids()
+
+    def test_cached_token_saves_a_query_per_request(self):
+        """Test only the first request looks the token up"""
+        with self.assertNumQueries(LIST_QUERIES + 1):
+            self.client.get(FEED_URL, {'page_size': 20})
+
+        with self.assertNumQueries(LIST_QUERIES):
+            res = self.client.get(FEED_URL, {'page_size': 10})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class TagWriteQueryCountTests(TestCase):
+    """Test tags are written in batches"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_post(self, tag_count):
+        """Create a post with new tags and return the queries it ran"""
+        created = Tag.objects.count()
+        payload = {
+            'title': 'Sample title',
+            'tags': [{'name': f'tag {created + i}'} for i in range(tag_count)]
+        }
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(FEED_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return len(queries)
+
+    def test_create_queries_do_not_grow_with_tags(self):
+        """Test a post with 20 tags costs the same queries as one tag"""
+        self._create_post(1)
+
+        self.assertEqual(self._create_post(1), self._create_post(20))
+
+    def test_update_keeps_unchanged_tags(self):
+        """Test updating tags only adds and removes the difference"""
+        post = create_tagged_posts(self.user, 1)[0]
+        kept = Feed.tags.through.objects.get(feed=post, tag__name='tag 0')
+
+        res = self.client.patch(
+            post_detail_url(post.id),
+            {'tags': [{'name': 'tag 0'}, {'name': 'new tag'}]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(
+            post.tags.values_list('name', flat=True),
+            ['tag 0', 'new tag']
+        )
+        self.assertTrue(
+            Feed.tags.through.objects.filter(id=kept.id).exists()
+        )
+        self.assertEqual(Tag.objects.filter(name='tag 0').count(), 1)
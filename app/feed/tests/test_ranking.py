@@ -0,0 +1,201 @@
+"""
+Test the ranked feed
+"""
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Feed, Follow, Tag
+from feed import ranking
+
+
+FOR_YOU_URL = reverse('feed:posts-for-you')
+
+
+def create_user(name):
+    """Create and return a user"""
+    return get_user_model().objects.create_user(
+        email=f'{name}@example.com',
+        password='testpass',
+        username=name
+    )
+
+
+def create_post(user, title, hours_ago=0):
+    """Create and return a post created <hours_ago> hours ago"""
+    post = Feed.objects.create(user=user, title=title)
+    created_at = timezone.now() - timedelta(hours=hours_ago)
+    Feed.objects.filter(id=post.id).update(created_at=created_at)
+
+    return post
+
+
+def result_titles(res):
+    return [item['title'] for item in res.data['results']]
+
+
+class ScorerTests(SimpleTestCase):
+    """Test vectorized scorers"""
+
+    def setUp(self):
+        self.batch = ranking.Batch(
+            post_ids=[1, 2, 3],
+            author_ids=[10, 20, 30],
+            ages=[0, 12, 24],
+            tag_posts=[0, 0, 1],
+            tag_names=['python', 'django', 'rust'],
+            followers=[20],
+            tag_profile={'python': 0.75, 'django': 0.5, 'go': 1.0}
+        )
+
+    @override_settings(FEED_RANKING_HALF_LIFE_HOURS=12)
+    def test_recency_halves_every_half_life(self):
+        """Test recency decays exponentially with age"""
+        self.assertEqual(
+            list(ranking.recency(self.batch)),
+            [1.0, 0.5, 0.25]
+        )
+
+    def test_author_affinity(self):
+        """Test only authors following the viewer score"""
+        self.assertEqual(
+            list(ranking.author_affinity(self.batch)),
+            [0.0, 1.0, 0.0]
+        )
+
+    def test_tag_affinity_is_capped(self):
+        """Test tag weights add up per post and cap at 1"""
+        self.assertEqual(
+            list(ranking.tag_affinity(self.batch)),
+            [1.0, 0.0, 0.0]
+        )
+
+    def test_untagged_batch(self):
+        """Test tag affinity of posts without tags is zero"""
+        batch = ranking.Batch([1, 2], [10, 20], [0, 1], [], [])
+
+        self.assertEqual(list(ranking.tag_affinity(batch)), [0.0, 0.0])
+
+    @override_settings(FEED_RANKING_SCORERS={
+        'feed.ranking.author_affinity': 2.0,
+        'feed.ranking.tag_affinity': 1.0,
+    })
+    def test_score_sums_weighted_scorers(self):
+        """Test the configured scorers are weighted and summed"""
+        self.assertEqual(list(ranking.score(self.batch)), [1.0, 2.0, 0.0])
+
+
+class ForYouApiTests(TransactionTestCase):
+    """Test the ranked feed endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('viewer')
+        self.friend = create_user('friend')
+        self.stranger = create_user('stranger')
+        for author in [self.friend, self.stranger]:
+            Follow.objects.create(follower=self.user, followee=author)
+        Follow.objects.create(follower=self.friend, followee=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_affinity_outranks_recency(self):
+        """Test a followed back author's older post ranks first"""
+        create_post(self.friend, 'Friend', hours_ago=2)
+        create_post(self.stranger, 'Stranger newer', hours_ago=1)
+        create_post(self.stranger, 'Stranger older', hours_ago=3)
+
+        res = self.client.get(FOR_YOU_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            result_titles(res),
+            ['Friend', 'Stranger newer', 'Stranger older']
+        )
+
+    def test_tag_affinity(self):
+        """Test posts tagged like the viewer's own posts rank higher"""
+        create_post(self.user, 'Mine', hours_ago=48).tags.add(
+            Tag.objects.create(user=self.user, name='python')
+        )
+        create_post(self.stranger, 'Plain', hours_ago=1)
+        create_post(self.stranger, 'Python', hours_ago=2).tags.add(
+            Tag.objects.create(user=self.stranger, name='python')
+        )
+
+        res = self.client.get(FOR_YOU_URL)
+
+        self.assertEqual(result_titles(res), ['Python', 'Plain', 'Mine'])
+
+    def test_tag_profile_skips_unpublished_posts(self):
+        """Test pending and rejected posts don't shape the tag profile"""
+        create_post(self.user, 'Mine').tags.add(
+            Tag.objects.create(user=self.user, name='python')
+        )
+        for status_ in [Feed.Status.PENDING, Feed.Status.REJECTED]:
+            post = create_post(self.user, 'Unpublished')
+            post.tags.add(Tag.objects.create(user=self.user, name=status_))
+            Feed.objects.filter(id=post.id).update(status=status_)
+
+        self.assertEqual(ranking.tag_profile(self.user.id), {'python': 1.0})
+
+    def test_pages_follow_ranking(self):
+        """Test cursor pages continue the ranked order"""
+        create_post(self.friend, 'Friend', hours_ago=2)
+        create_post(self.stranger, 'Stranger', hours_ago=1)
+
+        first = self.client.get(FOR_YOU_URL, {'page_size': 1})
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual(result_titles(first), ['Friend'])
+        self.assertEqual(result_titles(second), ['Stranger'])
+        self.assertIsNone(second.data['next'])
+
+    def test_ranking_is_cached(self):
+        """Test the ranking is reused until it expires"""
+        create_post(self.friend, 'Friend')
+        self.client.get(FOR_YOU_URL)
+        create_post(self.stranger, 'Stranger')
+
+        res = self.client.get(FOR_YOU_URL)
+
+        self.assertEqual(result_titles(res), ['Friend'])
+
+        cache.clear()
+        res = self.client.get(FOR_YOU_URL)
+
+        self.assertEqual(result_titles(res), ['Friend', 'Stranger'])
+
+    @override_settings(FEED_RANKED_CANDIDATES=2)
+    def test_candidates_are_newest_timeline_posts(self):
+        """Test only the newest posts of the timeline are ranked"""
+        for title in ['First', 'Second', 'Third']:
+            create_post(self.stranger, title)
+        create_post(create_user('unfollowed'), 'Unfollowed')
+
+        res = self.client.get(FOR_YOU_URL)
+
+        self.assertEqual(sorted(result_titles(res)), ['Second', 'Third'])
+
+    def test_candidates_load_following_authors_only(self):
+        """Test followers of the viewer are loaded for candidates only"""
+        create_post(self.friend, 'Friend')
+        Follow.objects.create(
+            follower=create_user('fan'),
+            followee=self.user
+        )
+
+        batch = ranking.candidates(self.user)
+
+        self.assertEqual(list(batch.followers), [self.friend.id])
+
+    def test_empty_timeline(self):
+        """Test a viewer without posts gets an empty page"""
+        res = self.client.get(FOR_YOU_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
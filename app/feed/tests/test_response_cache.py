@@ -0,0 +1,169 @@
+"""
+Test cached feed responses
+"""
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from core import metrics
+from core.models import Feed, Tag
+
+
+FEED_URL = reverse('feed:posts-list')
+
+
+def post_detail_url(post_id):
+    """Return a post url"""
+    return reverse('feed:posts-detail', args=[post_id])
+
+
+def tag_detail_url(tag_id):
+    """Return a tag url"""
+    return reverse('feed:tags-detail', args=[tag_id])
+
+
+def follower_url(username):
+    """Get the url to send post request to follow <username>"""
+    return reverse('user:me', args=[username]) + 'follower/'
+
+
+def create_user(**params):
+    """Create and return user"""
+    return get_user_model().objects.create_user(**params)
+
+
+def result_ids(res):
+    return [item['id'] for item in res.data['results']]
+
+
+class ResponseCacheTests(TransactionTestCase):
+    """Test posts responses are cached and invalidated"""
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.author = create_user(
+            email='author@example.com',
+            password='testpass',
+            username='author'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Feed.objects.create(user=self.user, title='Sample')
+
+    def test_feed_page_served_from_cache(self):
+        """Test a repeated feed request runs no queries"""
+        self.client.get(FEED_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(FEED_URL)
+
+        self.assertEqual(result_ids(res), [self.post.id])
+        counters = metrics.snapshot()
+        self.assertEqual(counters['cache.posts-list.hits'], 1)
+        self.assertEqual(counters['cache.posts-list.misses'], 1)
+
+    def test_post_detail_served_from_cache(self):
+        """Test a repeated detail request only checks visibility"""
+        self.client.get(post_detail_url(self.post.id))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(post_detail_url(self.post.id))
+
+        self.assertEqual(res.data['id'], self.post.id)
+        self.assertEqual(metrics.snapshot()['cache.posts-detail.hits'], 1)
+
+    def test_cached_detail_is_not_shown_to_other_users(self):
+        """Test a cached post still requires visibility"""
+        self.client.get(post_detail_url(self.post.id))
+        self.client.force_authenticate(self.author)
+
+        res = self.client.get(post_detail_url(self.post.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_new_post_invalidates_feed(self):
+        """Test posts fanned out to a viewer show up"""
+        self.client.get(FEED_URL)
+
+        post = Feed.objects.create(user=self.user, title='New')
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(result_ids(res), [post.id, self.post.id])
+
+    def test_follow_invalidates_feed(self):
+        """Test following a user shows their posts"""
+        post = Feed.objects.create(user=self.author, title='Author post')
+        self.client.get(FEED_URL)
+
+        self.client.post(follower_url(self.author.username), {})
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(result_ids(res), [post.id, self.post.id])
+
+    def test_update_invalidates_post(self):
+        """Test edited posts are shown with their new content"""
+        self.client.get(FEED_URL)
+        self.client.get(post_detail_url(self.post.id))
+
+        self.client.patch(post_detail_url(self.post.id), {'title': 'New'})
+        res = self.client.get(FEED_URL)
+        res2 = self.client.get(post_detail_url(self.post.id))
+
+        self.assertEqual(res.data['results'][0]['title'], 'New')
+        self.assertEqual(res2.data['title'], 'New')
+
+    def test_delete_invalidates_feed(self):
+        """Test deleted posts disappear from cached pages"""
+        self.client.get(FEED_URL)
+
+        self.client.delete(post_detail_url(self.post.id))
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(result_ids(res), [])
+
+    def test_tag_changes_invalidate_posts(self):
+        """Test renamed and newly assigned tags are shown"""
+        tag = Tag.objects.create(user=self.user, name='old')
+        self.client.get(FEED_URL, {'tags': str(tag.id)})
+
+        self.post.tags.add(tag)
+        res = self.client.get(FEED_URL, {'tags': str(tag.id)})
+        self.client.patch(tag_detail_url(tag.id), {'name': 'new'})
+        res2 = self.client.get(FEED_URL, {'tags': str(tag.id)})
+
+        self.assertEqual(result_ids(res), [self.post.id])
+        self.assertEqual(res2.data['results'][0]['tags'][0]['name'], 'new')
+
+    def test_renamed_tag_shown_on_cached_posts(self):
+        """Test renaming a tag drops cached posts showing it everywhere"""
+        tag = Tag.objects.create(user=self.user, name='old')
+        self.post.tags.add(tag)
+        self.client.get(FEED_URL)
+        self.client.get(post_detail_url(self.post.id))
+
+        self.client.patch(tag_detail_url(tag.id), {'name': 'new'})
+        res = self.client.get(FEED_URL)
+        detail = self.client.get(post_detail_url(self.post.id))
+
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'new')
+        self.assertEqual(detail.data['tags'][0]['name'], 'new')
+
+    def test_not_modified_when_etag_matches(self):
+        """Test clients revalidate a page with If-None-Match"""
+        res = self.client.get(FEED_URL)
+
+        res2 = self.client.get(FEED_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+        Feed.objects.create(user=self.user, title='New')
+        res3 = self.client.get(FEED_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res2.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res2['ETag'], res['ETag'])
+        self.assertEqual(res3.status_code, status.HTTP_200_OK)
@@ -0,0 +1,193 @@
+"""
+Test post search
+"""
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Feed
+from feed import search
+
+
+SEARCH_URL = reverse('feed:posts-search')
+
+
+def create_post(user, title, description='', **params):
+    """Create and return an approved post"""
+    return Feed.objects.create(
+        user=user,
+        title=title,
+        description=description,
+        status=params.pop('status', Feed.Status.APPROVED),
+        **params
+    )
+
+
+class QueryParserTests(SimpleTestCase):
+    """Test parsing search queries"""
+
+    def test_terms_phrases_and_prefixes(self):
+        """Test every clause kind is recognized"""
+        clauses = search.parse('Cats "red apple" jump* well-known')
+
+        self.assertEqual(clauses, [
+            (search.TERM, ['cats']),
+            (search.PHRASE, ['red', 'apple']),
+            (search.PREFIX, ['jump']),
+            (search.PHRASE, ['well', 'known']),
+        ])
+
+    def test_tsquery_syntax_is_not_passed_through(self):
+        """Test operators in the query are treated as separators"""
+        clauses = search.parse("cat | !dog & (x:*")
+
+        self.assertEqual(search.to_tsquery(clauses), 'cat & dog & x:*')
+
+    def test_tsquery(self):
+        """Test clauses become a tsquery"""
+        clauses = search.parse('cats "red apple" jump*')
+
+        self.assertEqual(
+            search.to_tsquery(clauses),
+            'cats & (red <-> apple) & jump:*'
+        )
+
+    def test_query_without_words(self):
+        """Test queries need at least one word"""
+        for query in ['', '  ', '"" * !']:
+            with self.assertRaises(search.InvalidQuery):
+                search.parse(query)
+
+    @override_settings(FEED_SEARCH_MAX_CLAUSES=2)
+    def test_too_many_clauses(self):
+        """Test the number of clauses is limited"""
+        with self.assertRaises(search.InvalidQuery):
+            search.parse('one two three')
+
+
+class SearchApiTests(TestCase):
+    """Test the search endpoint on Postgres full-text search"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _titles(self, query, **params):
+        res = self.client.get(SEARCH_URL, {'q': query, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [post['title'] for post in res.data['results']]
+
+    def test_title_matches_rank_first(self):
+        """Test matches in the title outrank description matches"""
+        create_post(self.user, 'Gardening notes', 'Planting apple trees')
+        create_post(self.user, 'Apple harvest', 'Picked early')
+        create_post(self.user, 'Unrelated', 'Nothing here')
+
+        self.assertEqual(
+            self._titles('apple'),
+            ['Apple harvest', 'Gardening notes']
+        )
+
+    def test_phrase_and_prefix(self):
+        """Test phrases keep word order and prefixes match word starts"""
+        create_post(self.user, 'Red apple pie')
+        create_post(self.user, 'Apple, red variety')
+        create_post(self.user, 'Blueberry muffins')
+
+        self.assertEqual(self._titles('"red apple"'), ['Red apple pie'])
+        self.assertEqual(self._titles('blue*'), ['Blueberry muffins'])
+
+    def test_only_approved_posts(self):
+        """Test rejected posts aren't searchable"""
+        create_post(self.user, 'Approved apple')
+        create_post(self.user, 'Rejected apple', status=Feed.Status.REJECTED)
+
+        self.assertEqual(self._titles('apple'), ['Approved apple'])
+
+    def test_only_visible_posts(self):
+        """Test posts outside the viewer's timeline aren't searchable"""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass',
+            username='other'
+        )
+        create_post(self.user, 'My apple')
+        create_post(other, 'Their apple')
+
+        self.assertEqual(self._titles('apple'), ['My apple'])
+
+    def test_edited_posts_are_reindexed(self):
+        """Test title changes are searchable"""
+        post = create_post(self.user, 'Old title')
+        post.title = 'Fresh title'
+        post.save()
+
+        self.assertEqual(self._titles('fresh'), ['Fresh title'])
+        self.assertEqual(self._titles('old'), [])
+
+    def test_pages_follow_rank(self):
+        """Test cursor pages cover every match once"""
+        for i in range(5):
+            create_post(self.user, f'Apple {i}', 'apple' * (i % 2))
+        titles = []
+        params = {'q': 'apple', 'page_size': 2}
+
+        url = SEARCH_URL
+        while url:
+            res = self.client.get(url, params)
+            titles += [post['title'] for post in res.data['results']]
+            url, params = res.data['next'], None
+
+        self.assertEqual(len(titles), 5)
+        self.assertEqual(set(titles), {f'Apple {i}' for i in range(5)})
+
+    @override_settings(FEED_SEARCH_MAX_RANKED=2)
+    def test_only_newest_matches_ranked(self):
+        """Test common words rank a bounded number of matches"""
+        for i in range(3):
+            create_post(self.user, f'Apple {i}')
+
+        self.assertEqual(sorted(self._titles('apple')), ['Apple 1', 'Apple 2'])
+
+    def test_invalid_query(self):
+        """Test a query without words is a bad request"""
+        res = self.client.get(SEARCH_URL, {'q': '***'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is refused"""
+        res = self.client.get(SEARCH_URL, {'q': 'apple', 'cursor': 'x'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(FEED_SEARCH_BACKEND='python')
+class InProcessSearchApiTests(SearchApiTests):
+    """Test the search endpoint on the in process fallback"""
+
+
+class BenchSearchCommandTests(TestCase):
+    """Test search benchmark command"""
+
+    def test_bench_search_reports_queries(self):
+        """Test benchmark reports latency per query"""
+        out = StringIO()
+
+        call_command(
+            'bench_search',
+            '--posts', '200',
+            '--repeat', '2',
+            stdout=out
+        )
+
+        self.assertIn('p95', out.getvalue())
+        self.assertFalse(Feed.objects.exists())
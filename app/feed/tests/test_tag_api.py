@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -35,7 +35,7 @@ class PublicTagApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateTagApiTests(TestCase):
+class PrivateTagApiTests(TransactionTestCase):
     """Test tags private api"""
 
     def setUp(self):
@@ -53,7 +53,7 @@ class PrivateTagApiTests(TestCase):
         tags = models.Tag.objects.all().order_by('-name')
         serializer = serializers.TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_other_users_can_retrive_tags(self):
         """Test if every user can retrive each tag"""
@@ -70,7 +70,19 @@ class PrivateTagApiTests(TestCase):
         tags = models.Tag.objects.all().order_by('-name')
         serializer = serializers.TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
+
+    def test_tags_are_paginated(self):
+        """Test tag list returns cursor pages"""
+        for i in range(3):
+            models.Tag.objects.create(user=self.user, name=f'Tag {i}')
+
+        res = self.client.get(TAG_URL, {'page_size': 2})
+        res2 = self.client.get(res.data['next'])
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertEqual(len(res2.data['results']), 1)
+        self.assertIsNone(res2.data['next'])
 
     def test_user_can_edit_tags(self):
         """Test if user can edit their own tags"""
@@ -119,12 +131,13 @@ class PrivateTagApiTests(TestCase):
         feed_post.tags.add(tag1)
 
         res = self.client.get(TAG_URL, {'assigned_only': '1'})
+        tag1.refresh_from_db()
         s1 = serializers.TagSerializer(tag1)
         s2 = serializers.TagSerializer(tag2)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertNotIn(s2.data, res.data['results'])
 
     def test_filtered_tags_return_unique_values(self):
         """Test filtering tags will return a unique values"""
@@ -148,4 +161,4 @@ class PrivateTagApiTests(TestCase):
 
         res = self.client.get(TAG_URL, {'assigned_only': '1'})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
@@ -0,0 +1,127 @@
+"""
+Test filtering the feed by tags
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Feed, Tag
+
+
+FEED_URL = reverse('feed:posts-list')
+
+
+def result_titles(res):
+    return sorted(item['title'] for item in res.data['results'])
+
+
+class TagFilterApiTests(TransactionTestCase):
+    """Test tag filter modes and parameters"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.python = Tag.objects.create(user=self.user, name='python')
+        self.django = Tag.objects.create(user=self.user, name='django')
+        both = Feed.objects.create(user=self.user, title='Both')
+        both.tags.add(self.python, self.django)
+        Feed.objects.create(user=self.user, title='Python').tags.add(
+            self.python
+        )
+        Feed.objects.create(user=self.user, title='Untagged')
+
+    def _get(self, **params):
+        res = self.client.get(FEED_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return result_titles(res)
+
+    def test_any_mode_is_default(self):
+        """Test posts with any of the tags are listed once"""
+        tags = f'{self.python.id},{self.django.id}'
+
+        self.assertEqual(self._get(tags=tags), ['Both', 'Python'])
+
+    def test_all_mode(self):
+        """Test posts must have every tag in all mode"""
+        tags = f'{self.python.id},{self.django.id}'
+
+        self.assertEqual(self._get(tags=tags, tags_mode='all'), ['Both'])
+
+    def test_filter_by_names(self):
+        """Test tag names match tags of every user"""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass',
+            username='other'
+        )
+        post = Feed.objects.create(user=self.user, title='Other tag')
+        post.tags.add(Tag.objects.create(user=other, name='django'))
+
+        self.assertEqual(
+            self._get(tag_names='django'),
+            ['Both', 'Other tag']
+        )
+
+    def test_ids_and_names_combined(self):
+        """Test ids and names can be mixed in all mode"""
+        self.assertEqual(
+            self._get(
+                tags=str(self.python.id),
+                tag_names='django',
+                tags_mode='all'
+            ),
+            ['Both']
+        )
+
+    def test_unknown_name(self):
+        """Test unknown names match nothing"""
+        self.assertEqual(self._get(tag_names='rust'), [])
+        self.assertEqual(
+            self._get(tag_names='python,rust', tags_mode='all'),
+            []
+        )
+        self.assertEqual(self._get(tag_names='python,rust'), [
+            'Both', 'Python'
+        ])
+
+    def test_malformed_ids(self):
+        """Test malformed ids are a bad request"""
+        for tags in ['abc', '1,,2', '1;2', '²', '9' * 40]:
+            res = self.client.get(FEED_URL, {'tags': tags})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('tags', res.data)
+
+    def test_unknown_mode(self):
+        """Test only any and all modes are accepted"""
+        res = self.client.get(FEED_URL, {
+            'tags': str(self.python.id),
+            'tags_mode': 'some'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tags_mode', res.data)
+
+    def test_filter_uses_exists_without_distinct(self):
+        """Test filtered lists don't join tags or deduplicate rows"""
+        with CaptureQueriesContext(connection) as queries:
+            self._get(tags=f'{self.python.id},{self.django.id}')
+
+        feed_queries = [
+            query['sql'] for query in queries
+            if 'FROM "core_feed"' in query['sql']
+        ]
+        self.assertTrue(feed_queries)
+        for sql in feed_queries:
+            self.assertNotIn('DISTINCT', sql)
+        self.assertTrue(any('EXISTS' in sql for sql in feed_queries))
@@ -0,0 +1,202 @@
+"""
+Test incrementally maintained tag counts and trending tags
+"""
+from datetime import timedelta
+from io import StringIO
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Feed, Tag, TagActivity
+
+
+TAG_URL = reverse('feed:tags-list')
+TRENDING_URL = reverse('feed:tags-trending')
+BULK_URL = reverse('feed:posts-bulk')
+
+
+def create_post(user, hours_ago=0, **params):
+    """Create and return a post created <hours_ago> hours ago"""
+    post = Feed.objects.create(user=user, title='Sample title', **params)
+    if hours_ago:
+        post.created_at = timezone.now() - timedelta(hours=hours_ago)
+        Feed.objects.filter(id=post.id).update(created_at=post.created_at)
+
+    return post
+
+
+def bucket_counts(tag):
+    """Return the total of every activity bucket of a tag"""
+    return sum(
+        TagActivity.objects.filter(tag=tag).values_list('count', flat=True)
+    )
+
+
+class TagStatsTests(TransactionTestCase):
+    """Test tag counts follow posts being tagged and deleted"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.python = Tag.objects.create(user=self.user, name='python')
+        self.django = Tag.objects.create(user=self.user, name='django')
+
+    def assertCounts(self, tag, expected):
+        tag.refresh_from_db()
+        self.assertEqual(tag.post_count, expected)
+        self.assertEqual(bucket_counts(tag), expected)
+
+    def test_add_and_remove_tags(self):
+        """Test tagging and untagging posts moves the counts"""
+        post = create_post(self.user)
+        post.tags.add(self.python, self.django)
+        post.tags.add(self.python)
+        create_post(self.user).tags.add(self.python)
+
+        self.assertCounts(self.python, 2)
+        self.assertCounts(self.django, 1)
+
+        post.tags.remove(self.python)
+
+        self.assertCounts(self.python, 1)
+        self.assertCounts(self.django, 1)
+
+    def test_reverse_add_and_clear(self):
+        """Test tagging posts from the tag side moves the counts"""
+        posts = [create_post(self.user), create_post(self.user, 30)]
+        self.python.feed_set.add(*posts)
+
+        self.assertCounts(self.python, 2)
+        self.assertEqual(
+            TagActivity.objects.filter(tag=self.python).count(),
+            2
+        )
+
+        self.python.feed_set.clear()
+
+        self.assertCounts(self.python, 0)
+
+    def test_clear_and_delete_posts(self):
+        """Test clearing tags and deleting posts uncounts them"""
+        post = create_post(self.user)
+        post.tags.add(self.python, self.django)
+        other = create_post(self.user)
+        other.tags.add(self.python)
+
+        post.tags.clear()
+        other.delete()
+
+        self.assertCounts(self.python, 0)
+        self.assertCounts(self.django, 0)
+
+    def test_bulk_ingest_counts_tags(self):
+        """Test bulk created posts count their tags once"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = [
+            {'title': 'Sample', 'tags': [{'name': 'python'}] * 2}
+            for _ in range(3)
+        ]
+
+        res = client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertCounts(self.python, 3)
+
+    def test_reconcile_rebuilds_counts(self):
+        """Test the reconcile command fixes drifted aggregates"""
+        create_post(self.user).tags.add(self.python)
+        create_post(
+            self.user,
+            settings.FEED_TRENDING_RETENTION_HOURS + 2
+        ).tags.add(self.python)
+        Tag.objects.update(post_count=7)
+        TagActivity.objects.update(count=5)
+
+        out = StringIO()
+
+        call_command('reconcile_tag_stats', stdout=out)
+
+        self.python.refresh_from_db()
+        self.django.refresh_from_db()
+        self.assertEqual(self.python.post_count, 2)
+        self.assertEqual(self.django.post_count, 0)
+        self.assertEqual(bucket_counts(self.python), 1)
+        self.assertIn('reconciled', out.getvalue())
+
+
+class TrendingTagsApiTests(TransactionTestCase):
+    """Test the trending tags endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _tag(self, name, *hours_ago, user=None):
+        tag = Tag.objects.create(user=user or self.user, name=name)
+        for hours in hours_ago:
+            create_post(self.user, hours).tags.add(tag)
+        return tag
+
+    def test_recent_uses_weigh_more(self):
+        """Test tags are ranked by decayed use, merged by name"""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass',
+            username='other'
+        )
+        self._tag('fresh', 0, 1)
+        self._tag('stale', 20, 20, 20)
+        self._tag('fresh', 2, user=other)
+        self._tag('expired', 30, 30, 30, 30)
+
+        res = self.client.get(TRENDING_URL, {'hours': 24})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(tag['name'], tag['posts']) for tag in res.data],
+            [('fresh', 3), ('stale', 3)]
+        )
+        self.assertGreater(res.data[0]['score'], res.data[1]['score'])
+
+    def test_limit(self):
+        """Test at most limit tag names are returned"""
+        for name in ['a', 'b', 'c']:
+            self._tag(name, 0)
+
+        res = self.client.get(TRENDING_URL, {'limit': 2})
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_invalid_params(self):
+        """Test out of range or malformed params are a bad request"""
+        for params in [{'hours': 0}, {'hours': 'x'}, {'limit': 1000},
+                       {'limit': '-1'}]:
+            res = self.client.get(TRENDING_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_assigned_only_reads_counts(self):
+        """Test assigned tags are listed from their post counts"""
+        used = self._tag('used', 0)
+        self._tag('unused')
+
+        res = self.client.get(TAG_URL, {'assigned_only': 1})
+
+        self.assertEqual(
+            [(tag['id'], tag['post_count']) for tag in res.data['results']],
+            [(used.id, 1)]
+        )
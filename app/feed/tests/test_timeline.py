@@ -0,0 +1,277 @@
+"""
+Test materialized timelines
+"""
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from core import metrics
+from core.models import Feed, Follow, TimelineEntry
+from feed import timeline
+
+
+FEED_URL = reverse('feed:posts-list')
+
+
+def create_user(**params):
+    """Create and return user"""
+    return get_user_model().objects.create_user(**params)
+
+
+def follower_url(username):
+    """Get the url to send post request to follow <username>"""
+    return reverse('user:me', args=[username]) + 'follower/'
+
+
+def follow(user, target):
+    """Create a follow edge"""
+    Follow.objects.create(follower=user, followee=target)
+
+
+class TimelineTests(TransactionTestCase):
+    """Test fan-out of posts into timelines"""
+
+    def setUp(self):
+        self.author = create_user(
+            email='author@example.com',
+            password='testpass',
+            username='author'
+        )
+        self.reader = create_user(
+            email='reader@example.com',
+            password='testpass',
+            username='reader'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def test_new_post_pushed_to_author_and_followers(self):
+        """Test creating a post adds it to the audience timelines"""
+        Follow.objects.create(
+            follower=self.reader,
+            followee=self.author
+        )
+
+        post = Feed.objects.create(user=self.author, title='Sample title')
+
+        viewers = TimelineEntry.objects.filter(
+            post=post
+        ).values_list('viewer_id', flat=True)
+        self.assertCountEqual(viewers, [self.author.id, self.reader.id])
+
+    def test_post_not_pushed_to_other_users(self):
+        """Test posts are not pushed to users who don't follow the author"""
+        post = Feed.objects.create(user=self.author, title='Sample title')
+
+        exists = TimelineEntry.objects.filter(
+            viewer=self.reader,
+            post=post
+        ).exists()
+        self.assertFalse(exists)
+
+    def test_follow_backfills_recent_posts(self):
+        """Test following a user copies their recent posts"""
+        posts = [
+            Feed.objects.create(user=self.author, title=f'title {i}')
+            for i in range(3)
+        ]
+
+        self.client.post(follower_url(self.author.username), {})
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [post.id for post in reversed(posts)]
+        )
+
+    def test_deleted_post_removed_from_timelines(self):
+        """Test deleting a post removes its timeline entries"""
+        post = Feed.objects.create(user=self.author, title='Sample title')
+
+        post.delete()
+
+        self.assertFalse(TimelineEntry.objects.exists())
+
+
+@override_settings(FEED_CELEBRITY_THRESHOLD=2)
+class HybridTimelineTests(TransactionTestCase):
+    """Test pull-based assembly for high-follower authors"""
+
+    def setUp(self):
+        self.celebrity = create_user(
+            email='celebrity@example.com',
+            password='testpass',
+            username='celebrity'
+        )
+        self.author = create_user(
+            email='author@example.com',
+            password='testpass',
+            username='author'
+        )
+        self.reader = create_user(
+            email='reader@example.com',
+            password='testpass',
+            username='reader'
+        )
+        fan = create_user(
+            email='fan@example.com',
+            password='testpass',
+            username='fan'
+        )
+        follow(self.reader, self.celebrity)
+        follow(fan, self.celebrity)
+        follow(self.reader, self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+        cache.clear()
+        metrics.reset()
+
+    def test_celebrity_posts_are_not_fanned_out(self):
+        """Test posts of high-follower authors only reach the author"""
+        post = Feed.objects.create(user=self.celebrity, title='Sample')
+
+        viewers = TimelineEntry.objects.filter(
+            post=post
+        ).values_list('viewer_id', flat=True)
+        self.assertEqual(list(viewers), [self.celebrity.id])
+
+    def test_pulled_posts_are_merged_in_order(self):
+        """Test feed merges pushed and pulled posts by id"""
+        posts = [
+            Feed.objects.create(user=self.celebrity, title='1'),
+            Feed.objects.create(user=self.author, title='2'),
+            Feed.objects.create(user=self.celebrity, title='3'),
+            Feed.objects.create(user=self.author, title='4'),
+        ]
+
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [post.id for post in reversed(posts)]
+        )
+        self.assertEqual(metrics.snapshot()['feed.timeline.merged_reads'], 1)
+
+    def test_merged_feed_pages_both_ways(self):
+        """Test cursor pages over a merged feed in both directions"""
+        posts = [
+            Feed.objects.create(
+                user=[self.celebrity, self.author][i % 2],
+                title=str(i)
+            )
+            for i in range(5)
+        ]
+        expected = [post.id for post in reversed(posts)]
+
+        first = self.client.get(FEED_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        third = self.client.get(second.data['next'])
+        back = self.client.get(third.data['previous'])
+
+        pages = [first, second, third]
+        self.assertEqual(
+            [item['id'] for res in pages for item in res.data['results']],
+            expected
+        )
+        self.assertIsNone(third.data['next'])
+        self.assertEqual(back.data['results'], second.data['results'])
+
+    def test_read_without_pulled_authors_skips_merge(self):
+        """Test timelines without high-follower authors are not merged"""
+        self.client.force_authenticate(self.celebrity)
+
+        self.client.get(FEED_URL)
+
+        counters = metrics.snapshot()
+        self.assertEqual(counters['feed.timeline.reads'], 1)
+        self.assertNotIn('feed.timeline.merged_reads', counters)
+
+    def test_pulled_authors_come_from_cached_set(self):
+        """Test pulled authors are resolved against the cached celebrity
+        set, which is refreshed when an author crosses the threshold"""
+        self.assertEqual(timeline.celebrity_ids(), {self.celebrity.id})
+        rising = create_user(
+            email='rising@example.com',
+            password='testpass',
+            username='rising'
+        )
+        follow(self.reader, rising)
+        follow(self.author, rising)
+
+        Feed.objects.create(user=rising, title='Sample')
+
+        self.assertCountEqual(
+            timeline.pulled_authors(self.reader),
+            [self.celebrity.id, rising.id]
+        )
+
+    def test_demoted_author_posts_are_pushed(self):
+        """Test posts of an author falling below the threshold stay in
+        their followers' feeds once they are no longer pulled"""
+        post = Feed.objects.create(user=self.celebrity, title='Sample')
+        self.assertEqual(timeline.pulled_authors(self.reader), [
+            self.celebrity.id
+        ])
+
+        Follow.objects.filter(followee=self.celebrity).exclude(
+            follower=self.reader
+        ).delete()
+
+        self.assertEqual(timeline.pulled_authors(self.reader), [])
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                viewer=self.reader,
+                post=post
+            ).exists()
+        )
+        res = self.client.get(FEED_URL)
+        self.assertIn(post.id, [item['id'] for item in res.data['results']])
+
+    def test_celebrity_read_from_follower_counter(self):
+        """Test fan-out and the pulled set agree on who is a celebrity"""
+        get_user_model().objects.filter(id=self.author.id).update(
+            followers_count=2
+        )
+
+        self.assertTrue(timeline.is_celebrity(self.author.id))
+        self.assertFalse(timeline.is_celebrity(self.reader.id))
+        self.assertIn(self.author.id, timeline.celebrity_ids())
+
+    def test_lost_demotion_is_recovered(self):
+        """Test a pulled author below the threshold is demoted by the
+        recovery sweep when their demotion job was lost"""
+        post = Feed.objects.create(user=self.author, title='Sample')
+        TimelineEntry.objects.filter(viewer=self.reader).delete()
+        cache.set(
+            timeline.CELEBRITIES_CACHE_KEY,
+            {self.celebrity.id, self.author.id}
+        )
+
+        timeline.pool.recover_now()
+
+        self.assertEqual(timeline.celebrity_ids(), {self.celebrity.id})
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                viewer=self.reader,
+                post=post
+            ).exists()
+        )
+
+    def test_pulled_authors_read_from_cache(self):
+        """Test a warm cache resolves pulled authors without queries"""
+        timeline.pulled_authors(self.reader)
+
+        with self.assertNumQueries(0):
+            authors = timeline.pulled_authors(self.reader)
+
+        self.assertEqual(authors, [self.celebrity.id])
+
+    def test_merge_removes_duplicates(self):
+        """Test posts present in several sources are returned once"""
+        post_ids = timeline.merge_post_ids([[9, 7, 3], [8, 7, 1]], limit=4)
+
+        self.assertEqual(post_ids, [9, 8, 7, 3])
@@ -0,0 +1,138 @@
+"""
+Test streaming validation of image uploads
+"""
+import io
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Feed
+from feed.uploads import ImageUploadHandler, has_image_signature
+
+
+def image_upload_url(post_id):
+    """Get image url"""
+    return reverse('feed:posts-upload-image', args=[post_id])
+
+
+def create_png(size):
+    """Return the bytes of a PNG image"""
+    image_file = io.BytesIO()
+    Image.new('L', size).save(image_file, format='PNG')
+    return image_file.getvalue()
+
+
+def start_file(handler):
+    """Announce a new file upload to the handler"""
+    handler.new_file('image', 'upload.png', 'image/png', None)
+
+
+class ImageUploadHandlerTests(SimpleTestCase):
+    """Test the streaming upload handler"""
+
+    def test_accepted_signatures(self):
+        """Test only known image formats pass the magic bytes check"""
+        self.assertTrue(has_image_signature(create_png((1, 1))))
+        self.assertTrue(has_image_signature(b'RIFF\0\0\0\0WEBPVP8 '))
+        self.assertFalse(has_image_signature(b'%PDF-1.7 not an image'))
+
+    def test_non_image_rejected_on_first_chunk(self):
+        """Test the upload stops without waiting for the rest"""
+        handler = ImageUploadHandler()
+        start_file(handler)
+
+        with self.assertRaises(StopUpload) as cm:
+            handler.receive_data_chunk(b'%PDF-1.7' + b'\0' * 1024, 0)
+
+        self.assertTrue(cm.exception.connection_reset)
+        self.assertEqual(str(handler.error), 'Upload a valid image.')
+
+    @override_settings(FEED_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels_rejected_from_header(self):
+        """Test large dimensions are refused before decoding"""
+        handler = ImageUploadHandler()
+        start_file(handler)
+
+        with self.assertRaises(StopUpload):
+            handler.receive_data_chunk(create_png((20, 20))[:64], 0)
+
+        self.assertIn('20x20 pixels', str(handler.error))
+
+    @override_settings(FEED_IMAGE_MAX_UPLOAD_SIZE=1000)
+    def test_oversize_file_rejected_while_streaming(self):
+        """Test the size cap is enforced per chunk"""
+        handler = ImageUploadHandler()
+        start_file(handler)
+        data = create_png((10, 10))
+        handler.receive_data_chunk(data, 0)
+
+        with self.assertRaises(StopUpload):
+            handler.receive_data_chunk(b'\0' * 1000, len(data))
+
+        self.assertTrue(handler.error.too_large)
+
+    def test_valid_image_spooled_to_disk(self):
+        """Test accepted uploads are written to a temporary file"""
+        handler = ImageUploadHandler()
+        start_file(handler)
+        data = create_png((10, 10))
+        handler.receive_data_chunk(data, 0)
+
+        uploaded = handler.file_complete(len(data))
+        self.addCleanup(uploaded.close)
+
+        self.assertIsInstance(uploaded, TemporaryUploadedFile)
+        self.assertIsNone(handler.error)
+
+
+class ImageUploadApiTests(TestCase):
+    """Test upload limits through the upload-image endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Feed.objects.create(user=self.user, title='Sample')
+        self.url = image_upload_url(self.post.id)
+
+    def _upload(self, data, name='upload.png'):
+        image_file = io.BytesIO(data)
+        image_file.name = name
+        return self.client.post(
+            self.url, {'image': image_file}, format='multipart'
+        )
+
+    def test_non_image_rejected(self):
+        """Test files with a wrong signature get a 400"""
+        res = self._upload(b'GIF? not really' * 100)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data)
+        self.post.refresh_from_db()
+        self.assertFalse(self.post.image)
+
+    @override_settings(FEED_IMAGE_MAX_PIXELS=100)
+    def test_decompression_bomb_rejected(self):
+        """Test small files with huge dimensions are refused"""
+        res = self._upload(create_png((1000, 1000)))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('1000x1000 pixels', res.data['image'][0])
+
+    @override_settings(FEED_IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_oversize_body_rejected(self):
+        """Test bodies above the limit are refused from Content-Length"""
+        res = self._upload(b'\0' * 70 * 1024)
+
+        self.assertEqual(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
@@ -0,0 +1,139 @@
+"""
+Test blocked word matching.
+"""
+import os
+import tempfile
+from django.test import SimpleTestCase, override_settings
+from rest_framework import serializers
+from feed import validators
+from feed.matcher import Matcher, WORD
+
+
+class MatcherTests(SimpleTestCase):
+    """Test the Aho-Corasick matcher"""
+
+    def test_finds_every_match_in_one_pass(self):
+        """Test overlapping and nested words are all reported"""
+        matcher = Matcher(['he', 'she', 'his', 'hers'])
+
+        matches = matcher.find_all('ushers')
+
+        self.assertEqual(matches, [(1, 'she'), (2, 'he'), (2, 'hers')])
+
+    def test_match_is_case_insensitive(self):
+        """Test words and text are compared lowercased"""
+        matcher = Matcher(['Murder'])
+
+        self.assertEqual(matcher.words_in('A MURDER case'), ['murder'])
+
+    def test_substring_mode_matches_inside_words(self):
+        """Test substring mode keeps the previous behaviour"""
+        matcher = Matcher(['murder'])
+
+        self.assertEqual(matcher.words_in('murderer'), ['murder'])
+
+    def test_word_mode_only_matches_whole_words(self):
+        """Test word mode ignores matches inside longer words"""
+        matcher = Matcher(['ass', 'bad word'], mode=WORD)
+
+        self.assertEqual(matcher.words_in('a classic pass'), [])
+        self.assertEqual(
+            matcher.words_in('Ass, a bad word!'), ['ass', 'bad word']
+        )
+
+    def test_blank_words_are_ignored(self):
+        """Test empty entries do not match everything"""
+        matcher = Matcher(['', '  '])
+
+        self.assertEqual(len(matcher), 0)
+        self.assertEqual(matcher.find_all('anything'), [])
+
+    def test_unknown_mode_is_rejected(self):
+        """Test an invalid mode raises"""
+        with self.assertRaises(ValueError):
+            Matcher(['a'], mode='regex')
+
+
+class CheckAllowedWordsTests(SimpleTestCase):
+    """Test validating text against the blocked word list"""
+
+    def setUp(self):
+        validators.reload()
+        self.addCleanup(validators.reload)
+
+    def _words_file(self, *words):
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as words_file:
+            words_file.write('\n'.join(words))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_default_word_list(self):
+        """Test the built in list is used without a file"""
+        with self.assertRaises(serializers.ValidationError):
+            validators.check_allowed_words('Create Murder description')
+
+        validators.check_allowed_words('Create sample description')
+
+    def test_reports_every_blocked_word(self):
+        """Test all matches are reported at once"""
+        path = self._words_file('# comment', 'spam', 'scam')
+
+        with override_settings(FEED_BLOCKED_WORDS_FILE=path):
+            with self.assertRaises(serializers.ValidationError) as cm:
+                validators.check_allowed_words('scam and spam')
+
+        self.assertEqual(cm.exception.detail, [
+            '<scam> word is not an allowed word',
+            '<spam> word is not an allowed word',
+        ])
+
+    @override_settings(FEED_BLOCKED_WORDS_RELOAD_INTERVAL=0)
+    def test_word_list_file_is_reloaded_on_change(self):
+        """Test editing the file updates the matcher"""
+        path = self._words_file('spam')
+
+        with override_settings(FEED_BLOCKED_WORDS_FILE=path):
+            validators.check_allowed_words('scam')
+            with open(path, 'a') as words_file:
+                words_file.write('\nscam')
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+            with self.assertRaises(serializers.ValidationError):
+                validators.check_allowed_words('scam')
+
+    @override_settings(FEED_BLOCKED_WORDS_RELOAD_INTERVAL=0)
+    def test_missing_word_list_file_keeps_matcher(self):
+        """Test a removed file keeps the words read before"""
+        path = self._words_file('spam')
+
+        with override_settings(FEED_BLOCKED_WORDS_FILE=path):
+            matcher = validators.get_matcher()
+            os.remove(path)
+            self.addCleanup(lambda: open(path, 'w').close())
+
+            with self.assertLogs('feed.validators', 'WARNING'):
+                self.assertIs(validators.get_matcher(), matcher)
+
+    def test_missing_word_list_file_at_start(self):
+        """Test a file missing from the start falls back to the built-in
+        words"""
+        with override_settings(FEED_BLOCKED_WORDS_FILE='/nonexistent.txt'):
+            with self.assertLogs('feed.validators', 'ERROR'):
+                with self.assertRaises(serializers.ValidationError):
+                    validators.check_allowed_words('murder')
+
+    def test_matcher_is_reused_between_checks(self):
+        """Test the automaton is not rebuilt on every call"""
+        matcher = validators.get_matcher()
+
+        self.assertIs(validators.get_matcher(), matcher)
+
+    @override_settings(FEED_BLOCKED_WORDS_MODE='word')
+    def test_word_mode_setting(self):
+        """Test the match mode comes from settings"""
+        validators.check_allowed_words('murderer')
+
+        with self.assertRaises(serializers.ValidationError):
+            validators.check_allowed_words('a murder')
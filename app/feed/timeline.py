@@ -0,0 +1,252 @@
+"""
+Materialized per-user timelines.
+
+Posts are pushed into follower timelines on write (fan-out on write),
+except for authors with at least FEED_CELEBRITY_THRESHOLD followers. Their
+posts are pulled at read time and k-way merged into the timeline. When
+such an author falls below the threshold, their recent posts are pushed
+to their followers before they stop being pulled.
+"""
+import heapq
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from core import metrics, workers
+from core.models import Feed, Follow, TimelineEntry, User
+from feed import response_cache
+from user import follow_graph
+
+
+CELEBRITIES_CACHE_KEY = 'feed:celebrities'
+
+# Followers whose timelines are filled per insert when an author is
+# demoted, bounding the rows held in memory
+DEMOTE_FOLLOWERS_BATCH = 50
+
+
+def is_celebrity(user_id):
+    """Check if the user has too many followers to fan out"""
+    return User.objects.filter(
+        id=user_id,
+        followers_count__gte=settings.FEED_CELEBRITY_THRESHOLD
+    ).exists()
+
+
+def celebrity_ids():
+    """Return the cached ids of every user whose posts are pulled"""
+    ids = cache.get(CELEBRITIES_CACHE_KEY)
+    if ids is None:
+        ids = set(
+            User.objects.filter(
+                followers_count__gte=settings.FEED_CELEBRITY_THRESHOLD
+            ).values_list('id', flat=True)
+        )
+        cache.set(
+            CELEBRITIES_CACHE_KEY,
+            ids,
+            settings.FEED_CELEBRITY_CACHE_TIMEOUT
+        )
+
+    return ids
+
+
+def _add_celebrity(user_id):
+    """Start pulling a user who crossed the threshold before the cached
+    set expires"""
+    ids = celebrity_ids()
+    if user_id not in ids:
+        cache.set(
+            CELEBRITIES_CACHE_KEY,
+            ids | {user_id},
+            settings.FEED_CELEBRITY_CACHE_TIMEOUT
+        )
+
+
+def _recent_post_ids(author_id):
+    """Return ids of the author's newest approved posts to backfill"""
+    return Feed.objects.filter(
+        user_id=author_id,
+        status=Feed.Status.APPROVED
+    ).order_by('-id').values_list(
+        'id', flat=True
+    )[:settings.FEED_TIMELINE_BACKFILL]
+
+
+def demote(author_ids):
+    """Push the recent posts of authors who fell below the threshold
+    into their followers' timelines, then stop pulling them"""
+    demoted = User.objects.filter(
+        id__in=author_ids,
+        followers_count__lt=settings.FEED_CELEBRITY_THRESHOLD
+    ).values_list('id', flat=True)
+    for author_id in demoted:
+        post_ids = list(_recent_post_ids(author_id))
+        follower_ids = list(
+            Follow.objects.filter(
+                followee_id=author_id
+            ).values_list('follower_id', flat=True)
+        )
+        for start in range(0, len(follower_ids), DEMOTE_FOLLOWERS_BATCH):
+            TimelineEntry.objects.bulk_create(
+                [TimelineEntry(viewer_id=viewer_id, post_id=post_id)
+                 for viewer_id in follower_ids[
+                     start:start + DEMOTE_FOLLOWERS_BATCH
+                 ]
+                 for post_id in post_ids],
+                batch_size=1000,
+                ignore_conflicts=True
+            )
+        cache.set(
+            CELEBRITIES_CACHE_KEY,
+            celebrity_ids() - {author_id},
+            settings.FEED_CELEBRITY_CACHE_TIMEOUT
+        )
+        response_cache.touch_feeds(follower_ids)
+
+
+def undemoted():
+    """Return ids of pulled authors who fell below the threshold"""
+    return User.objects.filter(
+        id__in=cache.get(CELEBRITIES_CACHE_KEY, set()),
+        followers_count__lt=settings.FEED_CELEBRITY_THRESHOLD
+    ).order_by('id').values_list('id', flat=True)
+
+
+pool = workers.Pool(
+    'timeline',
+    demote,
+    workers=1,
+    batch_size=10,
+    recover=undemoted
+)
+
+
+def unfollowed(author_id):
+    """Check if a pulled author fell below the threshold once the
+    unfollow commits"""
+    if author_id in celebrity_ids():
+        pool.submit([author_id])
+
+
+def pulled_authors(viewer):
+    """Return ids of followed users whose posts are pulled at read time"""
+    celebrities = celebrity_ids()
+    if not celebrities:
+        return []
+
+    return sorted(celebrities & follow_graph.followee_ids(viewer.id))
+
+
+def push_posts(author_id, posts):
+    """Push new posts of one author into their own and their followers'
+    timelines and return the ids of the viewers they were pushed to"""
+    viewer_ids = [author_id]
+
+    if is_celebrity(author_id):
+        _add_celebrity(author_id)
+    else:
+        viewer_ids += Follow.objects.filter(
+            followee_id=author_id
+        ).values_list('follower_id', flat=True)
+
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(viewer_id=id, post=post)
+         for post in posts for id in viewer_ids],
+        batch_size=1000,
+        ignore_conflicts=True
+    )
+
+    return viewer_ids
+
+
+def backfill(viewer_id, author_id):
+    """Copy the author's recent posts into a new follower's timeline"""
+    if is_celebrity(author_id):
+        return
+
+    post_ids = _recent_post_ids(author_id)
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(viewer_id=viewer_id, post_id=id) for id in post_ids],
+        ignore_conflicts=True
+    )
+
+
+def forget(viewer_id, author_id):
+    """Remove the author's posts from the timeline of a viewer who
+    stopped following them"""
+    TimelineEntry.objects.filter(
+        viewer_id=viewer_id,
+        post__user_id=author_id
+    ).delete()
+
+
+def posts_for(viewer, authors=(), own=False):
+    """Return every post visible to the viewer, adding all of their own
+    posts whatever their status when <own> is set"""
+    if not authors and not own:
+        return Feed.objects.filter(timeline_entries__viewer=viewer)
+
+    pushed = TimelineEntry.objects.filter(viewer=viewer).values('post_id')
+    visible = Q(id__in=pushed)
+    if authors:
+        visible |= Q(user_id__in=authors, status=Feed.Status.APPROVED)
+    if own:
+        visible |= Q(user=viewer)
+    return Feed.objects.filter(visible)
+
+
+def merge_post_ids(sources, limit=None, descending=True):
+    """K-way merge of sorted post id sources"""
+    post_ids = []
+    for post_id in heapq.merge(*sources, reverse=descending):
+        if post_ids and post_ids[-1] == post_id:
+            continue
+        post_ids.append(post_id)
+        if limit is not None and len(post_ids) == limit:
+            break
+
+    return post_ids
+
+
+def _window(queryset, field, position, reverse, limit):
+    """Slice a sorted id source to the rows a cursor page can use"""
+    if position is not None:
+        lookup = 'gt' if reverse else 'lt'
+        queryset = queryset.filter(**{f'{field}__{lookup}': position})
+
+    ordering = field if reverse else f'-{field}'
+    return queryset.order_by(ordering).values_list(field, flat=True)[:limit]
+
+
+def read(viewer, position=None, reverse=False, limit=None):
+    """Return the viewer's feed, merging pulled authors when needed.
+
+    position, reverse and limit describe the cursor page being read, so
+    only the rows that page can contain are read from every source.
+    """
+    metrics.incr('feed.timeline.reads')
+    authors = pulled_authors(viewer)
+    if not authors:
+        return posts_for(viewer)
+
+    metrics.incr('feed.timeline.merged_reads')
+    window = {'position': position, 'reverse': reverse, 'limit': limit}
+    sources = [
+        _window(
+            TimelineEntry.objects.filter(viewer=viewer), 'post_id', **window
+        )
+    ]
+    sources += [
+        _window(
+            Feed.objects.filter(
+                user_id=author,
+                status=Feed.Status.APPROVED
+            ),
+            'id',
+            **window
+        )
+        for author in authors
+    ]
+    post_ids = merge_post_ids(sources, limit, descending=not reverse)
+
+    return Feed.objects.filter(id__in=post_ids)
@@ -0,0 +1,111 @@
+"""
+Streaming validation of image uploads.
+
+Uploaded images are spooled to a temporary file chunk by chunk and hashed
+on the way, so storage can be content addressed without reading them
+again. The format and dimensions are read from the first chunks, so
+oversize files, non-images and decompression bombs are rejected before
+the rest of the body is read.
+"""
+import hashlib
+import io
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    StopUpload,
+    TemporaryFileUploadHandler,
+)
+from PIL import Image
+
+
+# Leading bytes of every accepted image format
+SIGNATURES = [
+    b'\xff\xd8\xff',
+    b'\x89PNG\r\n\x1a\n',
+    b'GIF87a',
+    b'GIF89a',
+]
+
+
+def has_image_signature(header):
+    """Check the first bytes of a file belong to an accepted format"""
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return True
+    return any(header.startswith(signature) for signature in SIGNATURES)
+
+
+class UploadRejected(Exception):
+    """Raised with the reason an upload was refused"""
+
+    def __init__(self, message, too_large=False):
+        super().__init__(message)
+        self.too_large = too_large
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Spool image uploads to disk, validating them while they stream"""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.error = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._header = b''
+        self._checked = False
+        self._digest = hashlib.sha256()
+
+    def _reject(self, error):
+        self.error = error
+        raise StopUpload(connection_reset=True)
+
+    def _check_header(self, chunk):
+        """Buffer the start of the file until its dimensions are known.
+
+        Image.open only reads headers, so no pixel data is allocated for
+        images that are about to be rejected.
+        """
+        self._header += chunk
+        if len(self._header) >= 12 and \
+                not has_image_signature(self._header):
+            self._reject(UploadRejected('Upload a valid image.'))
+
+        try:
+            image = Image.open(io.BytesIO(self._header))
+        except Image.DecompressionBombError as exc:
+            self._reject(UploadRejected(str(exc)))
+        except Exception:
+            if len(self._header) >= settings.FEED_IMAGE_HEADER_BYTES:
+                self._reject(UploadRejected('Upload a valid image.'))
+            return
+
+        width, height = image.size
+        if width * height > settings.FEED_IMAGE_MAX_PIXELS:
+            self._reject(UploadRejected(
+                f'Image is {width}x{height} pixels, at most '
+                f'{settings.FEED_IMAGE_MAX_PIXELS} pixels are allowed.'
+            ))
+        self._checked = True
+        self._header = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.FEED_IMAGE_MAX_UPLOAD_SIZE:
+            self._reject(UploadRejected(
+                f'Image is larger than '
+                f'{settings.FEED_IMAGE_MAX_UPLOAD_SIZE} bytes.',
+                too_large=True
+            ))
+        if not self._checked:
+            self._check_header(raw_data)
+        self._digest.update(raw_data)
+
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if not self._checked:
+            self.error = UploadRejected('Upload a valid image.')
+            self.file.close()
+            return None
+
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self._digest.hexdigest()
+        return uploaded
@@ -1,15 +1,85 @@
 """
 Cutom Validations
 """
+import logging
+import os
+import threading
+import time
+from django.conf import settings
 from rest_framework import serializers
+from feed.matcher import Matcher
 
 
+logger = logging.getLogger(__name__)
+
 not_allowed_words = ('murder',)
 
+_lock = threading.Lock()
+_state = {'matcher': None, 'source': None, 'checked_at': 0.0}
+
+
+def _read_words(path):
+    """Read one word per line, skipping blanks and # comments"""
+    with open(path, encoding='utf-8') as words_file:
+        return [
+            line.strip() for line in words_file
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+
+
+def _source():
+    """Return an identifier that changes whenever the word list does"""
+    path = settings.FEED_BLOCKED_WORDS_FILE
+    mode = settings.FEED_BLOCKED_WORDS_MODE
+    if not path:
+        return (None, None, mode)
+
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, mode)
+
+
+def get_matcher():
+    """Return the process wide matcher, rebuilding it when the word list
+    file changed since it was last checked. An unreadable file keeps the
+    previous matcher, or falls back to the built-in words"""
+    now = time.monotonic()
+    interval = settings.FEED_BLOCKED_WORDS_RELOAD_INTERVAL
+    if _state['matcher'] is not None and \
+            now - _state['checked_at'] < interval:
+        return _state['matcher']
+
+    with _lock:
+        try:
+            source = _source()
+            if _state['matcher'] is None or source != _state['source']:
+                path, _, mode = source
+                words = _read_words(path) if path else not_allowed_words
+                _state['matcher'] = Matcher(words, mode)
+                _state['source'] = source
+        except OSError as exc:
+            if _state['matcher'] is None:
+                logger.error('Using the built-in blocked words: %s', exc)
+                _state['matcher'] = Matcher(
+                    not_allowed_words,
+                    settings.FEED_BLOCKED_WORDS_MODE
+                )
+            else:
+                logger.warning('Keeping the blocked word list: %s', exc)
+        _state['checked_at'] = now
+
+    return _state['matcher']
+
+
+def reload():
+    """Force the word list to be read again on the next check"""
+    with _lock:
+        _state['matcher'] = None
+
 
 def check_allowed_words(value):
     """Check if the field contain any forbiden word"""
-    for item in not_allowed_words:
-        if item in value.lower():
-            raise serializers.ValidationError(
-                detail=f'<{item}> word is not an allowed word')
+    words = get_matcher().words_in(value)
+    if words:
+        raise serializers.ValidationError(detail=[
+            f'<{word}> word is not an allowed word' for word in words
+        ])
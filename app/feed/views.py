@@ -10,14 +10,43 @@ from drf_spectacular.utils import (
 from rest_framework import (
     viewsets,
     permissions,
-    authentication,
     mixins,
+    parsers,
     response,
     status,
 )
 from rest_framework.decorators import action
-from feed import serializers
-from core.models import Feed, Tag, Following
+from rest_framework.exceptions import (
+    NotFound,
+    PermissionDenied,
+    ValidationError,
+)
+from functools import cached_property
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from feed import (
+    serializers,
+    timeline,
+    response_cache,
+    ingest,
+    images,
+    blobs,
+    moderation,
+    engagement,
+    ranking,
+    search,
+    tag_filter,
+    tag_stats,
+)
+from feed.parsers import ImageUploadParser, NDJSONParser
+from core import metrics
+from core.pagination import RankCursorPagination
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from core.models import Comment, Feed, Tag
 
 
 @extend_schema_view(
@@ -27,61 +56,196 @@ from core.models import Feed, Tag, Following
                 'tags',
                 OpenApiTypes.STR,
                 description='Comma seperated list of tags ids to filter'
+            ),
+            OpenApiParameter(
+                'tag_names',
+                OpenApiTypes.STR,
+                description='Comma seperated list of tag names to filter'
+            ),
+            OpenApiParameter(
+                'tags_mode',
+                OpenApiTypes.STR,
+                enum=tag_filter.MODES,
+                description='Keep posts with any (default) or all of the '
+                            'filtered tags'
+            ),
+        ]
+    ),
+    search=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'q',
+                OpenApiTypes.STR,
+                required=True,
+                description='Words to search for, "quoted phrases" and '
+                            'prefix* terms'
             )
         ]
     )
 )
 class PostsViewSet(viewsets.ModelViewSet):
     """View for feed api"""
+    # Actions that also see the requester's pending and rejected posts
+    owner_actions = [
+        'retrieve', 'update', 'partial_update', 'destroy', 'upload_image',
+    ]
     serializer_class = serializers.PostDetailsSerializer
     queryset = Feed.objects.all()
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
 
-    def _query_to_int(self, items):
-        """Convert string query params to intiger"""
-        return [int(item) for item in items.split(',')]
+    @cached_property
+    def tags(self):
+        """Return the requested (mode, tag id groups) filter or None"""
+        try:
+            return tag_filter.parse(self.request.query_params)
+        except tag_filter.InvalidFilter as exc:
+            raise ValidationError({exc.param: [str(exc)]})
+
+    def _page_window(self):
+        """Return the part of the feed the requested page can contain"""
+        cursor = self.paginator.decode_cursor(self.request)
+        limit = self.paginator.get_page_size(self.request) + 1
+        if cursor is None:
+            return {'limit': limit}
 
-    def _get_following_id(self, items):
-        return [item.following_id for item in items]
+        return {
+            'position': cursor.position,
+            'reverse': cursor.reverse,
+            'limit': cursor.offset + limit
+        }
 
     def get_queryset(self):
-        tags = self.request.query_params.get('tags')
-        following = Following.objects.filter(user=self.request.user)
-        following_item = self._get_following_id(
-            following).__add__([self.request.user.id])
+        user = self.request.user
+        if self.action == 'list' and not self.tags:
+            queryset = timeline.read(user, **self._page_window())
+        else:
+            queryset = timeline.posts_for(
+                user,
+                timeline.pulled_authors(user),
+                own=self.action in self.owner_actions
+            )
+
+        if self.tags:
+            queryset = tag_filter.apply(queryset, *self.tags)
+
+        return engagement.with_counts(
+            queryset.order_by('-id').prefetch_related('tags')
+        )
 
-        queryset = self.queryset.filter(user__id__in=following_item)
-        if tags:
-            tag_ids = self._query_to_int(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+    def _conditional_response(self, data):
+        """Return data with an ETag, or 304 if the client has it"""
+        etag = response_cache.etag(data)
+        res = response.Response(data, headers={'ETag': etag})
+        return get_conditional_response(self.request, etag, response=res)
 
-        return queryset.order_by('-id').distinct()
+    def _cached_page(self, page):
+        """Rebuild a cached feed page from cached post representations"""
+        posts = response_cache.get_posts('list', page['ids'])
+        missing = [id for id in page['ids'] if id not in posts]
+        if missing:
+            queryset = engagement.with_counts(
+                Feed.objects.filter(id__in=missing).prefetch_related('tags')
+            )
+            found = {
+                item['id']: item for item in self.get_serializer(
+                    queryset, many=True
+                ).data
+            }
+            if len(found) < len(missing):
+                return None
+            response_cache.set_posts('list', found)
+            posts.update(found)
+
+        return {
+            'next': page['next'],
+            'previous': page['previous'],
+            'results': [posts[id] for id in page['ids']],
+        }
+
+    def list(self, request, *args, **kwargs):
+        key = response_cache.page_key(
+            request,
+            timeline.pulled_authors(request.user),
+            tag_filter.tag_ids(self.tags[1]) if self.tags else []
+        )
+        page = response_cache.get_page(key)
+        data = page and self._cached_page(page)
+        if data is None:
+            metrics.incr('cache.posts-list.misses')
+            data = super().list(request, *args, **kwargs).data
+            results = data['results']
+            response_cache.set_page(key, {
+                'next': data['next'],
+                'previous': data['previous'],
+                'ids': [item['id'] for item in results],
+            })
+            response_cache.set_posts(
+                'list',
+                {item['id']: item for item in results}
+            )
+        else:
+            metrics.incr('cache.posts-list.hits')
+
+        return self._conditional_response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs['pk']
+        data = response_cache.get_posts('detail', [pk]).get(pk)
+        if data is not None and self.get_queryset().filter(pk=pk).exists():
+            metrics.incr('cache.posts-detail.hits')
+        else:
+            metrics.incr('cache.posts-detail.misses')
+            data = super().retrieve(request, *args, **kwargs).data
+            response_cache.set_posts('detail', {pk: data})
+
+        return self._conditional_response(data)
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ['list', 'search', 'for_you']:
             return serializers.PostsSerializer
         if self.action == 'upload_image':
             return serializers.ImageSerializer
+        if self.action in ['comments', 'delete_comment']:
+            return serializers.CommentSerializer
         return self.serializer_class
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     def perform_update(self, serializer):
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            post = serializer.save(user=self.request.user)
+            moderation.resubmit([post])
 
     def perform_destroy(self, instance):
         instance.delete()
 
-    @action(methods=['POST'], detail=True, url_path='upload-image')
+    @action(
+        methods=['POST'],
+        detail=True,
+        url_path='upload-image',
+        parser_classes=[ImageUploadParser]
+    )
     def upload_image(self, request, pk=None):
         """Custom action to control upload image"""
         feed_post = self.get_object()
         serializer = self.get_serializer(feed_post, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            previous = feed_post.image.name
+            renditions = feed_post.renditions
+            # A failed save must not keep the reference to the new blob
+            with transaction.atomic():
+                image = blobs.store(serializer.validated_data['image'])
+                serializer.save(image=image, renditions={})
+                blobs.release(previous)
+                moderation.resubmit([feed_post])
+            images.delete_renditions(renditions)
+            images.submit([feed_post.id])
             return response.Response(serializer.data, status.HTTP_200_OK)
 
         return response.Response(
@@ -89,6 +253,154 @@ class PostsViewSet(viewsets.ModelViewSet):
             status.HTTP_400_BAD_REQUEST
         )
 
+    @action(
+        methods=['POST'],
+        detail=False,
+        url_path='bulk',
+        parser_classes=[parsers.JSONParser, NDJSONParser]
+    )
+    def bulk(self, request):
+        """Create many posts at once from a JSON array or NDJSON body"""
+        items = request.data
+        if not isinstance(items, list):
+            return response.Response(
+                {'detail': 'Expected a list of posts'},
+                status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.FEED_BULK_MAX_POSTS:
+            return response.Response(
+                {'detail': f'At most {settings.FEED_BULK_MAX_POSTS} posts '
+                           'are accepted per request'},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        results = ingest.create_posts(
+            request.user,
+            items,
+            self.get_serializer_context()
+        )
+        created = sum('id' in result for result in results)
+
+        return response.Response({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results,
+        }, status.HTTP_200_OK)
+
+    @action(
+        methods=['GET'],
+        detail=False,
+        pagination_class=RankCursorPagination
+    )
+    def search(self, request):
+        """Search approved posts visible to the viewer by title and
+        description, best matches first"""
+        visible = timeline.posts_for(
+            request.user,
+            timeline.pulled_authors(request.user)
+        )
+        try:
+            queryset = search.search(
+                visible.filter(status=Feed.Status.APPROVED),
+                request.query_params.get('q', '')
+            )
+        except search.InvalidQuery as exc:
+            return response.Response(
+                {'q': [str(exc)]},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        page = self.paginate_queryset(
+            engagement.with_counts(queryset.prefetch_related('tags'))
+        )
+        serializer = self.get_serializer(page, many=True)
+        metrics.incr('feed.search.queries')
+
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=['GET'],
+        detail=False,
+        url_path='for-you',
+        pagination_class=RankCursorPagination
+    )
+    def for_you(self, request):
+        """Posts of the viewer's timeline ranked by recency and
+        affinity"""
+        queryset = ranking.ranked_posts(request.user)
+        page = self.paginate_queryset(
+            engagement.with_counts(queryset.prefetch_related('tags'))
+        )
+        serializer = self.get_serializer(page, many=True)
+        metrics.incr('feed.ranked.reads')
+
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(request=None, responses={201: None, 200: None})
+    @action(methods=['POST'], detail=True)
+    def like(self, request, pk=None):
+        """Like a post"""
+        if not engagement.like(request.user, self.get_object()):
+            return response.Response(
+                {'detail': 'Already liked'},
+                status.HTTP_200_OK
+            )
+
+        return response.Response(status=status.HTTP_201_CREATED)
+
+    @extend_schema(request=None, responses={204: None})
+    @action(methods=['DELETE'], detail=True)
+    def unlike(self, request, pk=None):
+        """Remove the like of a post"""
+        if not engagement.unlike(request.user, self.get_object()):
+            raise NotFound('Not liked')
+
+        return response.Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(methods=['GET', 'POST'], detail=True)
+    def comments(self, request, pk=None):
+        """List the comments of a post, newest first, or add one"""
+        post = self.get_object()
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            comment = engagement.add_comment(
+                request.user,
+                post,
+                serializer.validated_data['body']
+            )
+            return response.Response(
+                self.get_serializer(comment).data,
+                status.HTTP_201_CREATED
+            )
+
+        page = self.paginate_queryset(Comment.objects.filter(post=post))
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(request=None, responses={204: None})
+    @action(
+        methods=['DELETE'],
+        detail=True,
+        url_path=r'comments/(?P<comment_id>\d+)'
+    )
+    def delete_comment(self, request, pk=None, comment_id=None):
+        """Delete a comment, by its author or the post author"""
+        post = self.get_object()
+        try:
+            comment = Comment.objects.get(id=comment_id, post=post)
+        except Comment.DoesNotExist:
+            raise NotFound('Comment not found')
+        if request.user.id not in [comment.user_id, post.user_id]:
+            raise PermissionDenied(
+                'You are not allowed to delete this comment'
+            )
+
+        engagement.delete_comment(comment)
+
+        return response.Response(status=status.HTTP_204_NO_CONTENT)
+
     def destroy(self, request, pk=None):
         instance = self.get_object()
         if instance.user != request.user:
@@ -116,6 +428,20 @@ class PostsViewSet(viewsets.ModelViewSet):
                 description='Filter by tags assigned to feed posts'
             )
         ]
+    ),
+    trending=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'hours',
+                OpenApiTypes.INT,
+                description='Hours of posts to rank tags over'
+            ),
+            OpenApiParameter(
+                'limit',
+                OpenApiTypes.INT,
+                description='Most tag names to return'
+            ),
+        ]
     )
 )
 class TagViewSet(mixins.ListModelMixin,
@@ -125,7 +451,10 @@ class TagViewSet(mixins.ListModelMixin,
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all()
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
 
     def get_queryset(self):
         assigned_only = bool(
@@ -133,6 +462,41 @@ class TagViewSet(mixins.ListModelMixin,
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(feed__isnull=False)
+            queryset = queryset.filter(post_count__gt=0)
+
+        return queryset.order_by('-id')
+
+    def get_serializer_class(self):
+        if self.action == 'trending':
+            return serializers.TrendingTagSerializer
+        return self.serializer_class
+
+    def _bounded_param(self, name, default, maximum):
+        """Return an integer query param between 1 and <maximum>"""
+        value = self.request.query_params.get(name, str(default))
+        if not value.isdecimal() or not 1 <= int(value) <= maximum:
+            raise ValidationError(
+                {name: [f'Expected a number from 1 to {maximum}.']}
+            )
+        return int(value)
+
+    @action(methods=['GET'], detail=False)
+    def trending(self, request):
+        """Tag names used most by recent posts, newest uses weighing
+        most"""
+        hours = self._bounded_param(
+            'hours',
+            settings.FEED_TRENDING_DEFAULT_HOURS,
+            settings.FEED_TRENDING_RETENTION_HOURS
+        )
+        limit = self._bounded_param(
+            'limit',
+            settings.FEED_TRENDING_DEFAULT_TAGS,
+            settings.FEED_TRENDING_MAX_TAGS
+        )
+        serializer = self.get_serializer(
+            tag_stats.trending(hours, limit),
+            many=True
+        )
 
-        return queryset.order_by('-id').distinct()
+        return response.Response(serializer.data)
@@ -0,0 +1,91 @@
+"""
+Denormalized follower, followee and approved post counts.
+
+The counts live on the user row so profiles are served without COUNT(*)
+queries. Signals and moderation keep them current with atomic F()
+updates; reconcile() recomputes them for rows that drifted, e.g. after
+bulk inserts which skip signals.
+"""
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    PositiveIntegerField,
+    Q,
+    Subquery,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from core.models import Feed, Follow, User
+
+
+FOLLOWERS = 'followers_count'
+FOLLOWING = 'following_count'
+POSTS = 'posts_count'
+
+# Counter column -> (counted model, its foreign key to the user, filter
+# of the counted rows)
+SOURCES = {
+    FOLLOWERS: (Follow, 'followee', Q()),
+    FOLLOWING: (Follow, 'follower', Q()),
+    POSTS: (Feed, 'user', Q(status=Feed.Status.APPROVED)),
+}
+
+
+def adjust(user_id, counter, delta):
+    """Atomically add <delta> to a counter of <user_id>"""
+    User.objects.filter(id=user_id).update(
+        **{counter: Greatest(F(counter) + delta, 0)}
+    )
+
+
+def adjust_follow(follower_id, followee_id, delta):
+    """Atomically move the counters of both ends of a follow edge in a
+    single update"""
+    def moved(counter, user_id):
+        return Case(
+            When(id=user_id, then=Greatest(F(counter) + delta, 0)),
+            default=F(counter),
+            output_field=PositiveIntegerField()
+        )
+
+    User.objects.filter(id__in=[follower_id, followee_id]).update(
+        **{
+            FOLLOWING: moved(FOLLOWING, follower_id),
+            FOLLOWERS: moved(FOLLOWERS, followee_id),
+        }
+    )
+
+
+def actual(counter):
+    """Return an expression counting the rows behind <counter>"""
+    model, column, counted = SOURCES[counter]
+    rows = model.objects.filter(
+        counted,
+        **{column: OuterRef('pk')}
+    ).order_by().values(column).annotate(total=Count('*')).values('total')
+    return Coalesce(Subquery(rows), 0)
+
+
+def reconcile(batch_size=1000):
+    """Recompute counters in batches of users, returning how many users
+    were fixed"""
+    fixed = 0
+    last_id = 0
+    while True:
+        ids = list(
+            User.objects.filter(id__gt=last_id).order_by(
+                'id'
+            ).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return fixed
+
+        drifted = Q()
+        for counter in SOURCES:
+            drifted |= ~Q(**{counter: actual(counter)})
+        fixed += User.objects.filter(id__in=ids).filter(drifted).update(
+            **{counter: actual(counter) for counter in SOURCES}
+        )
+        last_id = ids[-1]
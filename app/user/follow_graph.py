@@ -0,0 +1,38 @@
+"""
+Cached view of the follow graph
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from core.models import Follow
+
+
+def _followees_key(user_id):
+    return f'follow:followees:{user_id}'
+
+
+def followee_ids(user_id):
+    """Return the ids of the users <user_id> follows"""
+    key = _followees_key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.filter(
+                follower_id=user_id
+            ).values_list('followee_id', flat=True)
+        )
+        cache.set(key, ids, settings.FOLLOW_GRAPH_CACHE_TIMEOUT)
+
+    return ids
+
+
+def is_following(user_id, target_id):
+    """Check if <user_id> already follows <target_id>"""
+    return target_id in followee_ids(user_id)
+
+
+def invalidate(user_id):
+    """Forget the cached followees of <user_id> once the transaction
+    commits, so concurrent reads can't cache the old graph again"""
+    key = _followees_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,69 @@
+"""
+Follow engine.
+
+A follow is one Follow edge row. Its unique constraint, not a prior
+existence check, keeps concurrent requests from following twice, and
+the counters, cached graph and timelines are updated by signals inside
+the same transaction. Requests carrying an idempotency key can be
+retried safely: a retry gets the edge its first attempt created.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from core.models import Follow
+from user import follow_graph
+
+
+class AlreadyFollowing(Exception):
+    """Raised when the follow edge already exists"""
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when an idempotency key is sent with another follow"""
+
+
+def _idempotency_key(user_id, key):
+    return f'follow:idempotency:{user_id}:{key}'
+
+
+def _release(follower, idempotency_key):
+    """Forget a key whose request failed so retries fail the same way"""
+    if idempotency_key:
+        cache.delete(_idempotency_key(follower.id, idempotency_key))
+
+
+def follow(follower, followee, idempotency_key=None):
+    """Create and return the edge from <follower> to <followee>"""
+    retried = False
+    if idempotency_key:
+        key = _idempotency_key(follower.id, idempotency_key)
+        timeout = settings.FOLLOW_IDEMPOTENCY_TIMEOUT
+        if not cache.add(key, followee.id, timeout):
+            if cache.get(key) != followee.id:
+                raise IdempotencyKeyReused()
+            retried = True
+
+    if not retried and follow_graph.is_following(follower.id, followee.id):
+        _release(follower, idempotency_key)
+        raise AlreadyFollowing()
+
+    try:
+        with transaction.atomic():
+            return Follow.objects.create(follower=follower, followee=followee)
+    except IntegrityError:
+        if retried:
+            return Follow.objects.get(follower=follower, followee=followee)
+        _release(follower, idempotency_key)
+        raise AlreadyFollowing()
+
+
+def unfollow(follower, followee):
+    """Remove the edge from <follower> to <followee>, returning whether
+    it existed"""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(
+            follower=follower,
+            followee=followee
+        ).delete()
+
+    return deleted > 0
@@ -0,0 +1,18 @@
+"""
+Django command to recompute denormalized user counters.
+"""
+from django.core.management.base import BaseCommand
+from user import counters
+
+
+class Command(BaseCommand):
+    """Command for fixing drifted follower, following and post counts"""
+    help = 'Recompute follower, following and post counts of every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        fixed = counters.reconcile(batch_size=options['batch_size'])
+        self.stdout.write(f'{fixed} users had drifted counters')
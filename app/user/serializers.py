@@ -4,14 +4,28 @@ User Serializers.
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import gettext as _
 from rest_framework import serializers
-from core.models import Follower, Following
+from core import metrics, tokens
+from core.models import Follow
 
 
 class UserSerializer(serializers.ModelSerializer):
     """User serializer"""
     class Meta:
         model = get_user_model()
-        fields = ['email', 'username', 'name', 'password']
+        fields = [
+            'email',
+            'username',
+            'name',
+            'password',
+            'followers_count',
+            'following_count',
+            'posts_count',
+        ]
+        read_only_fields = [
+            'followers_count',
+            'following_count',
+            'posts_count',
+        ]
         extra_kwargs = {'password': {'write_only': True, 'min_length': 6}}
 
     def create(self, validated_data):
@@ -48,27 +62,56 @@ class AuthTokenSerializer(serializers.Serializer):
         )
 
         if not user:
+            metrics.incr('auth.login.failed')
             msg = _('Invalid Credentials')
             raise serializers.ValidationError(msg, code='authorization')
 
+        metrics.incr('auth.login.succeeded')
         attrs['user'] = user
         return attrs
 
 
+class RefreshTokenSerializer(serializers.Serializer):
+    """Refresh token serializer"""
+    refresh = serializers.CharField()
+
+    def validate_refresh(self, value):
+        """Check the refresh token and return its claims"""
+        try:
+            return tokens.verify(value, tokens.REFRESH)
+        except tokens.InvalidToken as exc:
+            raise serializers.ValidationError(str(exc))
+
+
 class UserFollowerSerializer(serializers.ModelSerializer):
     """User followers serailizer"""
+    target_user = serializers.IntegerField(
+        source='followee_id',
+        read_only=True
+    )
+    follower_name = serializers.CharField(
+        source='follower.name',
+        read_only=True
+    )
+
     class Meta:
-        model = Follower
+        model = Follow
         fields = ['target_user', 'follower_id', 'follower_name']
-        read_only_fields = ['target_user',
-                            'follower_id', 'follower_name']
+        read_only_fields = ['follower_id']
 
-    def create(self, validated_data):
-        return Follower.objects.create(**validated_data)
 
+class UserFollowingSerializer(serializers.ModelSerializer):
+    """User following serializer"""
+    user = serializers.IntegerField(source='follower_id', read_only=True)
+    following_id = serializers.IntegerField(
+        source='followee_id',
+        read_only=True
+    )
+    following_name = serializers.CharField(
+        source='followee.name',
+        read_only=True
+    )
 
-class UserFollowingSerializer(UserFollowerSerializer):
-    """User follower serializer"""
     class Meta:
-        model = Following
+        model = Follow
         fields = ['user', 'following_id', 'following_name']
@@ -1,3 +0,0 @@
-from django.dispatch import Signal
-
-follow_user = Signal()
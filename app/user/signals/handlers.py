@@ -1,14 +1,19 @@
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from user.signals import follow_user
-from core.models import Following
-
-
-@receiver(follow_user)
-def add_to_following_list(sender, **kwargs):
-    """Whenever a user follows others this function will triggered to
-    add it to the following list"""
-    Following.objects.create(
-        user=kwargs['data']['user'],
-        following_id=kwargs['data']['following_id'],
-        following_name=kwargs['data']['following_name']
-    )
+from user import counters, follow_graph
+from core.models import Follow
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, **kwargs):
+    """Count a new follow on both users and drop the cached graph"""
+    if created:
+        counters.adjust_follow(instance.follower_id, instance.followee_id, 1)
+        follow_graph.invalidate(instance.follower_id)
+
+
+@receiver(post_delete, sender=Follow)
+def count_removed_follow(sender, instance, **kwargs):
+    """Uncount a removed follow and drop the cached graph"""
+    counters.adjust_follow(instance.follower_id, instance.followee_id, -1)
+    follow_graph.invalidate(instance.follower_id)
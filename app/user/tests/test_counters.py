@@ -0,0 +1,139 @@
+"""
+Test denormalized user counters
+"""
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Feed, Follow
+
+
+BULK_URL = reverse('feed:posts-bulk')
+
+
+def profile_url(username):
+    return reverse('user:me', args=[username])
+
+
+def follower_url(username):
+    return reverse('user:me', args=[username]) + 'follower/'
+
+
+def create_user(username):
+    """Create and return user"""
+    return get_user_model().objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass',
+        username=username,
+        name=username
+    )
+
+
+class CounterTests(TransactionTestCase):
+    """Test counters follow writes"""
+
+    def setUp(self):
+        self.user = create_user('testuser')
+        self.other = create_user('other')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_follow_updates_both_users(self):
+        """Test following counts on the follower and the followed"""
+        self.client.post(follower_url(self.other.username), {})
+
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.user.following_count, 1)
+        self.assertEqual(self.other.followers_count, 1)
+
+    def test_unfollow_decrements(self):
+        """Test deleting follow rows lowers the counts"""
+        self.client.post(follower_url(self.other.username), {})
+
+        Follow.objects.all().delete()
+
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.user.following_count, 0)
+        self.assertEqual(self.other.followers_count, 0)
+
+    def test_posts_are_counted(self):
+        """Test creating and deleting posts changes the post count"""
+        post = Feed.objects.create(user=self.user, title='First')
+        Feed.objects.create(user=self.user, title='Second')
+        post.delete()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.posts_count, 1)
+
+    def test_bulk_created_posts_are_counted(self):
+        """Test bulk ingestion counts posts though it skips signals"""
+        res = self.client.post(BULK_URL, [
+            {'title': 'First'},
+            {'title': 'Second'},
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.posts_count, 2)
+
+    def test_profile_exposes_counts_without_counting(self):
+        """Test the profile is served from the user row alone"""
+        Feed.objects.create(user=self.other, title='Sample')
+        self.client.post(follower_url(self.other.username), {})
+
+        with self.assertNumQueries(1):
+            res = self.client.get(profile_url(self.other.username))
+
+        self.assertEqual(res.data['followers_count'], 1)
+        self.assertEqual(res.data['following_count'], 0)
+        self.assertEqual(res.data['posts_count'], 1)
+
+    def test_counts_are_read_only(self):
+        """Test profile updates can't set counts"""
+        self.client.patch(
+            profile_url(self.user.username), {'followers_count': 99}
+        )
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.followers_count, 0)
+
+
+class ReconcileCountersCommandTests(TestCase):
+    """Test recomputing drifted counters"""
+
+    def test_reconcile_fixes_drift(self):
+        """Test rows inserted without signals are counted"""
+        user = create_user('testuser')
+        others = [create_user(f'other{i}') for i in range(3)]
+        Follow.objects.bulk_create([
+            Follow(follower=other, followee=user)
+            for other in others
+        ])
+        Feed.objects.bulk_create([
+            Feed(
+                user=others[0],
+                title=f'Post {i}',
+                status=Feed.Status.APPROVED
+            )
+            for i in range(2)
+        ] + [Feed(user=others[0], title='Pending')])
+        get_user_model().objects.filter(id=others[1].id).update(
+            posts_count=5
+        )
+        out = StringIO()
+
+        call_command('reconcile_counters', '--batch-size', '2', stdout=out)
+
+        user.refresh_from_db()
+        self.assertEqual(user.followers_count, 3)
+        counts = dict(get_user_model().objects.values_list(
+            'username', 'posts_count'
+        ))
+        self.assertEqual(counts['other0'], 2)
+        self.assertEqual(counts['other1'], 0)
+        self.assertIn('4 users had drifted counters', out.getvalue())
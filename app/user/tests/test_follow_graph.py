@@ -0,0 +1,109 @@
+"""
+Test follow graph cache
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Follow
+from user import follow_graph
+
+
+def follower_url(username):
+    """Get the url to send post request to follow <username>"""
+    return reverse('user:me', args=[username]) + 'follower/'
+
+
+def create_user(**params):
+    """Create and return user"""
+    return get_user_model().objects.create_user(**params)
+
+
+class FollowGraphTests(TransactionTestCase):
+    """Test cached followee ids"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass',
+            username='testuser'
+        )
+        self.target = create_user(
+            email='target@example.com',
+            password='testpass',
+            username='target'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_followee_ids_are_cached(self):
+        """Test the graph is read from the database once"""
+        follow_graph.followee_ids(self.user.id)
+
+        with self.assertNumQueries(0):
+            ids = follow_graph.followee_ids(self.user.id)
+
+        self.assertEqual(ids, frozenset())
+
+    def test_follow_invalidates_cache(self):
+        """Test following a user refreshes the cached graph"""
+        follow_graph.followee_ids(self.user.id)
+
+        res = self.client.post(follower_url(self.target.username), {})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            follow_graph.is_following(self.user.id, self.target.id)
+        )
+
+    def test_delete_invalidates_cache(self):
+        """Test deleting follow rows refreshes the cached graph"""
+        self.client.post(follower_url(self.target.username), {})
+        self.assertTrue(
+            follow_graph.is_following(self.user.id, self.target.id)
+        )
+
+        Follow.objects.filter(follower=self.user).delete()
+
+        self.assertFalse(
+            follow_graph.is_following(self.user.id, self.target.id)
+        )
+
+    def test_duplicate_follow_checked_from_cache(self):
+        """Test the duplicate follow check doesn't query follow rows"""
+        self.client.post(follower_url(self.target.username), {})
+        follow_graph.followee_ids(self.user.id)
+
+        # Only the target user lookup hits the database
+        with self.assertNumQueries(1):
+            res = self.client.post(follower_url(self.target.username), {})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalidated_on_commit(self):
+        """Test the graph read inside the follow transaction is dropped
+        once it commits"""
+        with transaction.atomic():
+            Follow.objects.create(follower=self.user, followee=self.target)
+            # A concurrent request caching the graph before the commit
+            cache.set(
+                f'follow:followees:{self.user.id}',
+                frozenset(),
+                settings.FOLLOW_GRAPH_CACHE_TIMEOUT
+            )
+
+        self.assertTrue(
+            follow_graph.is_following(self.user.id, self.target.id)
+        )
+
+    def test_tests_use_local_memory_cache(self):
+        """Test the shared production cache is swapped out in tests"""
+        self.assertEqual(
+            settings.CACHES['default']['BACKEND'],
+            'django.core.cache.backends.locmem.LocMemCache'
+        )
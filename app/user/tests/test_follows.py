@@ -0,0 +1,152 @@
+"""
+Test the follow engine and unfollow endpoint
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Feed, Follow, TimelineEntry
+from user import follow_graph, follows
+
+
+def follower_url(username):
+    return reverse('user:me', args=[username]) + 'follower/'
+
+
+def unfollow_url(username):
+    return reverse('user:unfollow', args=[username])
+
+
+def create_user(username):
+    """Create and return user"""
+    return get_user_model().objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass',
+        username=username,
+        name=username
+    )
+
+
+class FollowEngineTests(TestCase):
+    """Test writing follow edges"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('testuser')
+        self.target = create_user('target')
+
+    def test_follow_writes_one_edge(self):
+        """Test a follow is a single row readable in both directions"""
+        follows.follow(self.user, self.target)
+
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            list(self.user.following.values_list('followee', flat=True)),
+            [self.target.id]
+        )
+        self.assertEqual(
+            list(self.target.followers.values_list('follower', flat=True)),
+            [self.user.id]
+        )
+
+    def test_unique_constraint_catches_stale_check(self):
+        """Test a duplicate missed by the cached graph still fails"""
+        follow_graph.followee_ids(self.user.id)
+        Follow.objects.bulk_create([
+            Follow(follower=self.user, followee=self.target)
+        ])
+
+        with self.assertRaises(follows.AlreadyFollowing):
+            follows.follow(self.user, self.target)
+
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_self_follow_rejected_by_database(self):
+        """Test the edge table refuses self follows"""
+        with self.assertRaises(IntegrityError):
+            Follow.objects.create(follower=self.user, followee=self.user)
+
+
+class FollowApiTests(TestCase):
+    """Test following and unfollowing through the api"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('testuser')
+        self.target = create_user('target')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_retry_with_idempotency_key(self):
+        """Test a retried follow gets the first response again"""
+        url = follower_url(self.target.username)
+
+        res1 = self.client.post(url, {}, HTTP_IDEMPOTENCY_KEY='abc')
+        res2 = self.client.post(url, {}, HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(res1.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res2.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res1.data, res2.data)
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.followers_count, 1)
+
+    def test_idempotency_key_reused_for_other_user(self):
+        """Test a key can't be replayed for a different follow"""
+        other = create_user('other')
+        self.client.post(
+            follower_url(self.target.username), {},
+            HTTP_IDEMPOTENCY_KEY='abc'
+        )
+
+        res = self.client.post(
+            follower_url(other.username), {},
+            HTTP_IDEMPOTENCY_KEY='abc'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Follow.objects.filter(followee=other).exists())
+
+    def test_follow_self_not_allowed(self):
+        """Test users can't follow themselves"""
+        res = self.client.post(follower_url(self.user.username), {})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unfollow(self):
+        """Test unfollowing removes the edge, counts and timeline"""
+        Feed.objects.create(
+            user=self.target,
+            title='Sample',
+            status=Feed.Status.APPROVED
+        )
+        self.client.post(follower_url(self.target.username), {})
+        self.assertTrue(TimelineEntry.objects.filter(viewer=self.user))
+
+        res = self.client.delete(unfollow_url(self.target.username))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.filter(viewer=self.user))
+        self.assertFalse(
+            follow_graph.is_following(self.user.id, self.target.id)
+        )
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.followers_count, 0)
+
+    def test_unfollow_when_not_following(self):
+        """Test unfollowing a user not followed returns 404"""
+        res = self.client.delete(unfollow_url(self.target.username))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_follow_again_after_unfollow(self):
+        """Test an unfollowed user can be followed again"""
+        self.client.post(follower_url(self.target.username), {})
+        self.client.delete(unfollow_url(self.target.username))
+
+        res = self.client.post(follower_url(self.target.username), {})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
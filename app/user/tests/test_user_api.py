@@ -166,7 +166,10 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(res.data, {
             'email': self.user.email,
             'name': self.user.name,
-            'username': self.user.username
+            'username': self.user.username,
+            'followers_count': 0,
+            'following_count': 0,
+            'posts_count': 0,
         })
 
     def test_post_method_profile_not_allowed(self):
@@ -242,4 +245,25 @@ class PrivateUserApiTests(TestCase):
         res2 = self.client.get(url, {})
 
         self.assertEqual(res1.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(len(res2.data), 1)
+        self.assertEqual(len(res2.data['results']), 1)
+
+    def test_follower_list_is_paginated(self):
+        """Test follower list returns cursor pages"""
+        for i in range(3):
+            user = create_user(
+                name=f'follower{i}',
+                email=f'follower{i}@example.com',
+                password='test123',
+                username=f'follower{i}'
+            )
+            client = APIClient()
+            client.force_authenticate(user)
+            client.post(follower_url(self.user.username), {})
+
+        res = self.client.get(follower_url(self.user.username), {
+            'page_size': 2
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
@@ -14,6 +14,26 @@ app_name = 'user'
 urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView().as_view(), name='token'),
+    path(
+        'token/signed/',
+        views.CreateSignedTokenView.as_view(),
+        name='token-signed'
+    ),
+    path(
+        'token/refresh/',
+        views.RefreshTokenView.as_view(),
+        name='token-refresh'
+    ),
+    path(
+        'token/revoke/',
+        views.RevokeTokenView.as_view(),
+        name='token-revoke'
+    ),
     path('<str:username>/', views.UserProfileView().as_view(), name='me'),
+    path(
+        '<str:username>/unfollow/',
+        views.UnfollowView.as_view(),
+        name='unfollow'
+    ),
     path('<str:username>/', include(router.urls))
 ]
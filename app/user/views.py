@@ -2,19 +2,32 @@
 User View.
 """
 from django.shortcuts import get_object_or_404
-from rest_framework import generics, authentication, permissions
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import (
+    NotFound,
+    PermissionDenied,
+    ValidationError,
+)
 from rest_framework import mixins, viewsets
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
+    RefreshTokenSerializer,
     UserFollowerSerializer,
     UserFollowingSerializer
 )
-from core.models import User, Follower, Following
-from user.signals import follow_user
+from core import tokens
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from core.models import User, Follow
+from core.throttling import LoginEmailThrottle, LoginIPThrottle
+from user import follows
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -26,12 +39,69 @@ class CreateTokenView(ObtainAuthToken):
     """Create auth token for user"""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
+
+class CreateSignedTokenView(generics.GenericAPIView):
+    """Create a signed access and refresh token pair for user"""
+    serializer_class = AuthTokenSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(tokens.issue(serializer.validated_data['user']))
+
+
+class RefreshTokenView(generics.GenericAPIView):
+    """Exchange a refresh token for a new token pair"""
+    serializer_class = RefreshTokenSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        claims = serializer.validated_data['refresh']
+        user = User.objects.filter(id=claims['uid'], is_active=True).first()
+        if user is None:
+            raise ValidationError({'refresh': ['User inactive or deleted.']})
+
+        # Refresh tokens are single use
+        try:
+            tokens.consume(claims)
+        except tokens.InvalidToken as exc:
+            raise ValidationError({'refresh': [str(exc)]})
+        return Response(tokens.issue(user))
+
+
+class RevokeTokenView(generics.GenericAPIView):
+    """Revoke the signed access token used and an optional refresh
+    token of the same user"""
+    serializer_class = RefreshTokenSerializer
+    authentication_classes = [SignedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if 'refresh' in request.data:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            refresh = serializer.validated_data['refresh']
+            if refresh['uid'] != request.user.id:
+                raise PermissionDenied(
+                    'The refresh token belongs to another user.'
+                )
+            tokens.revoke(refresh)
+        tokens.revoke(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """User profile view"""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated]
 
@@ -46,48 +116,68 @@ class UserFollowerViewSet(mixins.ListModelMixin,
                           viewsets.GenericViewSet):
     """User follower viewset"""
     serializer_class = UserFollowerSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Follower.objects.all()
+    queryset = Follow.objects.select_related('follower')
 
     def get_queryset(self):
         username = self.kwargs['username']
-        return self.queryset.filter(target_user__username=username)
+        return self.queryset.filter(followee__username=username)
 
-    def perform_create(self, serializer):
-        username = self.kwargs['username']
-        target = get_object_or_404(User, username=username)
-        current_user = get_object_or_404(
-            User, username=self.request.user.username)
-
-        current_user_id = current_user.id
-        queryset = self.queryset.filter(
-            target_user=target, follower_id=current_user_id)
+    def create(self, request, *args, **kwargs):
+        """Follow <username>, replaying the first response for retries
+        sent with the same Idempotency-Key header"""
+        target = get_object_or_404(User, username=self.kwargs['username'])
+        if target.id == request.user.id:
+            raise ValidationError({'detail': 'Not allowed'})
 
-        if current_user_id == target.id or queryset.exists():
+        try:
+            edge = follows.follow(
+                request.user,
+                target,
+                idempotency_key=request.headers.get('Idempotency-Key')
+            )
+        except follows.AlreadyFollowing:
             raise ValidationError({'detail': 'Not allowed'})
+        except follows.IdempotencyKeyReused:
+            raise ValidationError(
+                {'detail': 'Idempotency-Key was sent with another follow'}
+            )
+
+        serializer = self.get_serializer(edge)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        payload = {
-            'user': current_user,
-            'following_id': target.id,
-            'following_name': target.name
-        }
 
-        serializer.save(
-            target_user=target,
-            follower_id=current_user_id,
-            follower_name=self.request.user
-        )
-        follow_user.send_robust(self.__class__, data=payload)
+class UnfollowView(generics.GenericAPIView):
+    """Stop following a user"""
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=None, responses={204: None})
+    def delete(self, request, username):
+        target = get_object_or_404(User, username=username)
+        if not follows.unfollow(request.user, target):
+            raise NotFound('Not following this user')
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class UserFollowingViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     """User following viewset"""
     serializer_class = UserFollowingSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Following.objects.all()
+    queryset = Follow.objects.select_related('followee')
 
     def get_queryset(self):
         username = self.kwargs['username']
-        return self.queryset.filter(user__username=username)
+        return self.queryset.filter(follower__username=username)